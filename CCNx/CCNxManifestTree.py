@@ -231,8 +231,9 @@ class CCNxManifestTree(object):
         overhead = self.__chunk_overhead()
 
         # first order approximation, which may be off by a byte or two for
-        # the chunk length.  We'll assume at most 3 bytes per chunk number.
-        data_size_per_chunk = self.__chunk_size - overhead - self.__chunk_len
+        # the chunk length.  We'll assume at most 3 bytes per chunk number,
+        # plus 4 bytes for the T_CHUNK segment it is in.
+        data_size_per_chunk = self.__chunk_size - overhead - 4 - self.__chunk_len
         return data_size_per_chunk
 
     def __calculate_data_chunks(self):
@@ -291,7 +292,9 @@ class CCNxManifestTree(object):
         tomorrow_seconds = 24 * 3600
         expiry_time = int((time.mktime(time.gmtime()) + tomorrow_seconds) * 1000)
         while offset < len(self.__data):
-            chunk = self._generate_data_chunk(offset, data_size_per_chunk, chunk_number, expiry_time)
+            # the last chunk is short
+            payload_size = min(data_size_per_chunk, len(self.__data) - offset)
+            chunk = self._generate_data_chunk(offset, payload_size, chunk_number, expiry_time)
             chunk_number += 1
             offset += data_size_per_chunk
             chunks.append(chunk)
@@ -24,6 +24,8 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import hashlib
+
 from CCNxz.CCNxNullCompressor import *
 
 from CCNx.CCNxSignature import *
@@ -63,8 +65,10 @@ class CCNxMessage(object):
         self.__body_tlvs = body_tlv_list
         self.__wire_format = None
         self.__header_length = None
+        self.__digest = None
         self.__name = None
         self.__keyid = None
+        self.__signature = None
         self.__manifest = None
         self.__payload = None
 
@@ -95,6 +99,7 @@ class CCNxMessage(object):
         byte_list.extend(headers)
         byte_list.extend(body)
         self.__wire_format = array.array("B", byte_list)
+        self.__digest = None
 
     def sign(self, key):
         if self.__wire_format is None:
@@ -131,22 +136,26 @@ class CCNxMessage(object):
         length = len(self.__wire_format)
         self.__wire_format[2] = length >> 8
         self.__wire_format[3] = length & 0xFF
+        self.__digest = None
 
         self.__keyid = keyid_array
+        self.__signature = sig_array
 
     def hash(self):
         """
         The Message Hash for use as a hash restriction
         Should should sign the object first.
 
+        The digest is computed once, over the received wire format if there is one (see
+        the wire_format setter), and cached until the wire format changes.
+
         :return: An array of bytes of the SHA256 hash
         """
-        if self.__wire_format is None:
-            self.generate_wireformat()
-
-        hasher = SHA256Hash(self.wire_format[self.__header_length:])
-        hash = hasher.digest()
-        return array.array("B", hash)
+        if self.__digest is None:
+            wire_format = self.wire_format
+            # hash the body in place, without copying a slice of it
+            self.__digest = hashlib.sha256(buffer(wire_format, self.__header_length)).digest()
+        return array.array("B", self.__digest)
 
     @property
     def wire_format(self):
@@ -154,6 +163,28 @@ class CCNxMessage(object):
             self.generate_wireformat()
         return self.__wire_format
 
+    @wire_format.setter
+    def wire_format(self, wire_format):
+        """
+        Use the uncompressed packet the message was parsed from as its wire format, so
+        hash() does not need to encode the TLVs again.  Bytes past the PacketLength are dropped.
+
+        :param wire_format: A string or array of bytes in uncompressed format
+        """
+        if not isinstance(wire_format, array.array):
+            wire_format = array.array("B", wire_format)
+        packet_length = (wire_format[2] << 8) | wire_format[3]
+        header_length = wire_format[7]
+        if packet_length > len(wire_format) or header_length > packet_length:
+            raise ValueError("Bad fixed header: packet length {} header length {} buffer length {}".format(
+                packet_length, header_length, len(wire_format)))
+        if packet_length < len(wire_format):
+            wire_format = wire_format[:packet_length]
+
+        self.__wire_format = wire_format
+        self.__header_length = header_length
+        self.__digest = None
+
     @property
     def name(self):
         return self.__name
@@ -188,6 +219,30 @@ class CCNxMessage(object):
     def keyid(self, keyid):
         self.__keyid = keyid
 
+    @property
+    def signature(self):
+        """
+        The RSA signature from sign(), or of a received message.  It is over the body of
+        the wire_format up to the validation payload, which is last.
+
+        :return: An array of bytes
+        """
+        return self.__signature
+
+    @signature.setter
+    def signature(self, signature):
+        self.__signature = signature
+
+    def signed_bytes(self):
+        """
+        :return: A buffer of the part of the wire_format covered by the signature
+        """
+        if self.__signature is None:
+            raise ValueError("Message is not signed")
+        wire_format = self.wire_format
+        end = len(wire_format) - 4 - len(self.__signature)
+        return buffer(wire_format, self.__header_length, end - self.__header_length)
+
     @property
     def manifest(self):
         """
@@ -34,6 +34,11 @@ from CCNx.CCNxName import *
 class CCNxMessageFactory(object):
     @staticmethod
     def from_wire_format(wire_format):
+        # the parser consumes an array or list as it goes, keep the received bytes
+        received = wire_format
+        if not isinstance(wire_format, str):
+            received = array.array("B", wire_format)
+
         parser = CCNxParser(wire_format)
         parser.parse()
 
@@ -58,6 +63,9 @@ class CCNxMessageFactory(object):
                 keyid = parser.keyid_tlv.value
             message.keyid = keyid
 
+            if parser.validation_payload_tlv is not None:
+                message.signature = array.array("B", parser.validation_payload_tlv.value)
+
             manifest = None
             if parser.manifest_tlv is not None:
                 manifest = parser.manifest_tlv.value
@@ -71,4 +79,8 @@ class CCNxMessageFactory(object):
 
         else:
             raise ValueError("Unsupported message type: ", linear[0])
+
+        if not parser.compressed:
+            # keep the received bytes, so the hash is over them and not a re-encoding
+            message.wire_format = received
         return message
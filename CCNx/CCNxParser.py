@@ -36,7 +36,11 @@ from CCNxz.CCNxNullDecompressor import *
 
 
 class CCNxParser(object):
-    def __init__(self, byte_array):
+    def __init__(self, byte_array, context=None):
+        """
+        :param byte_array: The wire format, compressed or uncompressed
+        :param context: Optional CCNxCompressionContext for decoding learned tokens
+        """
         self.__fixedHeader = None
         self.__headers = []
         self.__body = []
@@ -48,6 +52,8 @@ class CCNxParser(object):
         self.__expiry_tlv = None
         self.__manifest_tlv = None
         self.__payload_tlv = None
+        self.__validation_payload_tlv = None
+        self.__context = context
 
         if type(byte_array) == types.StringType:
             self.__input = array.array("B")
@@ -57,17 +63,23 @@ class CCNxParser(object):
 
         print "Read buffer len = ", len(self.__input)
 
-        if CCNxNullDecompressor.is_uncompressed_fixed_header(self.__input):
+        self.__compressed = not CCNxNullDecompressor.is_uncompressed_fixed_header(self.__input)
+        if not self.__compressed:
             self.__decompressor = CCNxNullDecompressor()
+        elif context is not None:
+            self.__decompressor = CCNxContextDecompressor(context)
         else:
             self.__decompressor = CCNxDecompressor()
 
         self.__decompressed = array.array("B")
+        self.__input_length = len(self.__input)
 
     def parse(self):
         self.__parse_header()
         self.__parse_headers()
         self.__parseBody()
+        if self.__compressed and self.__context is not None:
+            self.__update_context()
 
     @property
     def wire_format(self):
@@ -77,6 +89,21 @@ class CCNxParser(object):
         """
         return self.__wire_format
 
+    @property
+    def learned_tokens(self):
+        """
+        The learned tokens decoded with the context, as (first byte, offset in the input).
+        The offsets are only meaningful if the context's dictionary has no Huffman code.
+        """
+        if not isinstance(self.__decompressor, CCNxContextDecompressor):
+            return []
+        return [(byte0, self.__input_length - left) for byte0, left in self.__decompressor.learned_tokens]
+
+    @property
+    def compressed(self):
+        """True if the input was in compressed format"""
+        return self.__compressed
+
     @property
     def fixed_header(self):
         return self.__fixedHeader
@@ -113,6 +140,16 @@ class CCNxParser(object):
     def payload_tlv(self):
         return self.__payload_tlv
 
+    @property
+    def validation_payload_tlv(self):
+        """The signature, if the message is signed"""
+        return self.__validation_payload_tlv
+
+    def __update_context(self):
+        """An Interest decompressed with a context is remembered for matching its Content Object"""
+        if len(self.__body) > 0 and self.__body[0].type == T_INTEREST and self.__name_tlv is not None:
+            self.__context.interest_seen(self.__name_tlv.value)
+
     def __linearize(self, entry, linear):
         if type(entry) == types.ListType or type(entry) == array.array:
             for element in entry:
@@ -226,6 +263,7 @@ class CCNxParser(object):
                 self.__body.append(tlv)
             elif tlv_type == T_VALPAY:
                 tlv = self.__parse_terminal_token(tlv_type, length)
+                self.__validation_payload_tlv = tlv
                 self.__body.append(tlv)
             else:
                 raise ValueError("Unknown type = {}", tlv_type)
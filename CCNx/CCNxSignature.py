@@ -37,6 +37,7 @@ class CCNxSignature(object):
         self.__key = key
         self.__pubkey = CCNxSignature.__generate_pubkey(key)
         self.__keyid = CCNxSignature.__generate_keyid(self.__pubkey)
+        self.__verifier = None
 
     @staticmethod
     def __generate_pubkey(key):
@@ -76,3 +77,18 @@ class CCNxSignature(object):
         sig = signer.sign(hasher)
         sig_array = array.array("B", sig)
         return sig_array
+
+    def verify(self, data, signature):
+        """
+        Checks a signature made by sign().  Works with just the public key.
+
+        :param data: an array, list, string or buffer of bytes
+        :param signature: an array or list of bytes
+        :return: True if the signature is good
+        """
+        if self.__verifier is None:
+            self.__verifier = PKCS1_v1_5.new(self.__key)
+        if not isinstance(signature, array.array):
+            signature = array.array("B", signature)
+        hasher = SHA256Hash(data)
+        return self.__verifier.verify(hasher, signature.tostring())
@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Verifies the RSA signatures of content objects against a set of trusted keys.
+
+A manifest tree is only signed at the root, and every other object in it is fetched
+by a hash restriction taken from an already trusted manifest.  So a client verifies
+the root manifest once and the hash chain covers the rest of the tree: one RSA
+operation per file, not per packet.
+
+Keys are held by keyid, each with a CCNxSignature made once.  Objects already verified
+are remembered by their hash, so verifying a root again (e.g. a retransmission) is free.
+"""
+
+__author__ = 'mmosko'
+
+from CCNx.CCNxSignature import *
+
+
+class CCNxVerifier(object):
+    _verified_size = 1024
+
+    def __init__(self, keys=None):
+        """
+        :param keys: A list of trusted RSA keys (public or private)
+        """
+        self.__signers = {}
+        self.__verified = set()
+        if keys is not None:
+            for key in keys:
+                self.add_key(key)
+
+    @property
+    def keyids(self):
+        """The keyids of the trusted keys, as arrays of bytes"""
+        return [array.array("B", keyid) for keyid in self.__signers.keys()]
+
+    def add_key(self, key):
+        """
+        Trust a key.
+
+        :param key: An RSA key (public or private)
+        :return: The keyid array of the key
+        """
+        signer = CCNxSignature(key)
+        self.__signers[tuple(signer.keyid_array)] = signer
+        return signer.keyid_array
+
+    def verify(self, message):
+        """
+        Checks the signature of a message with the trusted key named by its keyid.
+
+        :param message: A signed CCNxMessage, e.g. from CCNxMessageFactory
+        :return: True if the signature is good and the key is trusted
+        """
+        if message.keyid is None or message.signature is None:
+            return False
+
+        digest = message.hash().tostring()
+        if digest in self.__verified:
+            return True
+
+        signer = self.__signers.get(tuple(message.keyid))
+        if signer is None:
+            return False
+
+        if not signer.verify(message.signed_bytes(), message.signature):
+            return False
+
+        if len(self.__verified) >= self._verified_size:
+            self.__verified.clear()
+        self.__verified.add(digest)
+        return True
+
+    def verify_all(self, messages):
+        """
+        Verifies many messages, such as the root manifests a server publishes.
+
+        :param messages: A list of signed CCNxMessage
+        :return: A list of True or False, in the same order
+        """
+        return [self.verify(message) for message in messages]
@@ -121,6 +121,34 @@ tYhSUPb2R8yKyyWsKz0U1ZO9nSD+D9DWC+yrPGyXMdnvGC9Mmpaa/Q==
         test = co.hash()
         self.assertTrue(test == truth_array)
 
+    def test_received_wire_format_hash(self):
+        """The hash of a received message is over the received bytes, trailing bytes ignored"""
+        header_tlv = [CCNxTlv(T_INTLIFE, 4, [0x4, 0x3, 0x2, 0x1])]
+        body_tlvs = [CCNxTlv(T_OBJECT, 12, None),
+                     CCNxTlv(T_NAME, 8, None),
+                     CCNxTlv(T_NAMESEG, 4, [0x62, 0x75, 0x7a, 0x7a])]
+        co = CCNxMessage(header_tlv, body_tlvs)
+        truth = co.hash()
+
+        received = CCNxMessage([], [CCNxTlv(T_OBJECT, 0, None)])
+        received.wire_format = co.wire_format.tostring() + "\x00\x00"
+        self.assertEqual(received.wire_format, co.wire_format)
+        self.assertEqual(received.hash(), truth)
+
+        self.assertRaises(ValueError, setattr, received, "wire_format", co.wire_format[:-1])
+
+    def test_hash_cache(self):
+        body_tlvs = [CCNxTlv(T_OBJECT, 12, None),
+                     CCNxTlv(T_NAME, 8, None),
+                     CCNxTlv(T_NAMESEG, 4, [0x62, 0x75, 0x7a, 0x7a])]
+        co = CCNxMessage([], body_tlvs)
+        unsigned = co.hash()
+        self.assertEqual(co.hash(), unsigned)
+
+        # signing changes the wire format, so the hash
+        co.sign(self.key)
+        self.assertNotEqual(co.hash(), unsigned)
+
     def test_set_name(self):
         name_tlv = [CCNxTlv(T_NAME, 8, None), CCNxTlv(T_NAMESEG, 4, [0x62, 0x75, 0x7a, 0x7a])]
         body_tlvs = [CCNxTlv(T_OBJECT, 12, None)]
@@ -76,5 +76,11 @@ un4lm0vl6Bqi2uBcdWX7IZtdotaeMPl8mXUx4+WRxM6rfA==
         sig = signer.sign(self.data)
         self.assertTrue(sig == self.sig_array)
 
+    def test_verify(self):
+        verifier = CCNxSignature(self.key.publickey())
+        self.assertTrue(verifier.verify(self.data, self.sig_array))
+        self.assertFalse(verifier.verify(self.data + "!", self.sig_array))
+        self.assertEqual(verifier.keyid_array, CCNxSignature(self.key).keyid_array)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,364 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+State shared by the compressor and decompressor of one compressed link.
+
+The fixed length and variable length dictionaries are static, so a plain CCNxCompressor
+does not need a context.  Anything that is learned from previous packets lives here
+so that one relay can share it between its two directions.
+
+Learned tokens use the "learned" first bytes that the static dictionaries leave
+unused (see CCNxCompressorFixedLength):
+
+    11110lll dttttttt v{8}+             Numeric value (CCNxCompressorNumericValue)
+    11111110 s{16} c{8}                 T_NAME that matches a pending Interest
+    11111100 v{8}+ m{8}*                T_PAYLOAD compressed with MPPC (CCNxCompressorPayload)
+    11111101 v{8}+ z{8}*                T_PAYLOAD compressed with LZ77 (CCNxCompressorPayload)
+
+Between two relays the context also keeps the link sequence numbers and the recovery
+counters (see CCNxLinkFrame).  Only the numeric bases need to be resynchronized: a
+name reference carries its own check byte and a miss only drops that one packet.
+On a sequence gap or a bad delta the decompressor sends a NACK, which the peer
+answers with a REFRESH of its bases.  The compressor also sends a REFRESH every
+refresh_interval frames.
+
+With payload_compression "mppc", payloads are compressed with an MPPC history that
+lasts for the life of the context.  A lost frame or a payload that does not decode sends
+a NACK like any other loss, and a NACK also flushes our MPPC history so the peer can
+pick it up again.  With "lz77", each payload is compressed on its own with the payload
+dictionary of the context's CCNxDictionary.
+"""
+
+__author__ = 'mmosko'
+
+import array
+import time
+
+from CCNx.CCNxTypes import *
+from CCNx.CCNxTlv import *
+from CCNxz.CCNxPendingInterestTable import *
+from CCNxz.CCNxCompressorNumericValue import *
+from CCNxz.CCNxLinkFrame import *
+from CCNxz.CCNxCompressorPayload import *
+
+_name_reference = 0xFE
+_name_reference_length = 4
+
+
+_counter_names = ['frames_sent', 'frames_received', 'frames_lost', 'decode_errors',
+                  'nacks_sent', 'nacks_received', 'refreshes_sent', 'refreshes_received', 'control_errors',
+                  'payloads_compressed', 'payloads_uncompressed', 'payload_bytes_in', 'payload_bytes_out',
+                  'payload_flushes']
+
+
+class CCNxCompressionContext(object):
+    def __init__(self, context_id=1, pending_interests=None, refresh_interval=64, nack_holdoff=0.25,
+                 clock=time.time, dictionary=None, payload_compression=None):
+        """
+        :param context_id: The context ID written in the compressed fixed header
+        :param pending_interests: A CCNxPendingInterestTable, created if None
+        :param refresh_interval: Send a REFRESH every this many frames (0 to disable)
+        :param nack_holdoff: Minimum seconds between two NACKs
+        :param clock: Function returning the current time in seconds
+        :param dictionary: The CCNxDictionary of this context, None for the installed one
+        :param payload_compression: Payload codec to compress with ("mppc" or "lz77"), None to not
+                                    compress payloads.  We always decompress them.
+        """
+        self.__context_id = context_id
+        self.__dictionary = dictionary
+        if pending_interests is None:
+            pending_interests = CCNxPendingInterestTable()
+        self.__pending_interests = pending_interests
+        self.__number_compressor = CCNxCompressorNumericValue()
+        self.__number_decompressor = CCNxCompressorNumericValue()
+        lz77 = None
+        if dictionary is not None:
+            lz77 = dictionary.lz77
+        self.__payload_compressor = CCNxCompressorPayload(payload_compression, lz77)
+        self.__payload_decompressor = CCNxCompressorPayload(None, lz77)
+
+        self.__refresh_interval = refresh_interval
+        self.__nack_holdoff = nack_holdoff
+        self.__clock = clock
+        self.__tx_sequence = 0
+        self.__rx_sequence = None
+        self.__state_lost = False
+        self.__last_nack_time = None
+        self.__counters = dict.fromkeys(_counter_names, 0)
+
+    @property
+    def context_id(self):
+        return self.__context_id
+
+    @property
+    def pending_interests(self):
+        return self.__pending_interests
+
+    @property
+    def dictionary(self):
+        return self.__dictionary
+
+    @property
+    def counters(self):
+        """A copy of the recovery counters"""
+        return dict(self.__counters)
+
+    # ###### Compression side
+
+    def interest_seen(self, name_segments):
+        """An Interest with the given name is crossing the link"""
+        self.__pending_interests.insert(name_segments)
+
+    def compress_name(self, name_segments):
+        """
+        Try to encode the T_NAME of a Content Object as a reference to a pending Interest.
+
+        :param name_segments: A list of CCNxTlv name segments
+        :return: A list of bytes or None on a miss
+        """
+        reference = self.__pending_interests.match(name_segments)
+        if reference is None:
+            return None
+
+        slot, check = reference
+        return [_name_reference, slot >> 8, slot & 0xFF, check]
+
+    def compress_number(self, tlv):
+        """
+        Try to encode a numeric TLV as a varint or delta.
+
+        :param tlv: A terminal CCNxTlv
+        :return: A list of bytes or None
+        """
+        return self.__number_compressor.compress(tlv)
+
+    @property
+    def tx_bases(self):
+        """The compressor's numeric bases, dictionary from TLV type to base (live, see CCNxTransit)"""
+        return self.__number_compressor.bases
+
+    @property
+    def rx_bases(self):
+        """The decompressor's numeric bases"""
+        return self.__number_decompressor.bases
+
+    def compress_payload(self, tlv):
+        """
+        Try to compress a T_PAYLOAD with the payload codec of this context.
+
+        :param tlv: A T_PAYLOAD CCNxTlv
+        :return: A list of bytes or None
+        """
+        if self.__payload_compressor.codec is None:
+            return None
+
+        encoded = self.__payload_compressor.compress(tlv)
+        if encoded is None:
+            self.__counters['payloads_uncompressed'] += 1
+        else:
+            self.__counters['payloads_compressed'] += 1
+            self.__counters['payload_bytes_in'] += tlv.length
+            self.__counters['payload_bytes_out'] += len(encoded)
+        return encoded
+
+    # ###### Decompression side
+
+    @staticmethod
+    def is_name_reference(byte0):
+        return byte0 == _name_reference
+
+    @staticmethod
+    def is_learned_token(byte0):
+        return byte0 == _name_reference or CCNxCompressorNumericValue.is_numeric_token(byte0) \
+            or CCNxCompressorPayload.is_payload_token(byte0)
+
+    def decompress_type_length(self, byte_array):
+        """
+        Decode a learned token.  A learned token may expand to more than a TL pair.  The
+        extra bytes are put back at the front of byte_array in a form the static
+        decompressor understands, so the parser reads them as if they had been on the wire.
+
+        :param byte_array: The input byte stream
+        :return: A list of 4 bytes (the TL pair) or None if not a learned token
+        :raises ValueError: If the token references state we do not have
+        """
+        byte0 = byte_array[0]
+        if byte0 == _name_reference:
+            return self.__decompress_name_reference(byte_array)
+        if CCNxCompressorNumericValue.is_numeric_token(byte0):
+            type_length, value = self.__number_decompressor.decompress(byte_array)
+            CCNxCompressionContext._push_front(byte_array, value)
+            return type_length
+        if CCNxCompressorPayload.is_payload_token(byte0):
+            type_length, value = self.__payload_decompressor.decompress(byte_array)
+            CCNxCompressionContext._push_front(byte_array, value)
+            return type_length
+        return None
+
+    def __decompress_name_reference(self, byte_array):
+        if len(byte_array) < _name_reference_length:
+            raise ValueError("Truncated name reference")
+
+        byte_array.pop(0)
+        slot = (byte_array.pop(0) << 8) | byte_array.pop(0)
+        check = byte_array.pop(0)
+
+        segments = self.__pending_interests.resolve(slot, check)
+        if segments is None:
+            raise ValueError("Name reference {} does not match a pending Interest".format(hex(slot)))
+
+        # Each segment goes back as an uncompressed (16, 16) token plus its value
+        expanded = []
+        length = 0
+        for tlv in segments:
+            expanded.extend([0xFF, tlv.type >> 8, tlv.type & 0xFF, tlv.length >> 8, tlv.length & 0xFF])
+            if tlv.length > 0:
+                expanded.extend(tlv.value)
+            length += 4 + tlv.length
+
+        CCNxCompressionContext._push_front(byte_array, expanded)
+        return [T_NAME >> 8, T_NAME & 0xFF, length >> 8, length & 0xFF]
+
+    # ###### Persistence
+
+    def export_state(self):
+        """
+        :return: The learned numeric bases as a dictionary that can be saved as JSON
+        """
+        return {"compress": dict(self.__number_compressor.bases),
+                "decompress": dict(self.__number_decompressor.bases)}
+
+    def import_state(self, state):
+        """
+        Restore state from export_state().  If the peer did not keep its state, the
+        bases will not match and are fixed by the usual NACK and REFRESH.
+        """
+        for key, numbers in [("compress", self.__number_compressor), ("decompress", self.__number_decompressor)]:
+            numbers.install(dict((int(t), int(base)) for t, base in state.get(key, {}).items()))
+
+    # ###### Link framing and resynchronization
+
+    def frame(self, packet):
+        """
+        Put a compressed packet in a sequenced frame.  Every refresh_interval frames,
+        a REFRESH of the compression bases goes ahead of it.
+
+        :param packet: The compressed packet (list of bytes)
+        :return: A list of datagrams (each a list of bytes) to send in order
+        """
+        datagrams = []
+        if self.__refresh_interval > 0 and self.__tx_sequence % self.__refresh_interval == 0 \
+                and len(self.__number_compressor.bases) > 0:
+            datagrams.append(self.refresh())
+
+        datagrams.append(CCNxLinkFrame.encode_sequenced(self.__tx_sequence, packet))
+        self.__tx_sequence = (self.__tx_sequence + 1) % CCNxLinkFrame.sequence_modulus
+        self.__counters['frames_sent'] += 1
+        return datagrams
+
+    def unframe(self, byte_array):
+        """
+        Pop the sequenced frame header off byte_array and check for a gap.  A gap
+        is only a problem if we have bases the lost frames could have changed.
+
+        :param byte_array: The received datagram, left holding the compressed packet
+        """
+        sequence = CCNxLinkFrame.decode_sequenced(byte_array)
+        if self.__rx_sequence is not None:
+            lost = (sequence - self.__rx_sequence - 1) % CCNxLinkFrame.sequence_modulus
+            if lost > 0:
+                self.__counters['frames_lost'] += lost
+                if len(self.__number_decompressor.bases) > 0 or self.__payload_decompressor.in_sync:
+                    self.__state_lost = True
+        self.__rx_sequence = sequence
+        self.__counters['frames_received'] += 1
+
+    def decode_failed(self):
+        """A received packet could not be decompressed, so our state may be wrong"""
+        self.__counters['decode_errors'] += 1
+        self.__state_lost = True
+
+    def pending_nack(self):
+        """
+        :return: A NACK to send to the peer (list of bytes) or None
+        """
+        if not self.__state_lost:
+            return None
+
+        now = self.__clock()
+        if self.__last_nack_time is not None and now - self.__last_nack_time < self.__nack_holdoff:
+            return None
+
+        self.__state_lost = False
+        self.__last_nack_time = now
+        self.__counters['nacks_sent'] += 1
+        sequence = self.__rx_sequence if self.__rx_sequence is not None else 0
+        return CCNxLinkFrame.encode_nack(self.__context_id, sequence)
+
+    def refresh(self):
+        """
+        :return: A REFRESH message with our compression bases (list of bytes)
+        """
+        self.__counters['refreshes_sent'] += 1
+        return CCNxLinkFrame.encode_refresh(self.__context_id, self.__number_compressor.bases)
+
+    def receive_control(self, byte_array):
+        """
+        Process a control message from the peer.
+
+        :param byte_array: The received datagram
+        :return: A reply to send to the peer (list of bytes) or None
+        """
+        byte_array = list(byte_array)
+        try:
+            if byte_array[0] == CCNxLinkFrame.NACK:
+                context_id, sequence = CCNxLinkFrame.decode_nack(byte_array)
+                if context_id == self.__context_id:
+                    self.__counters['nacks_received'] += 1
+                    if self.__payload_compressor.codec == MPPC:
+                        self.__payload_compressor.reset()
+                        self.__counters['payload_flushes'] += 1
+                    return self.refresh()
+            elif byte_array[0] == CCNxLinkFrame.REFRESH:
+                context_id, bases = CCNxLinkFrame.decode_refresh(byte_array)
+                if context_id == self.__context_id:
+                    self.__counters['refreshes_received'] += 1
+                    self.__number_decompressor.install(bases)
+                    self.__state_lost = False
+                    return None
+            else:
+                raise ValueError("Unknown control message {}".format(hex(byte_array[0])))
+        except ValueError:
+            pass
+
+        self.__counters['control_errors'] += 1
+        return None
+
+    @staticmethod
+    def _push_front(byte_array, byte_list):
+        if type(byte_array) == array.array:
+            byte_array[0:0] = array.array("B", byte_list)
+        else:
+            byte_array[0:0] = byte_list
@@ -42,19 +42,37 @@ from CCNx.CCNxParser import *
 from CCNxCompressorFixedLength import CCNxCompressorFixedLength
 from CCNxCompressorVariableLength import CCNxCompressorVariableLength
 from CCNxCompressorFixedHeader import CCNxCompressorFixedHeader
+from CCNxCompressorHuffman import CCNxCompressorHuffman
+
+
+# TLV types holding a number, which the context may encode as a varint
+_numeric_header_types = [T_INTLIFE]
+_numeric_body_types = [T_EXPIRY, T_CHUNK, T_ENDCHUNK, T_SIGTIME]
 
 
 class CCNxCompressor(object):
-    def __init__(self, parser):
+    def __init__(self, parser, context=None):
+        """
+        :param parser: A parsed CCNxParser
+        :param context: Optional CCNxCompressionContext with learned state for the link
+        """
         if not isinstance(parser, CCNxParser):
             raise TypeError("parser must be of type CCNxParser")
         self.__parser = parser
+        self.__context = context
         self.__encoded = ""
         self.__encodedHeaders = ""
         self.__encodedBody = ""
         self.__encodedFixedHeader = ""
-        self.__fixed_length_compressor = CCNxCompressorFixedLength()
         self.__context_id = 1
+        self.__dictionary = None
+        if context is not None:
+            self.__context_id = context.context_id
+            self.__dictionary = context.dictionary
+        self.__fixed_length_compressor = CCNxCompressorFixedLength(self.__dictionary)
+        self.__huffman = None
+        if self.__dictionary is not None and self.__dictionary.huffman_code is not None:
+            self.__huffman = CCNxCompressorHuffman(self.__dictionary.huffman_code)
 
     def encode(self):
         self.__encode_fixed_header()
@@ -68,8 +86,11 @@ class CCNxCompressor(object):
 
     def __generate_encoded(self):
         self.__encoded = self.__encodedFixedHeader
-        self.__encoded.extend(self.__encodedHeaders)
-        self.__encoded.extend(self.__encodedBody)
+        if self.__huffman is not None:
+            self.__encoded.extend(self.__huffman.finish())
+        else:
+            self.__encoded.extend(self.__encodedHeaders)
+            self.__encoded.extend(self.__encodedBody)
 
     def __encode_fixed_header(self):
         encoded = CCNxCompressorFixedHeader.compress(self.__parser.fixed_header, self.__context_id)
@@ -81,17 +102,20 @@ class CCNxCompressor(object):
         encoded = self.__fixed_length_compressor.compress(list)
         return encoded
 
-    @staticmethod
-    def __encode_variable_length_value(list):
+    def __encode_variable_length_value(self, list):
         """
         Try to compress the top TLV in the list using a variable-length key.
 
         :param list: A list of TLVs to compress
         :return:  The compressed TLV or None
         """
+        compression_dict = None
+        if self.__dictionary is not None:
+            compression_dict = self.__dictionary.compression_dict
+
         encoded = None
         tlv = list[0]
-        encoded = CCNxCompressorVariableLength.compress(tlv)
+        encoded = CCNxCompressorVariableLength.compress(tlv, compression_dict)
         if encoded is not None:
             list.pop(0)
             if tlv.value is not None:
@@ -99,35 +123,120 @@ class CCNxCompressor(object):
         return encoded
 
     @staticmethod
-    def __compact_tlv(tlv):
+    def __compact_tlv(tlv_list):
         """
-        The given TLV cannot be compressed, so encode it using 2+2
+        The top TLV cannot be compressed, so encode it using 2+2
 
-        :param tlv: The TLV to encode
+        :param tlv_list: A list of TLVs to compress
         :return: The wire format string
         """
-        tlv = list.pop(0)
+        tlv = tlv_list.pop(0)
         print "Could not compress type {} length {}".format(tlv.type, tlv.length)
         encoded = CCNxCompressorVariableLength.compact(tlv)
-        if tlv.length > 0:
+        if tlv.value is not None:
             encoded.extend(tlv.value)
         return encoded
 
-    def __encode_tlv_list(self, list):
+    def __encode_numeric_value(self, list, numeric_types):
+        """
+        If the top TLV is a number and we have a context, try the numeric value codec.
+
+        :return: The encoded TLV or None
+        """
+        tlv = list[0]
+        if self.__context is None or tlv.type not in numeric_types or tlv.value is None:
+            return None
+
+        encoded = self.__context.compress_number(tlv)
+        if encoded is not None:
+            list.pop(0)
+        return encoded
+
+    def __encode_payload(self, list):
+        """
+        If the top TLV is the payload and we have a context, try the context's payload compression.
+        Name segments have the same type number, so we go by the parser's payload TLV.
+
+        :return: The encoded TLV or None
+        """
+        tlv = list[0]
+        payload_tlv = self.__parser.payload_tlv
+        if self.__context is None or payload_tlv is None or tlv.type != T_PAYLOAD \
+                or tlv.value is None or tlv.value is not payload_tlv.value:
+            return None
+
+        encoded = self.__context.compress_payload(tlv)
+        if encoded is not None:
+            list.pop(0)
+        return encoded
+
+    def __encode_learned(self, list, numeric_types):
+        result = self.__encode_numeric_value(list, numeric_types)
+        if result is None:
+            result = self.__encode_payload(list)
+        return result
+
+    def __encode_tlv_list_huffman(self, list, numeric_types):
+        while len(list) > 0:
+            result = self.__encode_learned(list, numeric_types)
+            if result is None:
+                self.__huffman.compress(list.pop(0))
+            else:
+                self.__huffman.compress_learned(result)
+        return []
+
+    def __encode_tlv_list(self, list, numeric_types=()):
+        if self.__huffman is not None:
+            return self.__encode_tlv_list_huffman(list, numeric_types)
+
         output = []
         # See if the FixedLength dictionary can consume tokens
         while len(list) > 0:
-            result = self.__encode_fixed_length_value(list)
+            result = self.__encode_learned(list, numeric_types)
             if result is None:
-                result = self.__encode_variable_length_value(list)
+                result = self.__encode_fixed_length_value(list)
                 if result is None:
-                    result = self.__compact_tlv(list)
+                    result = self.__encode_variable_length_value(list)
+                    if result is None:
+                        result = self.__compact_tlv(list)
             output.extend(result)
         return output
 
     def __encode_headers(self):
-        self.__encodedHeaders = self.__encode_tlv_list(self.__parser.headers)
+        self.__encodedHeaders = self.__encode_tlv_list(self.__parser.headers, _numeric_header_types)
 
     def __encode_body(self):
         linear_body = self.__parser.linearize_body()
-        self.__encodedBody = self.__encode_tlv_list(linear_body)
+        if self.__context is not None and self.__parser.name_tlv is not None:
+            self.__encodedBody = self.__encode_body_with_context(linear_body)
+        else:
+            self.__encodedBody = self.__encode_tlv_list(linear_body, _numeric_body_types)
+
+    def __encode_body_with_context(self, linear_body):
+        """
+        Interests are remembered in the context.  A Content Object whose name matches
+        a pending Interest has its T_NAME and name segments replaced by a name reference.
+
+        :param linear_body: The linearized body
+        :return: The encoded body
+        """
+        name_segments = self.__parser.name_tlv.value
+        message_type = linear_body[0].type
+
+        if message_type == T_INTEREST:
+            self.__context.interest_seen(name_segments)
+
+        elif message_type == T_OBJECT and len(linear_body) > 1 and linear_body[1].type == T_NAME:
+            reference = self.__context.compress_name(name_segments)
+            if reference is not None:
+                output = self.__encode_tlv_list([linear_body.pop(0)])
+                # skip the T_NAME container and its segments
+                del linear_body[0:1 + len(name_segments)]
+                if self.__huffman is not None:
+                    self.__huffman.compress_learned(reference)
+                else:
+                    output.extend(reference)
+                output.extend(self.__encode_tlv_list(linear_body, _numeric_body_types))
+                return output
+
+        return self.__encode_tlv_list(linear_body, _numeric_body_types)
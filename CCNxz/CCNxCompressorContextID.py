@@ -39,8 +39,18 @@ _cid_6_7_max = 63
 _bits_3 = 0x07
 _bits_7 = 0x7F
 
+# The CRC3 of a single byte is one lookup from the initial register
+_crc3_table = CRC3().table
+_crc3_shift = 8 - CRC3.width
+_crc3_initial = (0xFF << _crc3_shift) & 0xFF
+
 
 class CCNxCompressorContextID(object):
+    @staticmethod
+    def crc3(byte0):
+        """The CRC3 of one byte from the initial state, by table lookup"""
+        return _crc3_table[_crc3_initial ^ byte0] >> _crc3_shift
+
     @staticmethod
     def encode(context_id):
         """
@@ -51,19 +61,12 @@ class CCNxCompressorContextID(object):
         """
         if context_id <= _cid_3_3_max:
             byte0 = _cid_3_3_pattern | (context_id << 3)
-            crc = CRC3()
-            crc.update_byte(byte0)
-            crc_output = crc.finalize()
-            byte0 |= crc_output
+            byte0 |= CCNxCompressorContextID.crc3(byte0)
             output = [byte0]
         elif context_id <= _cid_6_7_max:
             byte0 = _cid_6_7_pattern | (context_id >> 1)
             byte1 = (context_id & 0x01) << 7
-            crc = CRC7()
-            crc.update_byte(byte0)
-            crc.update_byte(byte1)
-            crc_output = crc.finalize()
-            byte1 |= crc_output
+            byte1 |= CRC7.compute([byte0, byte1])
             output = [byte0, byte1]
         else:
             raise ValueError("context_id {} too large, max {}".format(context_id, _cid_6_7_max))
@@ -85,9 +88,7 @@ class CCNxCompressorContextID(object):
             packet_crc = byte0 & _bits_3
             byte0 &= ~_bits_3
 
-            crc = CRC3()
-            crc.update_byte(byte0)
-            calculated_crc = crc.finalize()
+            calculated_crc = CCNxCompressorContextID.crc3(byte0)
 
             if calculated_crc == packet_crc:
                 # extract the context_id and return it as integer
@@ -101,11 +102,7 @@ class CCNxCompressorContextID(object):
             packet_crc = byte1 & _bits_7
             byte1 &= ~_bits_7
 
-            crc = CRC7()
-            crc.update_byte(byte0)
-            crc.update_byte(byte1)
-
-            calculated_crc = crc.finalize()
+            calculated_crc = CRC7.compute([byte0, byte1])
 
             if calculated_crc == packet_crc:
                 # extract the context_id and return it as integer
@@ -156,10 +156,33 @@ class CCNxCompressorFixedLength(object):
     __trie = _generate_trie(__tuples)
     __keys = _generate_keys(__tuples)
 
-    def __init__(self):
-        self.__walker = CCNxTrieWalker(self.__trie)
+    def __init__(self, dictionary=None):
+        """
+        :param dictionary: Optional CCNxDictionary to use instead of the installed table
+        """
+        trie = self.__trie
+        if dictionary is not None:
+            trie = dictionary.trie
+        self.__walker = CCNxTrieWalker(trie)
         self.__last_match = None
 
+    @classmethod
+    def install(cls, tuples):
+        """
+        Replace the built-in table, e.g. with one loaded from a dictionary file (see
+        CCNxDictionary).  Compressors created after this use the new table.
+
+        :param tuples: A list of Tuples
+        """
+        cls.__tuples = tuples
+        cls.__trie = _generate_trie(tuples)
+        cls.__keys = _generate_keys(tuples)
+
+    @classmethod
+    def tuples(cls):
+        """The installed list of Tuples"""
+        return cls.__tuples
+
     @staticmethod
     def isFixedLengthToken(type):
         masked = type & 0b11000000
@@ -180,7 +203,7 @@ class CCNxCompressorFixedLength(object):
 
         finished = False
         list_offset = 0
-        while not finished:
+        while not finished and list_offset < len(tlv_list):
             tlv = tlv_list[list_offset]
             packed = [tlv.type >> 8, tlv.type & 0xFF, tlv.length >> 8, tlv.length & 0xFF]
             for byte in packed:
@@ -227,19 +250,23 @@ class CCNxCompressorFixedLength(object):
         return None
 
     @staticmethod
-    def decompress(byte_array):
+    def decompress(byte_array, keys=None):
         """
         Decompress one or more TL pairs.  Will consume bytes from byte_array that are decoded.
 
         :param byte_array: The input byte stream
+        :param keys: Optional key to Tuple dictionary (CCNxDictionary.keys) instead of the installed table
         :return: A list of bytes or None
         """
 
+        if keys is None:
+            keys = CCNxCompressorFixedLength.__keys
+
         output = None
         byte0 = byte_array[0]
         if CCNxCompressorFixedLength.isFixedLengthToken(byte0):
             try:
-                tuple = CCNxCompressorFixedLength.__keys[byte0]
+                tuple = keys[byte0]
                 output = tuple.token_string
                 byte_array.pop(0)
 
@@ -0,0 +1,164 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+An alternative TL codec that entropy codes the TL pairs with a canonical Huffman code
+(see CCNxHuffmanCode) instead of the byte oriented fixed length and variable length keys.
+It is used when the context's dictionary carries a Huffman code.
+
+The TL pairs and the values are split into two streams.  After the compressed fixed header:
+
+    v{8}+               length in bytes of the bit stream (varint)
+    b{8}*               bit stream of Huffman coded TL pairs, 0 padded to a byte
+    x{8}*               value stream: the values and the bytes of any learned tokens, in order
+
+A learned token (numeric value or name reference) is coded as the LEARNED symbol and its
+bytes, exactly as CCNxCompressionContext writes them, go in the value stream.  A TL pair
+that is not in the code is coded as ESCAPE followed by the raw 16-bit type and length.
+"""
+
+__author__ = 'mmosko'
+
+from CCNx.CCNxTypes import *
+from CCNxz.CCNxHuffmanCode import *
+from CCNxz.CCNxCompressorNumericValue import CCNxCompressorNumericValue
+from CCNxz.CCNxCompressorFixedHeader import CCNxCompressorFixedHeader
+from CCNxz.CCNxCompressorVariableLength import CCNxCompressorVariableLength
+
+
+class CCNxCompressorHuffman(object):
+    """Encodes the TL pairs of one packet"""
+    def __init__(self, code):
+        """
+        :param code: A CCNxHuffmanCode
+        """
+        self.__encode_table = code.encode_table
+        self.__writer = CCNxBitWriter()
+        self.__values = []
+
+    def compress(self, tlv):
+        """Append a TLV.  Containers have a value of None."""
+        symbol = tl_symbol(tlv.type, tlv.length)
+        entry = self.__encode_table.get(symbol)
+        if entry is None:
+            code, length = self.__encode_table[ESCAPE]
+            self.__writer.write(code, length)
+            self.__writer.write(tlv.type, 16)
+            self.__writer.write(tlv.length, 16)
+        else:
+            self.__writer.write(entry[0], entry[1])
+
+        if tlv.value is not None:
+            self.__values.extend(tlv.value)
+
+    def compress_learned(self, token):
+        """
+        Append a learned token from CCNxCompressionContext
+
+        :param token: list of bytes
+        """
+        code, length = self.__encode_table[LEARNED]
+        self.__writer.write(code, length)
+        self.__values.extend(token)
+
+    def finish(self):
+        """
+        :return: The varint length, the bit stream, and the value stream as a list of bytes
+        """
+        bits = self.__writer.flush()
+        output = CCNxCompressorNumericValue.encode_varint(len(bits))
+        output.extend(bits)
+        output.extend(self.__values)
+        return output
+
+
+class CCNxDecompressorHuffman(object):
+    """
+    Decodes the TL pairs of one packet.  After decompress_fixed_header the byte array
+    only has the value stream left in it, which the parser reads as usual.
+    """
+    def __init__(self, code, context=None):
+        """
+        :param code: A CCNxHuffmanCode
+        :param context: CCNxCompressionContext to decode learned tokens, or None
+        """
+        self.__code = code
+        self.__context = context
+        self.__reader = None
+        self.__name_bytes = 0
+
+    def decompress_fixed_header(self, byte_array):
+        fixed_header = CCNxCompressorFixedHeader.decompress(byte_array)
+        if fixed_header is None:
+            raise ValueError("Byte array could not be decoded as fixed header")
+
+        length = CCNxCompressorNumericValue.decode_varint(byte_array)
+        if length > len(byte_array):
+            raise ValueError("Huffman bit stream length {} past end of packet".format(length))
+        self.__reader = CCNxBitReader(list(byte_array[0:length]))
+        del byte_array[0:length]
+        return fixed_header
+
+    def decompress_type_length(self, byte_array):
+        """
+        :param byte_array: The value stream
+        :return: List of 4 bytes
+        """
+        if self.__name_bytes > 0:
+            return self.__decompress_name_segment(byte_array)
+
+        symbol = self.__reader.decode(self.__code)
+        if symbol == ESCAPE:
+            tlv_type = self.__reader.read(16)
+            length = self.__reader.read(16)
+        elif symbol == LEARNED:
+            return self.__decompress_learned(byte_array)
+        else:
+            tlv_type = symbol >> 16
+            length = symbol & 0xFFFF
+
+        return [tlv_type >> 8, tlv_type & 0xFF, length >> 8, length & 0xFF]
+
+    # ###### Private API
+
+    def __decompress_learned(self, byte_array):
+        if self.__context is None or len(byte_array) == 0:
+            raise ValueError("Learned token without a context")
+
+        result = self.__context.decompress_type_length(byte_array)
+        if result is None:
+            raise ValueError("Could not decode learned token {}".format(hex(byte_array[0])))
+
+        # A name reference puts the name segments back in the value stream as byte oriented
+        # tokens, so we read the next length bytes of TL pairs from there and not from the bits
+        if (result[0] << 8) | result[1] == T_NAME:
+            self.__name_bytes = (result[2] << 8) | result[3]
+        return result
+
+    def __decompress_name_segment(self, byte_array):
+        result = CCNxCompressorVariableLength.decompress(byte_array)
+        if result is None:
+            raise ValueError("Could not decode name segment", byte_array)
+        self.__name_bytes -= 4 + ((result[2] << 8) | result[3])
+        return result
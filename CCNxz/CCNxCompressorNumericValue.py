@@ -0,0 +1,202 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Value codec for TLVs that carry a big-endian number (expiry time, chunk numbers,
+interest lifetime, ...).  The number is written as a varint, or as a zigzag varint
+delta against a per-context base for that TLV type.
+
+Compressed Format: (learned, see CCNxCompressionContext)
+11110lll 0ttttttt v{8}+             Absolute (3-bit L - 1, 7-bit T, varint)
+11110lll 1ttttttt c{8} v{8}+        Delta (3-bit L - 1, 7-bit T, crc8 of base, zigzag varint)
+
+The original value length is kept in 'lll', so leading zero bytes (such as the
+8-byte T_EXPIRY) are restored exactly.
+
+An absolute value sets the base for its type on both sides.  A delta is only sent
+once a base exists.  Because the base is only changed by absolute values, losing
+a delta packet does not disturb the peer; losing the packet that set the base does.
+The crc8 of the base in each delta lets the peer detect that and refuse to decode
+with the wrong base (see CCNxLinkFrame for how the bases are refreshed).
+"""
+
+__author__ = 'mmosko'
+
+from CCNx.CCNxTlv import *
+from CCNxz.crc8 import *
+
+_pattern = 0xF0
+_mask = 0xF8
+_delta_flag = 0x80
+_bits_7 = 0x7F
+_max_value_length = 8
+
+
+class CCNxCompressorNumericValue(object):
+    def __init__(self):
+        """
+        One instance holds the bases for one direction of one context.  The compressor
+        and decompressor of a link each need their own instance.
+        """
+        self.__bases = {}
+
+    @staticmethod
+    def is_numeric_token(byte0):
+        return (byte0 & _mask) == _pattern
+
+    @property
+    def bases(self):
+        """dictionary from TLV type to the current base"""
+        return self.__bases
+
+    def install(self, bases):
+        """
+        Replace all bases, e.g. from a context refresh
+
+        :param bases: dictionary from TLV type to base
+        """
+        self.__bases = dict(bases)
+
+    @staticmethod
+    def base_check(base):
+        """The crc8 of the 8-byte big-endian base"""
+        return CRC8.compute([(base >> (8 * i)) & 0xFF for i in range(7, -1, -1)])
+
+    # ###### Varints
+
+    @staticmethod
+    def encode_varint(n):
+        """
+        LEB128 style: 7 bits per byte, least significant group first, high bit means more.
+
+        :param n: A non-negative integer
+        :return: list of bytes
+        """
+        if n < 0:
+            raise ValueError("varint must not be negative: {}".format(n))
+        output = []
+        while n >= 0x80:
+            output.append((n & _bits_7) | 0x80)
+            n >>= 7
+        output.append(n)
+        return output
+
+    @staticmethod
+    def decode_varint(byte_array):
+        """
+        Pops a varint off the front of byte_array.
+
+        :return: The integer
+        :raises ValueError: if the varint is truncated or too long
+        """
+        n = 0
+        shift = 0
+        while True:
+            if len(byte_array) == 0 or shift > 63:
+                raise ValueError("Bad varint")
+            byte = byte_array.pop(0)
+            n |= (byte & _bits_7) << shift
+            shift += 7
+            if byte & 0x80 == 0:
+                return n
+
+    @staticmethod
+    def zigzag(n):
+        if n < 0:
+            return (-n << 1) - 1
+        return n << 1
+
+    @staticmethod
+    def unzigzag(n):
+        if n & 1:
+            return -((n + 1) >> 1)
+        return n >> 1
+
+    # ###### Codec
+
+    def compress(self, tlv):
+        """
+        Encode a numeric TLV if that is shorter than a 1-byte TL token plus the raw value.
+
+        :param tlv: A terminal CCNxTlv
+        :return: list of bytes or None
+        """
+        if tlv.value is None or tlv.type > _bits_7 or not 0 < tlv.length <= _max_value_length:
+            return None
+
+        value = CCNxTlv.array_to_number(tlv.value)
+        byte0 = _pattern | (tlv.length - 1)
+
+        encoded = None
+        base = self.__bases.get(tlv.type)
+        if base is not None:
+            encoded = [byte0, _delta_flag | tlv.type, self.base_check(base)]
+            encoded.extend(self.encode_varint(self.zigzag(value - base)))
+
+        absolute = [byte0, tlv.type] + self.encode_varint(value)
+        if encoded is None or len(absolute) < len(encoded):
+            encoded = absolute
+
+        if len(encoded) >= 1 + tlv.length:
+            return None
+
+        if encoded is absolute:
+            self.__bases[tlv.type] = value
+        return encoded
+
+    def decompress(self, byte_array):
+        """
+        Pops a numeric token off byte_array.  Returns the TL pair and the value
+
+        :param byte_array: The input byte stream
+        :return: (list of 4 TL bytes, list of value bytes)
+        :raises ValueError: On a truncated token, or a delta without a base or with the wrong base
+        """
+        if len(byte_array) < 2:
+            raise ValueError("Truncated numeric token")
+        byte0 = byte_array.pop(0)
+        byte1 = byte_array.pop(0)
+        length = (byte0 & 0x07) + 1
+        tlv_type = byte1 & _bits_7
+
+        if byte1 & _delta_flag:
+            if len(byte_array) < 1:
+                raise ValueError("Truncated numeric delta")
+            check = byte_array.pop(0)
+            n = self.decode_varint(byte_array)
+            base = self.__bases.get(tlv_type)
+            if base is None:
+                raise ValueError("Numeric delta for type {} without a base".format(tlv_type))
+            if self.base_check(base) != check:
+                raise ValueError("Numeric delta for type {} has the wrong base".format(tlv_type))
+            value = base + self.unzigzag(n)
+        else:
+            value = self.decode_varint(byte_array)
+            self.__bases[tlv_type] = value
+
+        if value < 0 or value >= (1 << (8 * length)):
+            raise ValueError("Numeric value {} does not fit in {} bytes".format(value, length))
+
+        value_bytes = [(value >> (8 * i)) & 0xFF for i in range(length - 1, -1, -1)]
+        return [tlv_type >> 8, tlv_type & 0xFF, 0, length], value_bytes
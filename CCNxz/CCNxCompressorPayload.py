@@ -0,0 +1,194 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Payload compression.  A compressed T_PAYLOAD is a learned token that decodes to the
+T_PAYLOAD TL pair and the original value.  There are two codecs:
+
+    11111100 v{8}+ m{8}*                m is an MPPC packet of length v (varint)
+    11111101 v{8}+ z{8}*                z is a CCNxLz77 block of length v (varint)
+
+MPPC (RFC 2118, see mppc.py) keeps one history across all the payloads it sends, so
+the compressor must be paired with one decompressor that sees the payloads in order.
+The MPPC coherency count tells the decompressor when it missed a packet.  It then
+refuses every packet until one arrives with the history flushed (A bit), which the
+compressor sends after reset().  CCNxCompressionContext resets the compressor when
+the peer sends a NACK.
+
+LZ77 compresses each payload on its own, primed with the payload dictionary of the
+context's CCNxDictionary (if it has one).  There is no state to lose, which suits
+lossy links.
+
+Before compressing, the compressor estimates the payload's byte entropy from a sample.
+Payloads that look random (already compressed or encrypted) are left alone, as are
+short ones.  Either codec can always be decompressed.
+"""
+
+__author__ = 'mmosko'
+
+import math
+
+from CCNx.CCNxTypes import *
+from CCNxz.CCNxCompressorNumericValue import CCNxCompressorNumericValue
+from CCNxz.CCNxLz77 import CCNxLz77
+from mppc import MCCP, MCCPDecoder, _flag_flushed
+
+_mppc_token = 0xFC
+_lz77_token = 0xFD
+_max_mppc_length = 8192
+_sample_length = 1024
+
+MPPC = "mppc"
+LZ77 = "lz77"
+payload_codecs = [MPPC, LZ77]
+
+
+class CCNxCompressorPayload(object):
+    def __init__(self, codec=None, lz77=None, min_length=64, entropy_limit=7.0):
+        """
+        :param codec: MPPC or LZ77 to compress with, None to only decompress
+        :param lz77: The CCNxLz77 (with the payload dictionary) to use, None for one without a dictionary
+        :param min_length: Shorter payloads are not compressed
+        :param entropy_limit: Payloads whose sample has more bits of entropy per byte are not
+                              compressed.  For samples shorter than 256 bytes it is scaled down
+                              to log2(sample length) bits, the most a sample that short can have.
+        """
+        if codec is not None and codec not in payload_codecs:
+            raise ValueError("Unknown payload codec: {}".format(codec))
+        if lz77 is None:
+            lz77 = CCNxLz77()
+
+        self.__codec = codec
+        self.__lz77 = lz77
+        self.__min_length = min_length
+        self.__entropy_limit = entropy_limit
+        self.__encoder = MCCP()
+        self.__decoder = MCCPDecoder()
+        self.__expected_count = None
+
+    @property
+    def codec(self):
+        return self.__codec
+
+    @staticmethod
+    def is_payload_token(byte0):
+        return byte0 == _mppc_token or byte0 == _lz77_token
+
+    @staticmethod
+    def is_lz77_token(byte0):
+        return byte0 == _lz77_token
+
+    @staticmethod
+    def sample_entropy(value):
+        """
+        :param value: list of bytes
+        :return: The Shannon entropy in bits per byte of an evenly spaced sample of value
+        """
+        stride = max(1, len(value) // _sample_length)
+        sample = value[0::stride][0:_sample_length]
+        counts = {}
+        for byte in sample:
+            counts[byte] = counts.get(byte, 0) + 1
+
+        n = float(len(sample))
+        return -sum((c / n) * math.log(c / n, 2) for c in counts.values())
+
+    def reset(self):
+        """Flush the MPPC history, as the peer lost track of it"""
+        self.__encoder.reset()
+
+    def compress(self, tlv):
+        """
+        :param tlv: A T_PAYLOAD CCNxTlv
+        :return: The token as a list of bytes, or None to send the payload as-is
+        """
+        length = tlv.length
+        if self.__codec is None or tlv.type != T_PAYLOAD or tlv.value is None or length < self.__min_length:
+            return None
+        if self.__codec == MPPC and length > _max_mppc_length:
+            return None
+
+        value = list(tlv.value)
+        limit = self.__entropy_limit * min(8.0, math.log(length, 2)) / 8.0
+        if self.sample_entropy(value) > limit:
+            return None
+
+        if self.__codec == MPPC:
+            token = [_mppc_token]
+            compressed = self.__encoder.compress(bytearray(value))
+        else:
+            token = [_lz77_token]
+            compressed = self.__lz77.compress(value)
+
+        token.extend(CCNxCompressorNumericValue.encode_varint(len(compressed)))
+        token.extend(compressed)
+        if self.__codec == LZ77 and len(token) >= length:
+            # no state changed, so we can still send it as-is
+            return None
+        return token
+
+    def decompress(self, byte_array):
+        """
+        Pops a payload token off the front of byte_array
+
+        :return: (list of 4 bytes TL, list of bytes value)
+        :raises ValueError: If the token is bad or the MPPC history is out of sync
+        """
+        byte0 = byte_array.pop(0)
+        length = CCNxCompressorNumericValue.decode_varint(byte_array)
+        if length > len(byte_array):
+            raise ValueError("Truncated payload token")
+        compressed = list(byte_array[0:length])
+        del byte_array[0:length]
+
+        if byte0 == _mppc_token:
+            value = self.__decompress_mppc(compressed)
+        else:
+            value = self.__lz77.decompress(compressed)
+
+        if len(value) > 0xFFFF:
+            raise ValueError("Payload too long: {}".format(len(value)))
+        value = [ord(c) for c in value]
+        return [T_PAYLOAD >> 8, T_PAYLOAD & 0xFF, len(value) >> 8, len(value) & 0xFF], value
+
+    @property
+    def in_sync(self):
+        """True if the next MPPC payload does not need a flushed history"""
+        return self.__expected_count is not None
+
+    # ###### Private API
+
+    def __decompress_mppc(self, packet):
+        flags, count = MCCPDecoder.parse_header(packet)
+        if not flags & _flag_flushed and count != self.__expected_count:
+            raise ValueError("MPPC history out of sync: expected {} got {}".format(self.__expected_count, count))
+
+        try:
+            value = self.__decoder.decompress(packet)
+        except ValueError:
+            self.__expected_count = None
+            raise
+
+        self.__expected_count = (count + 1) & 0xFFFF
+        return value
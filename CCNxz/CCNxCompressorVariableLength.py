@@ -137,19 +137,35 @@ class CCNxCompressorVariableLength(object):
     # ###### PUBLIC API
 
     @staticmethod
-    def decompress(byte_array):
+    def install(vles):
+        """
+        Replace the built-in entries, e.g. with ones loaded from a dictionary file (see
+        CCNxDictionary).
+
+        :param vles: A list of VariableLengthEntry
+        """
+        CCNxCompressorVariableLength._vles = vles
+        CCNxCompressorVariableLength._compression_dict = _generate_compression_dictionary(vles)
+        CCNxCompressorVariableLength._decompression_dict = _generate_decompression_dictionary(vles)
+
+    @staticmethod
+    def decompress(byte_array, decompression_dict=None):
         """
         Decompress a TL pair
 
         :param byte_array: The input byte stream
+        :param decompression_dict: Optional key to entry dictionary (CCNxDictionary.decompression_dict)
         :return: A list of bytes or None
         """
+        if decompression_dict is None:
+            decompression_dict = CCNxCompressorVariableLength._decompression_dict
+
         byte0 = byte_array[0]
         decoded = None
         if (byte0 & _mask_3_4) == _pattern_3_4:
-            decoded = CCNxCompressorVariableLength.__decompress_3_4(byte_array)
+            decoded = CCNxCompressorVariableLength.__decompress_3_4(byte_array, decompression_dict)
         elif (byte0 & _mask_4_9) == _pattern_4_9:
-            decoded = CCNxCompressorVariableLength.__decompress_4_9(byte_array)
+            decoded = CCNxCompressorVariableLength.__decompress_4_9(byte_array, decompression_dict)
         elif (byte0 & _mask_15_5) == _pattern_15_5:
             decoded = CCNxCompressorVariableLength.__decompress_15_5(byte_array)
         elif (byte0 & _mask_16_10) == _pattern_16_10:
@@ -160,25 +176,29 @@ class CCNxCompressorVariableLength(object):
         return decoded
 
     @staticmethod
-    def compress(tlv):
+    def compress(tlv, compression_dict=None):
         """
         Perform a dictionary substitution on the T and encode the L
         with the smallest available bits
 
         :param tlv:
+        :param compression_dict: Optional (type, pattern) to entry dictionary (CCNxDictionary.compression_dict)
         :return:
         """
         if not type(tlv) == CCNxTlv:
             raise TypeError("tlv must be CCNxTlv")
 
+        if compression_dict is None:
+            compression_dict = CCNxCompressorVariableLength._compression_dict
+
         encoded = None
         if tlv.length < _length_3_4:
-            vle = CCNxCompressorVariableLength.__find_pattern(tlv, _pattern_3_4)
+            vle = CCNxCompressorVariableLength.__find_pattern(tlv, _pattern_3_4, compression_dict)
             if vle is not None:
                 encoded = CCNxCompressorVariableLength.__compress_pattern_3_4(tlv, vle)
 
         if encoded is None and tlv.length < _length_4_9:
-            vle = CCNxCompressorVariableLength.__find_pattern(tlv, _pattern_4_9)
+            vle = CCNxCompressorVariableLength.__find_pattern(tlv, _pattern_4_9, compression_dict)
             if vle is not None:
                 encoded = CCNxCompressorVariableLength.__compress_pattern_4_9(tlv, vle)
 
@@ -208,10 +228,10 @@ class CCNxCompressorVariableLength(object):
     # #### Compression
 
     @staticmethod
-    def __find_pattern(tlv, pattern):
+    def __find_pattern(tlv, pattern, compression_dict):
         try:
             lookup_key = (tlv.type, pattern)
-            vle = CCNxCompressorVariableLength._compression_dict[lookup_key]
+            vle = compression_dict[lookup_key]
             return vle
 
         except KeyError:
@@ -268,12 +288,12 @@ class CCNxCompressorVariableLength(object):
 
     # #### Decompression
     @staticmethod
-    def __decompress_3_4(byte_array):
+    def __decompress_3_4(byte_array, decompression_dict):
         output = None
         byte0 = byte_array[0]
         key = byte0 & 0xF0
         try:
-            vle = CCNxCompressorVariableLength._decompression_dict[key]
+            vle = decompression_dict[key]
             length = byte0 & 0x0F
 
             output = [vle.type >> 8, vle.type & 0xFF, length >> 8, length & 0xFF]
@@ -286,12 +306,12 @@ class CCNxCompressorVariableLength(object):
         return output
 
     @staticmethod
-    def __decompress_4_9(byte_array):
+    def __decompress_4_9(byte_array, decompression_dict):
         output = None
         byte0 = byte_array[0]
         key = byte0 & 0xFE
         try:
-            vle = CCNxCompressorVariableLength._decompression_dict[key]
+            vle = decompression_dict[key]
 
             byte_array.pop(0)
             byte1 = byte_array.pop(0)
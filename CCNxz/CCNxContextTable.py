@@ -0,0 +1,577 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+The compression contexts of one relay-to-relay link.
+
+Each compressed packet carries a context ID (see CCNxCompressorContextID).  A context ID
+selects a CCNxCompressionContext, and so a dictionary and its learned state.  Context ID 1
+always uses the built-in dictionary, so two relays can talk before they agree on anything.
+
+Context IDs are chosen by the sender.  The contexts we compress with (tx) and the contexts
+the peer compresses with (rx) are separate, so both relays may pick the same ID.  All of
+them share one CCNxPendingInterestTable, as an Interest and its Content Object may cross
+the link in different contexts.
+
+Rolling over to a new dictionary:
+
+    1) rollover() creates a tx context for the dictionary with a new context ID and
+       sends ANNOUNCE (context ID, dictionary id, digest) ahead of our frames every
+       announce_interval seconds.  We keep compressing with the old context.
+    2) If the peer has loaded the same dictionary, it creates an rx context and answers
+       ACCEPT.  Otherwise it answers REJECT and we keep announcing.
+    3) On ACCEPT we compress with the new context.  The peer keeps its old rx contexts
+       (up to max_rx_contexts) so packets already in flight still decode.
+
+A packet for a context the peer does not know (e.g. it restarted) gets a REJECT, and we
+fall back to context 1 and announce again.
+
+The learned state of every context can be saved and loaded (save_state, load_state) so
+a restart does not start from empty numeric bases.  The pending Interest table is not
+saved as its entries only live for a few seconds.  Neither are MPPC payload histories
+(see CCNxCompressorPayload), which start flushed after a restart.
+"""
+
+__author__ = 'mmosko'
+
+import json
+import threading
+import time
+
+from CCNxz.CCNxCompressionContext import *
+from CCNxz.CCNxCompressorContextID import *
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxFec import *
+from CCNxz.CCNxLinkFrame import *
+from CCNxz.CCNxPendingInterestTable import *
+
+_builtin_context_id = 1
+_max_context_id = 63
+_state_format = 1
+
+_counter_names = ['announces_sent', 'accepts_received', 'rejects_received', 'rejects_sent', 'rollovers',
+                  'unknown_contexts', 'frames_corrupt', 'bundles_sent', 'bundled_frames']
+
+
+class CCNxContextTable(object):
+    def __init__(self, announce_interval=1.0, reject_holdoff=1.0, max_rx_contexts=4, clock=time.time,
+                 payload_compression=None, frame_check=None, fec_group=0, fec_repair=1, fec_adaptive=False,
+                 bundle_size=0, bundle_delay=0.0005):
+        """
+        :param announce_interval: Seconds between ANNOUNCEs of a pending context
+        :param reject_holdoff: Minimum seconds between two REJECTs of an unknown context
+        :param max_rx_contexts: How many peer contexts to keep, including context 1
+        :param clock: Function returning the current time in seconds
+        :param payload_compression: Payload codec of our tx contexts ("mppc" or "lz77") or None
+        :param frame_check: Whole-frame trailer on every datagram to and from the peer
+                            (CCNxLinkFrame.CHECK_CRC8 or CHECK_CRC32C) or None
+        :param fec_group: Send FEC over groups of this many datagrams (see CCNxFec), 0 for none
+        :param fec_repair: Repair packets per FEC group, the most to use if fec_adaptive
+        :param fec_adaptive: Adapt the repair packets to the loss the peer reports
+        :param bundle_size: Bundle frames into datagrams of up to this many bytes, 0 for none
+        :param bundle_delay: Seconds a frame may wait for others to bundle with
+        """
+        if frame_check is not None and frame_check not in CCNxLinkFrame.frame_checks:
+            raise ValueError("Unknown frame check {}".format(frame_check))
+
+        self.__announce_interval = announce_interval
+        self.__reject_holdoff = reject_holdoff
+        self.__max_rx_contexts = max_rx_contexts
+        self.__clock = clock
+        self.__payload_compression = payload_compression
+        self.__frame_check = frame_check
+        self.__fec_encoder = None
+        if fec_group > 0:
+            self.__fec_encoder = CCNxFecEncoder(fec_group, fec_repair, fec_adaptive, max_repair=max(1, fec_repair))
+        self.__fec_decoder = CCNxFecDecoder(clock=clock)
+        self.__sealed_replies = []
+        self.__bundle_size = bundle_size
+        # a bundle is sent in a FEC packet and with the frame check, so it must leave room for them
+        self.__bundle_budget = bundle_size - CCNxLinkFrame.check_length(frame_check)
+        if self.__fec_encoder is not None:
+            self.__bundle_budget -= CCNxFecEncoder.overhead
+        self.__bundle_delay = bundle_delay
+        self.__bundle = []
+        self.__bundle_bytes = 0
+        self.__bundle_deadline = None
+        self.__lock = threading.RLock()
+        self.__pending_interests = CCNxPendingInterestTable()
+        self.__counters = dict.fromkeys(_counter_names, 0)
+
+        builtin = CCNxDictionary.builtin()
+        self.__dictionaries = {}
+        self.add_dictionary(builtin)
+
+        self.__tx = {_builtin_context_id: self.__create(_builtin_context_id, builtin)}
+        self.__rx = {_builtin_context_id: self.__create(_builtin_context_id, builtin)}
+        self.__rx_order = [_builtin_context_id]
+        self.__active = _builtin_context_id
+        self.__pending = None
+        self.__last_announce = None
+        self.__reject = None
+        self.__last_reject = None
+
+    @property
+    def active_context_id(self):
+        return self.__active
+
+    @property
+    def pending_context_id(self):
+        return self.__pending
+
+    @property
+    def frame_check(self):
+        return self.__frame_check
+
+    @property
+    def pending_interests(self):
+        return self.__pending_interests
+
+    @property
+    def counters(self):
+        """The table counters plus the sum of every context's counters"""
+        with self.__lock:
+            counters = dict(self.__counters)
+            sources = self.__tx.values() + self.__rx.values() + [self.__fec_decoder]
+            if self.__fec_encoder is not None:
+                sources.append(self.__fec_encoder)
+            for source in sources:
+                for key, value in source.counters.items():
+                    counters[key] = counters.get(key, 0) + value
+            return counters
+
+    # ###### Dictionaries
+
+    def add_dictionary(self, dictionary):
+        """Make a dictionary available for contexts the peer announces"""
+        with self.__lock:
+            self.__dictionaries[(dictionary.dictionary_id, dictionary.digest)] = dictionary
+
+    def rollover(self, dictionary):
+        """
+        Start moving our compression to a new dictionary.  Nothing changes until the
+        peer accepts it.
+
+        :param dictionary: The new CCNxDictionary
+        :return: The context ID that will use the dictionary
+        """
+        with self.__lock:
+            self.add_dictionary(dictionary)
+            for context_id in [self.__active, self.__pending]:
+                if context_id is not None and self.__same(self.__tx[context_id].dictionary, dictionary):
+                    return context_id
+
+            if self.__pending is not None:
+                del self.__tx[self.__pending]
+
+            context_id = self.__next_context_id()
+            self.__tx[context_id] = self.__create(context_id, dictionary)
+            self.__pending = context_id
+            self.__last_announce = None
+            self.__counters['rollovers'] += 1
+            self.__prune_tx()
+            return context_id
+
+    # ###### Compression side
+
+    def compression_context(self):
+        """The context to compress the next packet with"""
+        with self.__lock:
+            return self.__tx[self.__active]
+
+    def compress(self, encode):
+        """
+        Compress a packet with the active context and frame it.  The table lock is held
+        throughout, so a NACK handled on another thread does not reset the context's MPPC
+        history or read its bases while the packet is being compressed with them.
+
+        :param encode: A function of the CCNxCompressionContext returning the compressed packet
+        :return: A list of datagrams to send in order
+        """
+        with self.__lock:
+            context = self.__tx[self.__active]
+            return self.frame(context, encode(context))
+
+    def frame(self, context, packet):
+        """
+        Frame a packet compressed with context, see compress().  An ANNOUNCE of the pending context
+        goes ahead of it when one is due.
+
+        :return: A list of datagrams to send in order
+        """
+        datagrams = []
+        with self.__lock:
+            if self.__pending is not None:
+                now = self.__clock()
+                if self.__last_announce is None or now - self.__last_announce >= self.__announce_interval:
+                    self.__last_announce = now
+                    self.__counters['announces_sent'] += 1
+                    dictionary = self.__tx[self.__pending].dictionary
+                    datagrams.append(CCNxLinkFrame.encode_binding(CCNxLinkFrame.ANNOUNCE, self.__pending,
+                                                                  dictionary.dictionary_id, dictionary.digest))
+        datagrams.extend(context.frame(packet))
+        if self.__bundle_size > 0:
+            return self.__seal(self.__add_to_bundle(datagrams))
+        return self.__seal(datagrams)
+
+    def bundle_wait(self, timeout):
+        """
+        :param timeout: The most we want to wait, in seconds
+        :return: How long we may wait before bundle_flush() has to be called
+        """
+        with self.__lock:
+            if self.__bundle_deadline is None:
+                return timeout
+            return max(0.0, min(timeout, self.__bundle_deadline - self.__clock()))
+
+    def bundle_flush(self, force=False):
+        """
+        Send the current bundle if it has waited bundle_delay (or if force).
+
+        :return: The datagrams to send to the peer (may be empty)
+        """
+        with self.__lock:
+            if self.__bundle_deadline is None:
+                return []
+            if not force and self.__clock() < self.__bundle_deadline:
+                return []
+            return self.__seal(self.__close_bundle())
+
+    def __add_to_bundle(self, datagrams):
+        """
+        :return: The bundles that are full and must be sent now
+        """
+        output = []
+        with self.__lock:
+            for datagram in datagrams:
+                size = len(datagram) + CCNxLinkFrame.bundle_overhead(datagram)
+                if len(self.__bundle) > 0 and 1 + self.__bundle_bytes + size > self.__bundle_budget:
+                    output.extend(self.__close_bundle())
+                if len(self.__bundle) == 0:
+                    self.__bundle_deadline = self.__clock() + self.__bundle_delay
+                self.__bundle.append(datagram)
+                self.__bundle_bytes += size
+        return output
+
+    def __close_bundle(self):
+        bundle = self.__bundle
+        self.__bundle = []
+        self.__bundle_bytes = 0
+        self.__bundle_deadline = None
+        if len(bundle) == 0:
+            return []
+        if len(bundle) == 1:
+            return bundle
+        self.__counters['bundles_sent'] += 1
+        self.__counters['bundled_frames'] += len(bundle)
+        return [CCNxLinkFrame.encode_bundle(bundle)]
+
+    def fec_flush(self):
+        """
+        Close the current FEC group, e.g. when the link goes idle.
+
+        :return: The repair datagrams to send to the peer
+        """
+        with self.__lock:
+            if self.__fec_encoder is None:
+                return []
+            return self.__check(self.__fec_encoder.flush())
+
+    def __seal(self, datagrams):
+        """The datagrams as sent on the link: in FEC packets if configured, then with the frame check"""
+        with self.__lock:
+            if self.__fec_encoder is not None:
+                encoded = []
+                for datagram in datagrams:
+                    encoded.extend(self.__fec_encoder.encode(datagram))
+                datagrams = encoded
+            return self.__check(datagrams)
+
+    def __check(self, datagrams):
+        if self.__frame_check is not None:
+            for datagram in datagrams:
+                CCNxLinkFrame.append_check(datagram, self.__frame_check)
+        return datagrams
+
+    # ###### Decompression side
+
+    def verify_frame(self, byte_array):
+        """
+        Check and strip the whole-frame trailer of a received datagram, before any
+        other processing.  Does nothing if there is no frame check.
+
+        :param byte_array: The received datagram, modified in place
+        :return: False if the datagram is corrupt and must be dropped
+        """
+        if self.__frame_check is None:
+            return True
+        if CCNxLinkFrame.strip_check(byte_array, self.__frame_check):
+            return True
+        with self.__lock:
+            self.__counters['frames_corrupt'] += 1
+        return False
+
+    def receive_link(self, byte_array):
+        """
+        Take a received datagram (after verify_frame) out of its FEC packet and bundle.
+        Datagrams come out in order, so one held behind a loss may come out with a later one.
+
+        :param byte_array: The received datagram
+        :return: The list of datagrams now ready to process (may be empty)
+        :raises ValueError: If the FEC packet or bundle is bad
+        """
+        with self.__lock:
+            return self.__unbundle(self.__fec_decoder.receive(list(byte_array)))
+
+    def fec_expire(self):
+        """
+        :return: Datagrams held too long behind a loss FEC did not repair, now ready to process
+        """
+        with self.__lock:
+            return self.__unbundle(self.__fec_decoder.expire())
+
+    @staticmethod
+    def __unbundle(datagrams):
+        output = []
+        for datagram in datagrams:
+            output.extend(CCNxLinkFrame.decode_bundle(datagram))
+        return output
+
+    def decompression_context(self, byte_array):
+        """
+        Find the context of a received compressed packet (optionally in a sequenced frame).
+        Does not consume any bytes.
+
+        :return: A CCNxCompressionContext
+        :raises ValueError: If the context ID is bad or unknown
+        """
+        offset = 0
+        if CCNxLinkFrame.is_sequenced(byte_array[0]):
+            offset = 1
+        context_id = CCNxCompressorContextID.decode(list(byte_array[offset:offset + 2]))
+        if context_id is None:
+            raise ValueError("Context ID failed crc")
+
+        with self.__lock:
+            context = self.__rx.get(context_id)
+            if context is None:
+                self.__counters['unknown_contexts'] += 1
+                self.__reject = context_id
+                raise ValueError("Unknown context ID {}".format(context_id))
+            return context
+
+    def pending_replies(self):
+        """
+        :return: A list of messages (NACKs, REJECTs) to send back to the peer
+        """
+        replies = []
+        with self.__lock:
+            for context_id in self.__rx_order:
+                nack = self.__rx[context_id].pending_nack()
+                if nack is not None:
+                    replies.append(nack)
+
+            if self.__reject is not None:
+                now = self.__clock()
+                if self.__last_reject is None or now - self.__last_reject >= self.__reject_holdoff:
+                    self.__last_reject = now
+                    self.__counters['rejects_sent'] += 1
+                    replies.append(CCNxLinkFrame.encode_binding(CCNxLinkFrame.REJECT, self.__reject, 0, 0))
+                self.__reject = None
+
+            report = self.__fec_decoder.pending_report()
+            if report is not None:
+                replies.append(report)
+
+            sealed = self.__sealed_replies
+            self.__sealed_replies = []
+            return sealed + self.__seal(replies)
+
+    # ###### Control messages
+
+    def receive_control(self, byte_array):
+        """
+        Process a control message from the peer.
+
+        :param byte_array: The received datagram, after verify_frame()
+        :return: A reply to send to the peer (list of bytes) or None
+        """
+        reply = self.__receive_control(list(byte_array))
+        if reply is not None:
+            replies = self.__seal([reply])
+            with self.__lock:
+                # if the reply closed a FEC group, its repairs go out with the next pending_replies()
+                self.__sealed_replies.extend(replies[1:])
+            reply = replies[0]
+        return reply
+
+    def __receive_control(self, byte_array):
+        if len(byte_array) < 2:
+            return None
+
+        message_type = byte_array[0]
+        context_id = byte_array[1]
+        with self.__lock:
+            if message_type == CCNxLinkFrame.NACK and context_id in self.__tx:
+                return self.__tx[context_id].receive_control(byte_array)
+            if message_type == CCNxLinkFrame.REFRESH and context_id in self.__rx:
+                return self.__rx[context_id].receive_control(byte_array)
+            if message_type == CCNxLinkFrame.FEC_REPORT:
+                if self.__fec_encoder is not None:
+                    self.__fec_encoder.receive_report(byte_array)
+                return None
+
+            try:
+                message_type, context_id, dictionary_id, digest = CCNxLinkFrame.decode_binding(byte_array)
+            except ValueError:
+                return None
+
+            if message_type == CCNxLinkFrame.ANNOUNCE:
+                return self.__receive_announce(context_id, dictionary_id, digest)
+            if message_type == CCNxLinkFrame.ACCEPT:
+                self.__receive_accept(context_id, dictionary_id, digest)
+            elif message_type == CCNxLinkFrame.REJECT:
+                self.__receive_reject(context_id)
+            return None
+
+    # ###### Persistence
+
+    def save_state(self, path):
+        with self.__lock:
+            state = {"format": _state_format, "active": self.__active, "pending": self.__pending,
+                     "tx": self.__export(self.__tx, self.__tx.keys()),
+                     "rx": self.__export(self.__rx, self.__rx_order)}
+        with open(path, "w") as fh:
+            json.dump(state, fh, indent=1, sort_keys=True)
+
+    def load_state(self, path):
+        """
+        Restore contexts saved by save_state().  Contexts whose dictionary has not been
+        added are skipped.  A restored non built-in context is announced again before
+        we compress with it, as the peer may not have kept its state.
+
+        :raises ValueError: If the file is not a saved state
+        """
+        with open(path, "r") as fh:
+            state = json.load(fh)
+        if state.get("format") != _state_format:
+            raise ValueError("Unsupported state format: {}".format(state.get("format")))
+
+        with self.__lock:
+            for entry in state["rx"]:
+                context = self.__import(entry)
+                if context is not None:
+                    self.__add_rx(context)
+
+            for entry in state["tx"]:
+                context = self.__import(entry)
+                if context is not None:
+                    self.__tx[context.context_id] = context
+
+            for context_id in [state.get("active"), state.get("pending")]:
+                if context_id is not None and context_id != _builtin_context_id and context_id in self.__tx:
+                    self.__pending = context_id
+                    self.__last_announce = None
+            self.__prune_tx()
+
+    # ###### Private API
+
+    def __create(self, context_id, dictionary):
+        return CCNxCompressionContext(context_id, pending_interests=self.__pending_interests,
+                                      clock=self.__clock, dictionary=dictionary,
+                                      payload_compression=self.__payload_compression)
+
+    @staticmethod
+    def __same(a, b):
+        return a.dictionary_id == b.dictionary_id and a.digest == b.digest
+
+    def __next_context_id(self):
+        context_id = self.__active
+        while True:
+            context_id = context_id % _max_context_id + 1
+            if context_id != _builtin_context_id and context_id not in self.__tx:
+                return context_id
+
+    def __prune_tx(self):
+        for context_id in self.__tx.keys():
+            if context_id not in [_builtin_context_id, self.__active, self.__pending]:
+                del self.__tx[context_id]
+
+    def __add_rx(self, context):
+        context_id = context.context_id
+        if context_id in self.__rx_order:
+            self.__rx_order.remove(context_id)
+        self.__rx[context_id] = context
+        self.__rx_order.append(context_id)
+
+        while len(self.__rx_order) > self.__max_rx_contexts:
+            oldest = [c for c in self.__rx_order if c != _builtin_context_id][0]
+            self.__rx_order.remove(oldest)
+            del self.__rx[oldest]
+
+    def __receive_announce(self, context_id, dictionary_id, digest):
+        dictionary = self.__dictionaries.get((dictionary_id, digest))
+        if dictionary is None or context_id == _builtin_context_id:
+            self.__counters['rejects_sent'] += 1
+            return CCNxLinkFrame.encode_binding(CCNxLinkFrame.REJECT, context_id, dictionary_id, digest)
+
+        context = self.__rx.get(context_id)
+        if context is None or not self.__same(context.dictionary, dictionary):
+            self.__add_rx(self.__create(context_id, dictionary))
+        return CCNxLinkFrame.encode_binding(CCNxLinkFrame.ACCEPT, context_id, dictionary_id, digest)
+
+    def __receive_accept(self, context_id, dictionary_id, digest):
+        if context_id != self.__pending:
+            return
+        dictionary = self.__tx[context_id].dictionary
+        if (dictionary.dictionary_id, dictionary.digest) != (dictionary_id, digest):
+            return
+
+        self.__counters['accepts_received'] += 1
+        self.__active = context_id
+        self.__pending = None
+        self.__prune_tx()
+
+    def __receive_reject(self, context_id):
+        self.__counters['rejects_received'] += 1
+        if context_id == self.__active and context_id != _builtin_context_id:
+            # The peer lost our context, go back to the built-in one and announce again
+            self.__pending = context_id
+            self.__active = _builtin_context_id
+            self.__last_announce = None
+
+    @staticmethod
+    def __export(contexts, context_ids):
+        return [{"context_id": context_id,
+                 "dictionary_id": contexts[context_id].dictionary.dictionary_id,
+                 "digest": contexts[context_id].dictionary.digest,
+                 "state": contexts[context_id].export_state()} for context_id in context_ids]
+
+    def __import(self, entry):
+        dictionary = self.__dictionaries.get((entry["dictionary_id"], entry["digest"]))
+        if dictionary is None:
+            return None
+        context = self.__create(entry["context_id"], dictionary)
+        context.import_state(entry["state"])
+        return context
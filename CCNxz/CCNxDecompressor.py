@@ -30,6 +30,22 @@
 from CCNxCompressorFixedHeader import *
 from CCNxCompressorFixedLength import *
 from CCNxCompressorVariableLength import *
+from CCNxCompressorHuffman import CCNxDecompressorHuffman
+from CCNxTokenTable import CCNxTokenTable
+
+_installed = {"tuples": None, "vles": None, "table": None}
+
+
+def _installed_table():
+    """The CCNxTokenTable of the installed tables, rebuilt when a dictionary is installed"""
+    tuples = CCNxCompressorFixedLength.tuples()
+    vles = CCNxCompressorVariableLength._vles
+    if _installed["tuples"] is not tuples or _installed["vles"] is not vles:
+        _installed["table"] = CCNxTokenTable(dict((t.compressed_key, t) for t in tuples),
+                                             CCNxCompressorVariableLength._decompression_dict)
+        _installed["tuples"] = tuples
+        _installed["vles"] = vles
+    return _installed["table"]
 
 class CCNxDecompressor(object):
     @staticmethod
@@ -47,11 +63,80 @@ class CCNxDecompressor(object):
         return result
 
     @staticmethod
-    def decompress_type_length(byte_array):
-        result = CCNxCompressorFixedLength.decompress(byte_array)
+    def decompress_type_length(byte_array, dictionary=None):
+        """
+        :param byte_array: Input byte stream
+        :param dictionary: Optional CCNxDictionary to use instead of the installed one
+        :return: List of 4 bytes
+        """
+        if dictionary is None:
+            table = _installed_table()
+        else:
+            table = dictionary.token_table
+
+        result = table.decode(byte_array)
+        if result is None:
+            raise ValueError("Could not decode input as a type token", byte_array)
+
+        return result
+
+
+class _LearnedTokens(object):
+    """Passes learned tokens to the context, remembering their first byte and where they were"""
+    def __init__(self, context):
+        self.__context = context
+        self.tokens = []
+
+    def decompress_type_length(self, byte_array):
+        if len(byte_array) > 0:
+            self.tokens.append((byte_array[0], len(byte_array)))
+        return self.__context.decompress_type_length(byte_array)
+
+
+class CCNxContextDecompressor(object):
+    """
+    A decompressor for one compression context.  The dictionary's CCNxTokenTable picks the
+    decoder from the first byte of each token, handing learned tokens to the
+    CCNxCompressionContext.  If the dictionary has a Huffman code, the TL pairs are decoded
+    by CCNxDecompressorHuffman instead.
+
+    Holds per-packet state, so use a new one for each packet.
+    """
+    def __init__(self, context):
+        self.__context = context
+        self.__learned = _LearnedTokens(context)
+        self.__huffman = None
+        dictionary = context.dictionary
+        if dictionary is not None and dictionary.huffman_code is not None:
+            self.__huffman = CCNxDecompressorHuffman(dictionary.huffman_code, self.__learned)
+        if dictionary is None:
+            self.__table = _installed_table()
+        else:
+            self.__table = dictionary.token_table
+
+    @property
+    def context(self):
+        return self.__context
+
+    @property
+    def learned_tokens(self):
+        """
+        The learned tokens decoded so far, as (first byte, bytes left in the input
+        when the token was read)
+        """
+        return self.__learned.tokens
+
+    def decompress_fixed_header(self, byte_array):
+        if self.__huffman is not None:
+            return self.__huffman.decompress_fixed_header(byte_array)
+        return CCNxDecompressor.decompress_fixed_header(byte_array)
+
+    def decompress_type_length(self, byte_array):
+        if self.__huffman is not None:
+            return self.__huffman.decompress_type_length(byte_array)
+
+        result = self.__table.decode(byte_array, self.__learned)
         if result is None:
-            result = CCNxCompressorVariableLength.decompress(byte_array)
-            if result is None:
-                raise ValueError("Could not decode input as a type token", byte_array)
+            raise ValueError("Could not decode input as a type token", byte_array)
 
         return result
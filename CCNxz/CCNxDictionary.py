@@ -0,0 +1,245 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A compression dictionary: the fixed length tuple table (CCNxCompressorFixedLength) and
+the variable length entries (CCNxCompressorVariableLength) as data.
+
+The built-in dictionary is the hand-picked table in those modules and has dictionary_id 0.
+Trained dictionaries (see CCNxDictionaryTrainer) are saved as JSON:
+
+    {
+        "format": 1,
+        "dictionary_id": 7,
+        "tuples": [ {"key": 128, "token_string": [0, 2, 0, 0], "value_length": 0}, ... ],
+        "variable_length": [ {"type": 1, "pattern": "3_4", "key": 16}, ... ],
+        "huffman": [ [symbol, code_length], ... ],
+        "payload": "base64 bytes"
+    }
+
+"huffman" is optional.  If present, the TL pairs are coded with that canonical Huffman code
+(see CCNxCompressorHuffman) instead of the tuples and variable length keys.
+
+"payload" is optional.  It primes the LZ77 payload codec (see CCNxLz77).
+
+Two relays must use the same dictionary.  The digest (crc32 of the entries) lets them
+check that a dictionary with the same id really is the same (see CCNxContextTable).
+"""
+
+__author__ = 'mmosko'
+
+import base64
+import json
+import zlib
+
+from CCNxz.CCNxCompressorFixedLength import *
+from CCNxz.CCNxCompressorFixedLength import _generate_tuples, _generate_trie, _generate_keys
+from CCNxz.CCNxCompressorVariableLength import *
+from CCNxz.CCNxCompressorVariableLength import _generate_variable_length_entries, _pattern_3_4, _pattern_4_9
+from CCNxz.CCNxCompressorVariableLength import _generate_compression_dictionary, _generate_decompression_dictionary
+from CCNxz.CCNxHuffmanCode import CCNxHuffmanCode
+from CCNxz.CCNxLz77 import CCNxLz77
+from CCNxz.CCNxTokenTable import CCNxTokenTable
+
+_max_payload_dictionary = 0xFFFF
+
+_format = 1
+
+_pattern_names = {_pattern_3_4: "3_4", _pattern_4_9: "4_9"}
+_patterns = {"3_4": _pattern_3_4, "4_9": _pattern_4_9}
+
+# The keys each pattern may use
+_tuple_keys = range(0x80, 0xC0)
+_pattern_keys = {_pattern_3_4: range(0x00, 0x80, 0x10), _pattern_4_9: range(0xC0, 0xE0, 0x02)}
+
+
+class CCNxDictionary(object):
+    def __init__(self, dictionary_id, tuples, vles, huffman_code=None, payload_dictionary=None):
+        """
+        :param dictionary_id: Identifies the dictionary, 0 is the built-in one
+        :param tuples: A list of Tuple (fixed length entries)
+        :param vles: A list of VariableLengthEntry
+        :param huffman_code: Optional CCNxHuffmanCode for the TL pairs
+        :param payload_dictionary: Optional string of bytes to prime the LZ77 payload codec with
+        :raises ValueError: If the entries are not a valid dictionary
+        """
+        self.__dictionary_id = dictionary_id
+        self.__tuples = tuples
+        self.__vles = vles
+        self.__huffman_code = huffman_code
+        self.__payload_dictionary = payload_dictionary
+        self.__lz77 = None
+        self.__validate()
+
+        self.__trie = _generate_trie(tuples)
+        self.__keys = _generate_keys(tuples)
+        self.__compression_dict = _generate_compression_dictionary(vles)
+        self.__decompression_dict = _generate_decompression_dictionary(vles)
+        self.__token_table = CCNxTokenTable(self.__keys, self.__decompression_dict)
+
+        entries = self.to_dict()
+        del entries["dictionary_id"]
+        self.__digest = zlib.crc32(json.dumps(entries, sort_keys=True)) & 0xFFFFFFFF
+
+    @property
+    def dictionary_id(self):
+        return self.__dictionary_id
+
+    @property
+    def tuples(self):
+        return self.__tuples
+
+    @property
+    def vles(self):
+        return self.__vles
+
+    @property
+    def huffman_code(self):
+        """The CCNxHuffmanCode of the TL pairs or None"""
+        return self.__huffman_code
+
+    @property
+    def payload_dictionary(self):
+        return self.__payload_dictionary
+
+    @property
+    def lz77(self):
+        """A CCNxLz77 primed with the payload dictionary, indexed on first use"""
+        if self.__lz77 is None:
+            self.__lz77 = CCNxLz77(self.__payload_dictionary)
+        return self.__lz77
+
+    @property
+    def digest(self):
+        """32-bit crc of the entries"""
+        return self.__digest
+
+    @property
+    def trie(self):
+        """Token string to key trie for CCNxCompressorFixedLength"""
+        return self.__trie
+
+    @property
+    def keys(self):
+        """Key to Tuple dictionary for CCNxCompressorFixedLength.decompress"""
+        return self.__keys
+
+    @property
+    def compression_dict(self):
+        return self.__compression_dict
+
+    @property
+    def decompression_dict(self):
+        return self.__decompression_dict
+
+    @property
+    def token_table(self):
+        """First byte to decoder table for CCNxDecompressor"""
+        return self.__token_table
+
+    @staticmethod
+    def builtin():
+        """The hand-picked dictionary the compressors start with"""
+        return CCNxDictionary(0, _generate_tuples(), _generate_variable_length_entries())
+
+    def install(self):
+        """Make this the dictionary used by CCNxCompressor and CCNxDecompressor"""
+        CCNxCompressorFixedLength.install(self.__tuples)
+        CCNxCompressorVariableLength.install(self.__vles)
+
+    # ###### Files
+
+    def to_dict(self):
+        tuples = [{"key": t.compressed_key, "token_string": list(t.token_string), "value_length": t.value_length}
+                  for t in self.__tuples]
+        vles = [{"type": v.type, "pattern": _pattern_names[v.pattern], "key": v.key} for v in self.__vles]
+        d = {"format": _format, "dictionary_id": self.__dictionary_id, "tuples": tuples, "variable_length": vles}
+        if self.__huffman_code is not None:
+            d["huffman"] = sorted([symbol, length] for symbol, length in self.__huffman_code.code_lengths.items())
+        if self.__payload_dictionary is not None:
+            d["payload"] = base64.b64encode(self.__payload_dictionary)
+        return d
+
+    @staticmethod
+    def from_dict(d):
+        """
+        :raises ValueError: On an unknown format or a bad entry
+        """
+        if d.get("format") != _format:
+            raise ValueError("Unsupported dictionary format: {}".format(d.get("format")))
+        try:
+            tuples = [Tuple(list(t["token_string"]), t["key"], t["value_length"]) for t in d["tuples"]]
+            vles = [VariableLengthEntry(v["type"], _patterns[v["pattern"]], v["key"]) for v in d["variable_length"]]
+            huffman_code = None
+            if "huffman" in d:
+                huffman_code = CCNxHuffmanCode(dict((symbol, length) for symbol, length in d["huffman"]))
+            payload_dictionary = None
+            if "payload" in d:
+                payload_dictionary = base64.b64decode(d["payload"])
+            return CCNxDictionary(d["dictionary_id"], tuples, vles, huffman_code, payload_dictionary)
+        except (KeyError, TypeError) as err:
+            raise ValueError("Bad dictionary entry: {}".format(err))
+
+    def save(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.to_dict(), fh, indent=1, sort_keys=True)
+
+    @staticmethod
+    def load(path):
+        with open(path, "r") as fh:
+            return CCNxDictionary.from_dict(json.load(fh))
+
+    # ###### Private API
+
+    def __validate(self):
+        if not 0 <= self.__dictionary_id <= 0xFF:
+            raise ValueError("dictionary_id must fit in a byte: {}".format(self.__dictionary_id))
+        if self.__payload_dictionary is not None and len(self.__payload_dictionary) > _max_payload_dictionary:
+            raise ValueError("Payload dictionary longer than {} bytes".format(_max_payload_dictionary))
+
+        keys = set()
+        token_strings = set()
+        for t in self.__tuples:
+            token_string = t.token_string
+            if t.compressed_key not in _tuple_keys or t.compressed_key in keys:
+                raise ValueError("Bad or duplicate tuple key {}".format(hex(t.compressed_key)))
+            if tuple(token_string) in token_strings:
+                raise ValueError("Duplicate tuple token string for key {}".format(hex(t.compressed_key)))
+            if len(token_string) == 0 or len(token_string) % 4 != 0:
+                raise ValueError("Tuple {} is not a list of TL pairs".format(hex(t.compressed_key)))
+            if t.value_length != (token_string[-2] << 8) | token_string[-1]:
+                raise ValueError("Tuple {} value_length does not match its last L".format(hex(t.compressed_key)))
+            keys.add(t.compressed_key)
+            token_strings.add(tuple(token_string))
+
+        keys = set()
+        for v in self.__vles:
+            if v.pattern not in _pattern_keys or v.key not in _pattern_keys[v.pattern] or v.key in keys:
+                raise ValueError("Bad or duplicate variable length key {}".format(hex(v.key)))
+            if v.compressor_key in keys:
+                raise ValueError("Duplicate variable length entry for type {}".format(v.type))
+            if not 0 <= v.type <= 0xFFFF:
+                raise ValueError("Variable length type out of range: {}".format(v.type))
+            keys.add(v.key)
+            keys.add(v.compressor_key)
@@ -0,0 +1,270 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Trains a CCNxDictionary from a corpus of wire format packets.
+
+The trainer counts TL pairs with CCNxHuffman and keeps the TL sequence of every packet
+(headers and linearized body).  It then:
+
+1) Picks the variable length entries.  The 3_4 keys go to the types that save the most
+   over compact encoding with L < 16, then the 4_9 keys to the types that save the most
+   over whatever they cost after that.
+
+2) Picks the fixed length tuples.  A candidate is a run of up to max_tuple_pairs TL pairs
+   in which only the last may have a value (that is what CCNxCompressorFixedLength can
+   match).  The gain of a candidate is the number of bytes it saves over the corpus,
+   simulating the longest-match compressor with the tuples picked so far.  Tuples are
+   picked greedily by gain (lazily re-evaluated, as gains mostly shrink as more tuples
+   are picked) until the keys run out or nothing saves a byte.
+
+Value bytes are the same whatever the dictionary, so only TL bytes are counted.
+
+With huffman=True the dictionary also gets a canonical Huffman code built from the TL
+pair counts (see CCNxCompressorHuffman).  The LEARNED symbol is counted once for every
+TLV of a type the context may code as a learned numeric value.
+
+With payload_size > 0 the dictionary also gets an LZ77 payload dictionary of that many
+bytes, trained from the payloads of the corpus (see CCNxLz77.train_dictionary).
+"""
+
+__author__ = 'mmosko'
+
+import heapq
+
+from CCNx.CCNxParser import *
+from CCNxz.CCNxHuffman import *
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxDictionary import _tuple_keys, _pattern_keys
+from CCNxz.CCNxCompressorVariableLength import _pattern_3_4, _pattern_4_9, _length_3_4, _length_4_9
+from CCNxz.CCNxCompressor import _numeric_header_types, _numeric_body_types
+from CCNxz.CCNxHuffmanCode import *
+from CCNxz.CCNxLz77 import CCNxLz77
+
+_fixed_header_length = 8
+
+
+def _compact_cost(tlv_type, length):
+    """Bytes used by CCNxCompressorVariableLength.compact()"""
+    if length < 0x20 and tlv_type < 0x8000:
+        return 3
+    if length < 0x400:
+        return 4
+    return 5
+
+
+class CCNxDictionaryTrainer(object):
+    def __init__(self, max_tuple_pairs=4, max_candidates=256):
+        """
+        :param max_tuple_pairs: The longest run of TL pairs one tuple may hold
+        :param max_candidates: Only this many of the best candidates (by a naive count) are evaluated
+        """
+        self.__max_tuple_pairs = max_tuple_pairs
+        self.__max_candidates = max_candidates
+        self.__huffman = CCNxHuffman()
+        # TL sequence -> count.  Each entry in a sequence is (type, length, has_value)
+        self.__sequences = {}
+        self.__payloads = []
+        self.__packets = 0
+
+    @property
+    def packets(self):
+        return self.__packets
+
+    def add_packet(self, byte_array):
+        """
+        :param byte_array: One uncompressed packet (array.array or list of bytes)
+        """
+        parser = CCNxParser(byte_array)
+        parser.parse()
+
+        self.__huffman.addTlv(parser.headers)
+        self.__huffman.addParsedPacket(parser)
+
+        for tlv_list in [parser.headers, parser.linearize_body()]:
+            if len(tlv_list) > 0:
+                key = tuple((tlv.type, tlv.length, tlv.length > 0 and tlv.value is not None) for tlv in tlv_list)
+                self.__sequences[key] = self.__sequences.get(key, 0) + 1
+        if parser.payload_tlv is not None and parser.payload_tlv.value is not None:
+            self.__payloads.append(str(bytearray(parser.payload_tlv.value)))
+        self.__packets += 1
+
+    def add_file(self, path):
+        """
+        Add every packet in a file of back-to-back wire format packets
+
+        :raises ValueError: If a fixed header length does not fit the file
+        """
+        data = array.array("B")
+        with open(path, "rb") as fh:
+            data.fromstring(fh.read())
+
+        offset = 0
+        while offset < len(data):
+            if len(data) - offset < _fixed_header_length:
+                raise ValueError("{}: truncated fixed header at offset {}".format(path, offset))
+            packet_length = (data[offset + 2] << 8) | data[offset + 3]
+            if packet_length < _fixed_header_length or offset + packet_length > len(data):
+                raise ValueError("{}: bad packet length {} at offset {}".format(path, packet_length, offset))
+            self.add_packet(data[offset:offset + packet_length])
+            offset += packet_length
+
+    def train(self, dictionary_id=1, huffman=False, payload_size=0):
+        """
+        :param dictionary_id: The id to give the new dictionary
+        :param huffman: Also build a Huffman code for the TL pairs
+        :param payload_size: Size of the LZ77 payload dictionary, 0 for none
+        :return: A CCNxDictionary
+        """
+        vles = self.__train_variable_length()
+        tuples = self.__train_fixed_length(vles)
+        huffman_code = None
+        if huffman:
+            huffman_code = self.__train_huffman()
+        payload_dictionary = None
+        if payload_size > 0 and len(self.__payloads) > 0:
+            payload_dictionary = CCNxLz77.train_dictionary(self.__payloads, payload_size)
+        return CCNxDictionary(dictionary_id, tuples, vles, huffman_code, payload_dictionary)
+
+    def __train_huffman(self):
+        numeric_types = set(_numeric_header_types + _numeric_body_types)
+        counts = self.__huffman.counts()
+        counts[LEARNED] = sum(count for symbol, count in counts.items() if symbol >> 16 in numeric_types)
+        return CCNxHuffmanCode.from_counts(counts)
+
+    # ###### Variable length entries
+
+    def __train_variable_length(self):
+        counts = [(token.token, token.count) for token in self.__huffman.tokens.values()]
+
+        savings = {}
+        for (tlv_type, length), count in counts:
+            if length < _length_3_4:
+                savings[tlv_type] = savings.get(tlv_type, 0) + count * (_compact_cost(tlv_type, length) - 1)
+        types_3_4 = self.__best(savings, len(_pattern_keys[_pattern_3_4]))
+
+        savings = {}
+        for (tlv_type, length), count in counts:
+            if length < _length_4_9:
+                if tlv_type in types_3_4 and length < _length_3_4:
+                    continue
+                savings[tlv_type] = savings.get(tlv_type, 0) + count * (_compact_cost(tlv_type, length) - 2)
+        types_4_9 = self.__best(savings, len(_pattern_keys[_pattern_4_9]))
+
+        vles = [VariableLengthEntry(t, _pattern_3_4, k) for t, k in zip(types_3_4, _pattern_keys[_pattern_3_4])]
+        vles.extend(VariableLengthEntry(t, _pattern_4_9, k) for t, k in zip(types_4_9, _pattern_keys[_pattern_4_9]))
+        return vles
+
+    @staticmethod
+    def __best(savings, limit):
+        ranked = sorted(savings.items(), key=lambda item: (-item[1], item[0]))
+        return [tlv_type for tlv_type, saving in ranked[:limit] if saving > 0]
+
+    # ###### Fixed length tuples
+
+    def __train_fixed_length(self, vles):
+        types_3_4 = set(v.type for v in vles if v.pattern == _pattern_3_4)
+        types_4_9 = set(v.type for v in vles if v.pattern == _pattern_4_9)
+
+        def tl_cost(tlv_type, length):
+            if tlv_type in types_3_4 and length < _length_3_4:
+                return 1
+            if tlv_type in types_4_9 and length < _length_4_9:
+                return 2
+            return _compact_cost(tlv_type, length)
+
+        sequences = self.__sequences.items()
+        costs = [[tl_cost(t, l) for (t, l, v) in sequence] for sequence, count in sequences]
+
+        # Candidate -> indices of the sequences holding it, and a naive upper bound on its gain
+        holders = {}
+        bounds = {}
+        for index, (sequence, count) in enumerate(sequences):
+            for start in range(len(sequence)):
+                for end in range(start, min(len(sequence), start + self.__max_tuple_pairs)):
+                    candidate = tuple((t, l) for (t, l, v) in sequence[start:end + 1])
+                    holders.setdefault(candidate, set()).add(index)
+                    bounds[candidate] = bounds.get(candidate, 0) + count * (sum(costs[index][start:end + 1]) - 1)
+                    if sequence[end][2]:
+                        break
+
+        ranked = sorted((item for item in bounds.items() if item[1] > 0), key=lambda item: (-item[1], item[0]))
+        heap = [(-bound, candidate) for candidate, bound in ranked[:self.__max_candidates]]
+        heapq.heapify(heap)
+
+        selected = set()
+        current = [self.__sequence_cost(sequence, costs[i], selected) for i, (sequence, count) in enumerate(sequences)]
+        picked = []
+        while len(heap) > 0 and len(picked) < len(_tuple_keys):
+            bound, candidate = heapq.heappop(heap)
+            trial = selected | set([candidate])
+            gain = 0
+            for index in holders[candidate]:
+                sequence, count = sequences[index]
+                gain += count * (current[index] - self.__sequence_cost(sequence, costs[index], trial))
+
+            if gain <= 0:
+                continue
+            if len(heap) > 0 and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, candidate))
+                continue
+
+            selected = trial
+            picked.append(candidate)
+            for index in holders[candidate]:
+                current[index] = self.__sequence_cost(sequences[index][0], costs[index], selected)
+
+        tuples = []
+        for key, candidate in zip(_tuple_keys, picked):
+            token_string = []
+            for tlv_type, length in candidate:
+                token_string.extend([tlv_type >> 8, tlv_type & 0xFF, length >> 8, length & 0xFF])
+            tuples.append(Tuple(token_string, key, candidate[-1][1]))
+        return tuples
+
+    def __sequence_cost(self, sequence, costs, selected):
+        """
+        TL bytes CCNxCompressor would write for one sequence with the selected tuples
+
+        :param sequence: list of (type, length, has_value)
+        :param costs: The variable length cost of each TL pair in sequence
+        :param selected: set of candidates (tuples of (type, length))
+        """
+        total = 0
+        start = 0
+        while start < len(sequence):
+            longest = None
+            for end in range(start, min(len(sequence), start + self.__max_tuple_pairs)):
+                if tuple((t, l) for (t, l, v) in sequence[start:end + 1]) in selected:
+                    longest = end
+                if sequence[end][2]:
+                    break
+
+            if longest is None:
+                total += costs[start]
+                start += 1
+            else:
+                total += 1
+                start = longest + 1
+        return total
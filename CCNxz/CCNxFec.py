@@ -0,0 +1,448 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Forward error correction over groups of datagrams on the compressed link.
+
+The sender puts each datagram it sends to the peer in a FEC source packet.  After k
+source packets (or when the link goes idle) it closes the group and sends m repair
+packets.  Any n - m of the n packets of a group recover all of it:
+
+11110110 g{8} i{4} k{4} <datagram>      Source i of group g, the group has at most k + 1 sources
+11110111 g{8} j{4} n{4} <block>         Repair j of group g, the group had n + 1 sources
+11110111 g{8} 0{4} n{4}                 End of group g, the group had n + 1 sources
+
+A source is sent before the sender knows if the group will be closed early, so its k is
+the configured group size.  The repairs of a group carry its real size, and a group closed
+early without repairs (m = 0) ends with an empty repair packet that only carries the size.
+11111000 l{8} r{8}                      Report: l of the last r sources were lost
+
+The code is systematic Reed-Solomon over GF(256) with a Cauchy matrix.  Each source is
+coded as a block of its 2-byte length and its bytes, zero padded to the longest block
+of the group.  Repair row j has coefficient (x0 + y_i) / (x_j + y_i) for source i, with
+y_i = i and x_j = 16 + j.  Scaling the columns of a Cauchy matrix keeps every square
+submatrix invertible, and it makes row 0 all 1's, so with m = 1 the repair is plain
+XOR parity and a single loss is recovered with XORs only.
+
+The receiver hands the datagrams on in order.  Sources after a gap are held until a
+repair fills the gap, the next group starts, or they have been held for hold_time.
+Anything that is not a FEC packet is passed through, so a receiver always accepts FEC
+and only the sender needs to be configured for it.
+
+With adaptive coding the receiver reports its loss before recovery every
+report_interval groups, and the sender picks m from an average of the loss rate, from 1
+up to max_repair.
+"""
+
+__author__ = 'mmosko'
+
+import math
+import time
+
+from CCNxz.CCNxLinkFrame import *
+
+_max_group = 16
+_group_modulus = 256
+_repair_x = 16
+
+_encoder_counter_names = ['fec_sources_sent', 'fec_repairs_sent', 'fec_reports_received']
+_decoder_counter_names = ['fec_sources_received', 'fec_repairs_received', 'fec_recovered', 'fec_lost',
+                          'fec_late', 'fec_reports_sent']
+
+# ###### GF(256), polynomial x^8 + x^4 + x^3 + x^2 + 1
+
+
+def _generate_exp_log():
+    exp = [0] * 512
+    log = [0] * 256
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= 0x11D
+    for i in range(255, 512):
+        exp[i] = exp[i - 255]
+    return exp, log
+
+_exp, _log = _generate_exp_log()
+_mul_rows = {}
+
+
+def _mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return _exp[_log[a] + _log[b]]
+
+
+def _div(a, b):
+    if b == 0:
+        raise ZeroDivisionError("GF(256) division by 0")
+    if a == 0:
+        return 0
+    return _exp[_log[a] + 255 - _log[b]]
+
+
+def _mul_row(coefficient):
+    """The products of coefficient with every byte, cached"""
+    row = _mul_rows.get(coefficient)
+    if row is None:
+        row = [_mul(coefficient, b) for b in range(256)]
+        _mul_rows[coefficient] = row
+    return row
+
+
+def _mul_add(accumulator, coefficient, block):
+    """accumulator += coefficient * block, block may be shorter"""
+    if coefficient == 0:
+        return
+    if coefficient == 1:
+        for t in range(len(block)):
+            accumulator[t] ^= block[t]
+    else:
+        row = _mul_row(coefficient)
+        for t in range(len(block)):
+            accumulator[t] ^= row[block[t]]
+
+
+def _coefficient(j, i):
+    return _div(_repair_x ^ i, (_repair_x + j) ^ i)
+
+
+def _invert(matrix):
+    """Gauss-Jordan inverse of a square matrix over GF(256)"""
+    size = len(matrix)
+    work = [list(row) + [1 if c == r else 0 for c in range(size)] for r, row in enumerate(matrix)]
+    for column in range(size):
+        pivot = column
+        while work[pivot][column] == 0:
+            pivot += 1
+        work[column], work[pivot] = work[pivot], work[column]
+        scale = _div(1, work[column][column])
+        work[column] = [_mul(scale, v) for v in work[column]]
+        for r in range(size):
+            factor = work[r][column]
+            if r != column and factor != 0:
+                work[r] = [v ^ _mul(factor, p) for v, p in zip(work[r], work[column])]
+    return [row[size:] for row in work]
+
+
+def _block(datagram):
+    block = bytearray([len(datagram) >> 8, len(datagram) & 0xFF])
+    block.extend(datagram)
+    return block
+
+
+def _newer(group, current):
+    return 0 < (group - current) % _group_modulus < _group_modulus / 2
+
+
+class CCNxFecEncoder(object):
+    # bytes a FEC packet adds to the largest datagram of its group: a repair has the
+    # 3 byte header and codes the 2 byte length of each source with it
+    overhead = 5
+
+    def __init__(self, group_size=8, repair=1, adaptive=False, max_repair=4):
+        """
+        :param group_size: k, the number of datagrams in a group (at most 16)
+        :param repair: m, the number of repair packets per group (the start value if adaptive)
+        :param adaptive: Pick m from the peer's loss reports
+        :param max_repair: The largest m adaptive coding will use
+        """
+        if not 0 < group_size <= _max_group:
+            raise ValueError("FEC group size must be 1 to {}".format(_max_group))
+        if not 0 <= repair <= _max_group or not 1 <= max_repair <= _max_group:
+            raise ValueError("FEC repair count must be at most {}".format(_max_group))
+        self.__group_size = group_size
+        self.__repair = repair
+        self.__adaptive = adaptive
+        self.__max_repair = max_repair
+        self.__loss = 0.0
+        self.__group = 0
+        self.__blocks = []
+        self.__counters = dict.fromkeys(_encoder_counter_names, 0)
+
+    @property
+    def group_size(self):
+        return self.__group_size
+
+    @property
+    def repair(self):
+        """The number of repair packets the next group gets"""
+        return self.__repair
+
+    @property
+    def loss(self):
+        """The average loss rate the peer reported"""
+        return self.__loss
+
+    @property
+    def counters(self):
+        return dict(self.__counters)
+
+    def encode(self, datagram):
+        """
+        :param datagram: A datagram to send (list of bytes)
+        :return: The datagrams to send instead: its source packet, then the repairs if it
+                 finished a group
+        """
+        header = [CCNxLinkFrame.FEC_SOURCE, self.__group, (len(self.__blocks) << 4) | (self.__group_size - 1)]
+        output = [header + list(datagram)]
+        self.__counters['fec_sources_sent'] += 1
+        self.__blocks.append(_block(datagram))
+        if len(self.__blocks) == self.__group_size:
+            output.extend(self.flush())
+        return output
+
+    def flush(self):
+        """
+        Close the current group early, e.g. when the link goes idle.
+
+        :return: The repair packets of the group, or its end packet if it has no repairs (may be empty)
+        """
+        if len(self.__blocks) == 0:
+            return []
+
+        count = len(self.__blocks)
+        length = max(len(block) for block in self.__blocks)
+        output = []
+        for j in range(self.__repair):
+            repair = bytearray(length)
+            for i, block in enumerate(self.__blocks):
+                _mul_add(repair, _coefficient(j, i), block)
+            output.append([CCNxLinkFrame.FEC_REPAIR, self.__group, (j << 4) | (count - 1)] + list(repair))
+        self.__counters['fec_repairs_sent'] += len(output)
+        if len(output) == 0 and count < self.__group_size:
+            # the sources said group_size, tell the receiver where the group ended
+            output.append([CCNxLinkFrame.FEC_REPAIR, self.__group, count - 1])
+
+        self.__blocks = []
+        self.__group = (self.__group + 1) % _group_modulus
+        return output
+
+    def receive_report(self, byte_array):
+        """
+        Update the loss rate from a REPORT, and the repair count if adaptive.
+        :raises ValueError: If it is not a report
+        """
+        if len(byte_array) != 3 or byte_array[0] != CCNxLinkFrame.FEC_REPORT:
+            raise ValueError("Not a FEC report")
+        self.__counters['fec_reports_received'] += 1
+        lost = byte_array[1]
+        total = byte_array[2]
+        if total == 0:
+            return
+        self.__loss = 0.75 * self.__loss + 0.25 * (float(lost) / total)
+        if self.__adaptive:
+            # enough repairs for twice the expected loss of a group
+            repair = int(math.ceil(2.0 * self.__loss * self.__group_size))
+            self.__repair = max(1, min(self.__max_repair, repair))
+
+
+class CCNxFecDecoder(object):
+    def __init__(self, hold_time=0.5, report_interval=4, clock=time.time):
+        """
+        :param hold_time: Seconds to hold datagrams behind a gap waiting for a repair
+        :param report_interval: Groups between two loss REPORTs to the sender
+        :param clock: Function returning the current time in seconds
+        """
+        self.__hold_time = hold_time
+        self.__report_interval = report_interval
+        self.__clock = clock
+        self.__group = None
+        self.__count = None
+        self.__sources = {}
+        self.__repairs = {}
+        self.__recovered = 0
+        self.__next = 0
+        self.__held_since = None
+        self.__report_groups = 0
+        self.__report_lost = 0
+        self.__report_total = 0
+        self.__report = None
+        self.__counters = dict.fromkeys(_decoder_counter_names, 0)
+
+    @property
+    def counters(self):
+        return dict(self.__counters)
+
+    @staticmethod
+    def is_fec(byte0):
+        return byte0 == CCNxLinkFrame.FEC_SOURCE or byte0 == CCNxLinkFrame.FEC_REPAIR
+
+    def receive(self, byte_array):
+        """
+        :param byte_array: A received datagram (list of bytes)
+        :return: The list of datagrams (lists of bytes) that are now ready, in order, never empty ones
+        """
+        if len(byte_array) == 0:
+            return []
+        if not CCNxFecDecoder.is_fec(byte_array[0]):
+            return [byte_array]
+        if len(byte_array) < 3:
+            raise ValueError("Truncated FEC packet")
+
+        group = byte_array[1]
+        index = byte_array[2] >> 4
+        count = (byte_array[2] & 0x0F) + 1
+
+        released = []
+        if self.__group is None or _newer(group, self.__group):
+            released.extend(self.__advance(group))
+        elif group != self.__group:
+            self.__counters['fec_late'] += 1
+            return released
+
+        if byte_array[0] == CCNxLinkFrame.FEC_SOURCE:
+            self.__counters['fec_sources_received'] += 1
+            if index not in self.__sources:
+                self.__sources[index] = byte_array[3:]
+                if self.__count is None:
+                    self.__count = count
+                # a late source may be the one a held repair was waiting for
+                self.__recover()
+        elif len(byte_array) == 3:
+            # end of a group closed early without repairs
+            self.__count = count
+        else:
+            self.__counters['fec_repairs_received'] += 1
+            self.__repairs[index] = bytearray(byte_array[3:])
+            self.__count = count
+            self.__recover()
+
+        released.extend(self.__release())
+        if self.__next < self.__count and self.__held_since is None and len(self.__sources) > self.__next:
+            self.__held_since = self.__clock()
+        return released
+
+    def expire(self):
+        """
+        Give up on a gap that has been held for hold_time.
+
+        :return: The datagrams released
+        """
+        if self.__held_since is None or self.__clock() - self.__held_since < self.__hold_time:
+            return []
+        return self.__give_up()
+
+    def pending_report(self):
+        """
+        :return: A REPORT to send to the sender (list of bytes) or None
+        """
+        report = self.__report
+        self.__report = None
+        if report is not None:
+            self.__counters['fec_reports_sent'] += 1
+        return report
+
+    def __recover(self):
+        if self.__count is None:
+            return
+        missing = [i for i in range(self.__count) if i not in self.__sources]
+        if len(missing) == 0 or len(missing) > len(self.__repairs):
+            return
+
+        rows = sorted(self.__repairs.keys())[:len(missing)]
+        length = max(len(self.__repairs[j]) for j in rows)
+        blocks = {}
+        for i, datagram in self.__sources.items():
+            blocks[i] = _block(datagram)
+
+        remainders = []
+        for j in rows:
+            remainder = bytearray(length)
+            _mul_add(remainder, 1, self.__repairs[j])
+            for i, block in blocks.items():
+                _mul_add(remainder, _coefficient(j, i), block)
+            remainders.append(remainder)
+
+        inverse = _invert([[_coefficient(j, e) for e in missing] for j in rows])
+        for e, inverse_row in zip(missing, inverse):
+            block = bytearray(length)
+            for coefficient, remainder in zip(inverse_row, remainders):
+                _mul_add(block, coefficient, remainder)
+            size = (block[0] << 8) | block[1]
+            if size > length - 2:
+                raise ValueError("FEC recovered a bad length")
+            self.__sources[e] = list(block[2:2 + size])
+            self.__recovered += 1
+            self.__counters['fec_recovered'] += 1
+
+    def __release(self):
+        released = []
+        while self.__next in self.__sources:
+            # an empty source (corrupt, there are no empty datagrams on the link) is dropped
+            if len(self.__sources[self.__next]) > 0:
+                released.append(self.__sources[self.__next])
+            self.__next += 1
+            self.__held_since = None
+        if self.__count is not None and self.__next >= self.__count:
+            self.__held_since = None
+        return released
+
+    def __give_up(self):
+        """Release everything held, skipping the gaps"""
+        released = []
+        last = max(self.__sources.keys()) + 1 if len(self.__sources) > 0 else 0
+        for i in range(self.__next, last):
+            if i in self.__sources and len(self.__sources[i]) > 0:
+                released.append(self.__sources[i])
+        self.__next = max(self.__next, last)
+        self.__held_since = None
+        return released
+
+    def __advance(self, group):
+        released = []
+        if self.__group is not None:
+            released = self.__give_up()
+            if self.__count is not None or len(self.__sources) > 0:
+                self.__account()
+        self.__group = group
+        self.__count = None
+        self.__sources = {}
+        self.__repairs = {}
+        self.__recovered = 0
+        self.__next = 0
+        self.__held_since = None
+        return released
+
+    def __account(self):
+        """Count the losses of the group we are leaving, before and after recovery"""
+        count = self.__count
+        if count is None:
+            count = max(self.__sources.keys()) + 1
+        lost = max(0, count - len(self.__sources))
+        self.__counters['fec_lost'] += lost
+
+        self.__report_lost += lost + self.__recovered
+        self.__report_total += count
+        self.__report_groups += 1
+        if self.__report_interval > 0 and self.__report_groups >= self.__report_interval:
+            scale = max(1.0, self.__report_total / 255.0)
+            self.__report = [CCNxLinkFrame.FEC_REPORT, int(self.__report_lost / scale),
+                             int(self.__report_total / scale)]
+            self.__report_groups = 0
+            self.__report_lost = 0
+            self.__report_total = 0
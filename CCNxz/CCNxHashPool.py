@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Computes the SHA-256 hashes of a batch of messages on a pool of threads.
+
+CCNxMessage.hash() caches its digest, so once a batch has been through hash_all()
+later calls to hash() on those messages are free.  hashlib releases the GIL while
+it hashes a buffer of 2048 bytes or more, so the threads only run in parallel for
+messages at least that large.  For smaller messages the pool costs more than it saves,
+and threads=0 hashes the batch in the calling thread.
+"""
+
+__author__ = 'mmosko'
+
+from multiprocessing.pool import ThreadPool
+
+
+class CCNxHashPool(object):
+    def __init__(self, threads=2):
+        """
+        :param threads: The number of hashing threads, 0 to hash in the calling thread
+        """
+        if threads < 0:
+            raise ValueError("threads must be non-negative")
+
+        self.__threads = threads
+        self.__pool = None
+        if threads > 0:
+            self.__pool = ThreadPool(threads)
+
+    @property
+    def threads(self):
+        return self.__threads
+
+    def hash_all(self, messages):
+        """
+        :param messages: A list of CCNxMessage
+        :return: A list of the message hashes, in the same order
+        """
+        if self.__pool is None or len(messages) < 2:
+            return [message.hash() for message in messages]
+        return self.__pool.map(_hash, messages)
+
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+
+def _hash(message):
+    return message.hash()
@@ -30,6 +30,7 @@ __author__ = 'mmosko'
 import types
 
 from CCNx.CCNxParser import *
+from CCNxz.CCNxHuffmanCode import *
 
 
 class CCNxHuffmanToken(object):
@@ -52,6 +53,11 @@ class CCNxHuffman(object):
     def __init__(self):
         self.__tokens = {}
 
+    @property
+    def tokens(self):
+        """dictionary from token to CCNxHuffmanToken"""
+        return self.__tokens
+
     def addToken(self, token):
         try:
             hufftoken = self.__tokens[token]
@@ -81,8 +87,19 @@ class CCNxHuffman(object):
         for tlv in body:
             self.addTlv(tlv)
 
-    def analyze(self):
-        sortedlist = sorted(self.__tokens, key=lambda hufftoken: hufftoken.count)
-        #print "Sorted: ", sortedlist
+    def counts(self):
+        """
+        :return: dictionary from Huffman symbol (see CCNxHuffmanCode.tl_symbol) to count
+        """
+        return dict((tl_symbol(t, l), hufftoken.count) for (t, l), hufftoken in self.__tokens.items())
+
+    def analyze(self, max_code_length=15):
+        """
+        Build a canonical Huffman code from the token counts
+
+        :param max_code_length: The longest code allowed
+        :return: A CCNxHuffmanCode
+        """
+        return CCNxHuffmanCode.from_counts(self.counts(), max_code_length)
 
 
@@ -0,0 +1,248 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Canonical Huffman code for TL tokens.
+
+A symbol is a TL pair, (type << 16) | length, or one of two special symbols:
+
+    ESCAPE      followed in the bit stream by a raw 16-bit type and 16-bit length
+    LEARNED     the TL pair is a learned token (see CCNxCompressionContext) in the value stream
+
+A canonical code is fully described by the code length of each symbol, so that is all a
+dictionary needs to store.  Codes are assigned in (length, symbol) order.
+
+Encoding uses a symbol -> (code, length) table and an integer bit accumulator.  Decoding
+peeks max_code_length bits and does one lookup in a table of 2^max_code_length entries,
+rather than walking a tree bit by bit.  That table is why codes are limited to 16 bits.
+"""
+
+__author__ = 'mmosko'
+
+import heapq
+
+ESCAPE = 1 << 32
+LEARNED = ESCAPE + 1
+
+_default_max_code_length = 15
+_max_table_bits = 16
+
+
+def tl_symbol(tlv_type, length):
+    return (tlv_type << 16) | length
+
+
+class CCNxHuffmanCode(object):
+    def __init__(self, code_lengths):
+        """
+        :param code_lengths: dictionary from symbol to code length in bits
+        :raises ValueError: If the lengths do not make a complete prefix code
+        """
+        if len(code_lengths) < 2:
+            raise ValueError("A Huffman code needs at least 2 symbols")
+
+        self.__code_lengths = dict(code_lengths)
+        self.__max_code_length = max(code_lengths.values())
+        if self.__max_code_length > _max_table_bits:
+            raise ValueError("Codes longer than {} bits are not supported".format(_max_table_bits))
+
+        kraft = sum(1 << (self.__max_code_length - n) for n in code_lengths.values())
+        if min(code_lengths.values()) < 1 or kraft != 1 << self.__max_code_length:
+            raise ValueError("Code lengths are not a complete prefix code")
+
+        self.__encode_table = {}
+        self.__decode_table = [None] * (1 << self.__max_code_length)
+
+        code = 0
+        previous_length = 0
+        for symbol, length in sorted(code_lengths.items(), key=lambda item: (item[1], item[0])):
+            code <<= length - previous_length
+            previous_length = length
+            self.__encode_table[symbol] = (code, length)
+
+            entry = (symbol, length)
+            shift = self.__max_code_length - length
+            first = code << shift
+            for index in range(first, first + (1 << shift)):
+                self.__decode_table[index] = entry
+            code += 1
+
+    @property
+    def code_lengths(self):
+        return self.__code_lengths
+
+    @property
+    def max_code_length(self):
+        return self.__max_code_length
+
+    @property
+    def encode_table(self):
+        """dictionary from symbol to (code, length)"""
+        return self.__encode_table
+
+    @property
+    def decode_table(self):
+        """list indexed by the next max_code_length bits of (symbol, length)"""
+        return self.__decode_table
+
+    @staticmethod
+    def from_counts(counts, max_code_length=_default_max_code_length, add_escapes=True):
+        """
+        Build a length-limited code.
+
+        :param counts: dictionary from symbol to count
+        :param max_code_length: The longest code allowed
+        :param add_escapes: Make sure ESCAPE and LEARNED have a code
+        """
+        if not 1 <= max_code_length <= _max_table_bits:
+            raise ValueError("max_code_length must be 1 to {}".format(_max_table_bits))
+
+        counts = dict(counts)
+        if add_escapes:
+            for special in [ESCAPE, LEARNED]:
+                counts[special] = max(counts.get(special, 0), 1)
+
+        if len(counts) > 1 << max_code_length:
+            raise ValueError("{} symbols do not fit in {}-bit codes".format(len(counts), max_code_length))
+
+        lengths = CCNxHuffmanCode.__huffman_lengths(counts)
+        lengths = CCNxHuffmanCode.__limit_lengths(counts, lengths, max_code_length)
+        return CCNxHuffmanCode(lengths)
+
+    # ###### Private API
+
+    @staticmethod
+    def __huffman_lengths(counts):
+        # heap of (count, tie breaker, list of symbols under the node)
+        heap = [(count, symbol, [symbol]) for symbol, count in counts.items()]
+        heapq.heapify(heap)
+        lengths = dict.fromkeys(counts.keys(), 0)
+        while len(heap) > 1:
+            count_a, tie_a, symbols_a = heapq.heappop(heap)
+            count_b, tie_b, symbols_b = heapq.heappop(heap)
+            for symbol in symbols_a + symbols_b:
+                lengths[symbol] += 1
+            heapq.heappush(heap, (count_a + count_b, min(tie_a, tie_b), symbols_a + symbols_b))
+        return lengths
+
+    @staticmethod
+    def __limit_lengths(counts, lengths, max_code_length):
+        """
+        Limit the code lengths by moving leaves up the tree (JPEG Annex K.3), then give
+        the shortest codes to the most frequent symbols.
+        """
+        longest = max(lengths.values())
+        if longest <= max_code_length:
+            return lengths
+
+        bl_count = [0] * (longest + 1)
+        for length in lengths.values():
+            bl_count[length] += 1
+
+        for i in range(longest, max_code_length, -1):
+            while bl_count[i] > 0:
+                j = i - 2
+                while bl_count[j] == 0:
+                    j -= 1
+                bl_count[i] -= 2
+                bl_count[i - 1] += 1
+                bl_count[j + 1] += 2
+                bl_count[j] -= 1
+
+        ranked = sorted(counts.keys(), key=lambda symbol: (-counts[symbol], symbol))
+        limited = {}
+        length = 1
+        for symbol in ranked:
+            while bl_count[length] == 0:
+                length += 1
+            limited[symbol] = length
+            bl_count[length] -= 1
+        return limited
+
+
+class CCNxBitWriter(object):
+    """Packs codes most significant bit first"""
+    def __init__(self):
+        self.__output = []
+        self.__accumulator = 0
+        self.__bits = 0
+
+    def write(self, code, length):
+        self.__accumulator = (self.__accumulator << length) | code
+        self.__bits += length
+        while self.__bits >= 8:
+            self.__bits -= 8
+            self.__output.append((self.__accumulator >> self.__bits) & 0xFF)
+        self.__accumulator &= (1 << self.__bits) - 1
+
+    def flush(self):
+        """
+        Pad the last byte with 0 bits
+
+        :return: list of bytes
+        """
+        if self.__bits > 0:
+            self.write(0, 8 - self.__bits)
+        return self.__output
+
+
+class CCNxBitReader(object):
+    def __init__(self, byte_list):
+        self.__input = byte_list
+        self.__offset = 0
+        self.__accumulator = 0
+        self.__bits = 0
+
+    def __fill(self, length):
+        # Past the end of the input we read 0 bits, which is the padding
+        while self.__bits < length:
+            byte = 0
+            if self.__offset < len(self.__input):
+                byte = self.__input[self.__offset]
+            self.__offset += 1
+            self.__accumulator = (self.__accumulator << 8) | byte
+            self.__bits += 8
+
+    def read(self, length):
+        self.__fill(length)
+        self.__bits -= length
+        value = self.__accumulator >> self.__bits
+        self.__accumulator &= (1 << self.__bits) - 1
+        return value
+
+    def decode(self, code):
+        """
+        :param code: A CCNxHuffmanCode
+        :return: The next symbol
+        :raises ValueError: If we run past the end of the input
+        """
+        max_code_length = code.max_code_length
+        self.__fill(max_code_length)
+        index = self.__accumulator >> (self.__bits - max_code_length)
+        symbol, length = code.decode_table[index]
+        if self.__offset * 8 - self.__bits + length > len(self.__input) * 8:
+            raise ValueError("Huffman bit stream truncated")
+        self.__bits -= length
+        self.__accumulator &= (1 << self.__bits) - 1
+        return symbol
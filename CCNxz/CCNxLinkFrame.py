@@ -0,0 +1,310 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Framing used between two relays on the compressed link.  A compressed CCNx packet
+starts with a context ID (10xxxxxx or 110xxxxx).  The reserved 111xxxxx first
+bytes are used for relay-to-relay frames:
+
+1110ssss <compressed packet>            Sequenced frame, 4-bit sequence number
+11110001 i{8} n{8} (t{8} v{8}+)* c{8}   REFRESH: context i has n numeric bases, crc8
+11110010 i{8} s{8}                      NACK: context i lost state after sequence s
+11110011 i{8} d{8} h{32}                ANNOUNCE: context i will use dictionary d with digest h
+11110100 i{8} d{8} h{32}                ACCEPT: the receiver has dictionary d, context i may be used
+11110101 i{8} d{8} h{32}                REJECT: the receiver does not have dictionary d or context i
+11110110 g{8} i{4} k{4} <datagram>      FEC source packet (see CCNxFec)
+11110111 g{8} j{4} n{4} <block>         FEC repair packet
+11111000 l{8} r{8}                      FEC REPORT: l of the last r source packets were lost
+11111001 (n{varint} <datagram>)+        BUNDLE: several datagrams of n bytes each
+
+A REFRESH replaces all numeric bases of the receiver's decompression context.  The
+trailing CRC8 covers the whole message so a corrupted refresh is never installed.
+
+Both relays may also be configured with a whole-frame check: every datagram on the
+compressed link (frames, control messages, and FEC packets) gets a trailer, either a CRC8 (1 byte)
+or a CRC32C (4 bytes, network order), over all the bytes before it.  The receiver
+verifies and strips the trailer before looking at the frame, so a corrupt frame is
+dropped without touching any context state.
+
+A relay may bundle the frames it sends in one datagram, up to an MTU, to cut the
+datagrams per second of a link with small compressed packets.  Bundles are opened
+after the FEC and frame check, so to the rest of the relay they are just datagrams.
+"""
+
+__author__ = 'mmosko'
+
+from CCNxz.crc8 import *
+from CCNxz.crc32c import *
+from CCNxz.CCNxCompressorNumericValue import *
+
+_link_mask = 0xE0
+_sequenced_mask = 0xF0
+_sequenced_pattern = 0xE0
+_control_mask = 0xF0
+_control_pattern = 0xF0
+
+_bits_4 = 0x0F
+
+
+class CCNxLinkFrame(object):
+    REFRESH = 0xF1
+    NACK = 0xF2
+    ANNOUNCE = 0xF3
+    ACCEPT = 0xF4
+    REJECT = 0xF5
+    FEC_SOURCE = 0xF6
+    FEC_REPAIR = 0xF7
+    FEC_REPORT = 0xF8
+    BUNDLE = 0xF9
+
+    sequence_modulus = 16
+
+    CHECK_CRC8 = "crc8"
+    CHECK_CRC32C = "crc32c"
+    frame_checks = [CHECK_CRC8, CHECK_CRC32C]
+
+    @staticmethod
+    def is_link_frame(byte0):
+        return (byte0 & _link_mask) == _link_mask
+
+    @staticmethod
+    def is_sequenced(byte0):
+        return (byte0 & _sequenced_mask) == _sequenced_pattern
+
+    @staticmethod
+    def is_control(byte0):
+        return (byte0 & _control_mask) == _control_pattern
+
+    @staticmethod
+    def crc8(byte_list):
+        return CRC8.compute(byte_list)
+
+    # ###### Whole-frame check
+
+    @staticmethod
+    def append_check(datagram, frame_check):
+        """
+        :param datagram: The datagram to send (list of bytes), appended to in place
+        :param frame_check: CHECK_CRC8 or CHECK_CRC32C
+        :return: datagram
+        """
+        if frame_check == CCNxLinkFrame.CHECK_CRC8:
+            datagram.append(CRC8.compute(datagram))
+        elif frame_check == CCNxLinkFrame.CHECK_CRC32C:
+            crc = CRC32C.compute(datagram)
+            datagram.extend([(crc >> 24) & 0xFF, (crc >> 16) & 0xFF, (crc >> 8) & 0xFF, crc & 0xFF])
+        else:
+            raise ValueError("Unknown frame check {}".format(frame_check))
+        return datagram
+
+    @staticmethod
+    def strip_check(byte_array, frame_check):
+        """
+        Verify the trailer of a received datagram and pop it off.  A bad datagram
+        is not modified.
+
+        :param byte_array: The received datagram (list or array of bytes)
+        :param frame_check: CHECK_CRC8 or CHECK_CRC32C
+        :return: True if the trailer is good
+        """
+        if frame_check == CCNxLinkFrame.CHECK_CRC8:
+            if len(byte_array) < 2 or CRC8.compute(byte_array[:-1]) != byte_array[-1]:
+                return False
+            byte_array.pop()
+            return True
+
+        if frame_check == CCNxLinkFrame.CHECK_CRC32C:
+            if len(byte_array) < 5:
+                return False
+            crc = (byte_array[-4] << 24) | (byte_array[-3] << 16) | (byte_array[-2] << 8) | byte_array[-1]
+            if CRC32C.compute(byte_array[:-4]) != crc:
+                return False
+            del byte_array[-4:]
+            return True
+
+        raise ValueError("Unknown frame check {}".format(frame_check))
+
+    @staticmethod
+    def check_length(frame_check):
+        """
+        :param frame_check: CHECK_CRC8, CHECK_CRC32C or None
+        :return: The number of bytes append_check() adds
+        """
+        if frame_check is None:
+            return 0
+        if frame_check == CCNxLinkFrame.CHECK_CRC8:
+            return 1
+        if frame_check == CCNxLinkFrame.CHECK_CRC32C:
+            return 4
+        raise ValueError("Unknown frame check {}".format(frame_check))
+
+    # ###### Bundles
+
+    @staticmethod
+    def encode_bundle(datagrams):
+        """
+        :param datagrams: A list of datagrams (lists of bytes)
+        :return: list of bytes
+        """
+        output = [CCNxLinkFrame.BUNDLE]
+        for datagram in datagrams:
+            output.extend(CCNxCompressorNumericValue.encode_varint(len(datagram)))
+            output.extend(datagram)
+        return output
+
+    @staticmethod
+    def bundle_overhead(datagram):
+        """The bytes a datagram takes in a bundle beyond its own"""
+        return len(CCNxCompressorNumericValue.encode_varint(len(datagram)))
+
+    @staticmethod
+    def decode_bundle(byte_array):
+        """
+        :param byte_array: A received datagram
+        :return: The list of datagrams in the bundle, or [byte_array] if it is not a bundle
+        :raises ValueError: If the bundle is corrupt
+        """
+        if len(byte_array) == 0 or byte_array[0] != CCNxLinkFrame.BUNDLE:
+            return [byte_array]
+
+        datagrams = []
+        offset = 1
+        end = len(byte_array)
+        while offset < end:
+            length = 0
+            shift = 0
+            while True:
+                if offset >= end or shift > 21:
+                    raise ValueError("Bad bundle length")
+                byte = byte_array[offset]
+                offset += 1
+                length |= (byte & 0x7F) << shift
+                shift += 7
+                if byte & 0x80 == 0:
+                    break
+            if length == 0 or offset + length > end:
+                raise ValueError("Bundle datagram overruns the bundle")
+            datagrams.append(list(byte_array[offset:offset + length]))
+            offset += length
+        return datagrams
+
+    # ###### Sequenced frames
+
+    @staticmethod
+    def encode_sequenced(sequence, packet):
+        """
+        :param sequence: The sequence number, only the low 4 bits are sent
+        :param packet: The compressed packet (list of bytes)
+        :return: list of bytes
+        """
+        output = [_sequenced_pattern | (sequence & _bits_4)]
+        output.extend(packet)
+        return output
+
+    @staticmethod
+    def decode_sequenced(byte_array):
+        """
+        Pops the frame header off byte_array, leaving the compressed packet.
+
+        :return: The 4-bit sequence number
+        """
+        byte0 = byte_array.pop(0)
+        if not CCNxLinkFrame.is_sequenced(byte0):
+            raise ValueError("Not a sequenced frame: {}".format(hex(byte0)))
+        return byte0 & _bits_4
+
+    # ###### Control messages
+
+    @staticmethod
+    def encode_refresh(context_id, bases):
+        """
+        :param context_id: The context the bases belong to
+        :param bases: dictionary from TLV type to base value
+        :return: list of bytes
+        """
+        output = [CCNxLinkFrame.REFRESH, context_id, len(bases)]
+        for tlv_type in sorted(bases.keys()):
+            output.append(tlv_type)
+            output.extend(CCNxCompressorNumericValue.encode_varint(bases[tlv_type]))
+        output.append(CCNxLinkFrame.crc8(output))
+        return output
+
+    @staticmethod
+    def decode_refresh(byte_array):
+        """
+        :param byte_array: The whole REFRESH message
+        :return: (context_id, dictionary of bases)
+        :raises ValueError: If the message is corrupt
+        """
+        byte_array = list(byte_array)
+        if len(byte_array) < 4 or byte_array[0] != CCNxLinkFrame.REFRESH:
+            raise ValueError("Not a refresh message")
+        if CCNxLinkFrame.crc8(byte_array[:-1]) != byte_array[-1]:
+            raise ValueError("Refresh message failed crc")
+
+        byte_array.pop()
+        byte_array.pop(0)
+        context_id = byte_array.pop(0)
+        count = byte_array.pop(0)
+        bases = {}
+        for i in range(count):
+            tlv_type = byte_array.pop(0)
+            bases[tlv_type] = CCNxCompressorNumericValue.decode_varint(byte_array)
+        if len(byte_array) > 0:
+            raise ValueError("Refresh message has {} extra bytes".format(len(byte_array)))
+        return context_id, bases
+
+    @staticmethod
+    def encode_nack(context_id, sequence):
+        return [CCNxLinkFrame.NACK, context_id, sequence & _bits_4]
+
+    @staticmethod
+    def decode_nack(byte_array):
+        """
+        :return: (context_id, sequence)
+        """
+        if len(byte_array) != 3 or byte_array[0] != CCNxLinkFrame.NACK:
+            raise ValueError("Not a nack message")
+        return byte_array[1], byte_array[2]
+
+    @staticmethod
+    def encode_binding(message_type, context_id, dictionary_id, digest):
+        """
+        Encode an ANNOUNCE, ACCEPT, or REJECT, which bind a context ID to a dictionary
+
+        :return: list of bytes
+        """
+        return [message_type, context_id, dictionary_id,
+                (digest >> 24) & 0xFF, (digest >> 16) & 0xFF, (digest >> 8) & 0xFF, digest & 0xFF]
+
+    @staticmethod
+    def decode_binding(byte_array):
+        """
+        :return: (message_type, context_id, dictionary_id, digest)
+        """
+        if len(byte_array) != 7 or byte_array[0] not in [CCNxLinkFrame.ANNOUNCE, CCNxLinkFrame.ACCEPT,
+                                                          CCNxLinkFrame.REJECT]:
+            raise ValueError("Not a binding message")
+        digest = (byte_array[3] << 24) | (byte_array[4] << 16) | (byte_array[5] << 8) | byte_array[6]
+        return byte_array[0], byte_array[1], byte_array[2], digest
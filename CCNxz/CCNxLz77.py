@@ -0,0 +1,313 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Binary LZ77 for payloads, optionally primed with a trained dictionary.
+
+Each packet is compressed on its own, so nothing is lost with a lost packet.  The
+dictionary is a string of representative payload bytes that every packet may copy
+from, as if it came right before the packet (as zstd dictionaries do).  Its match index
+is built once and never changes, so one CCNxLz77 can be shared.
+
+The block format is the LZ4 one.  A block is a list of sequences:
+
+    t{8}                token: literal count (high nibble), match length - 4 (low nibble)
+    e{8}*               if a nibble is 15, more count follows in bytes of 255 until one is < 255
+    l{8}*               the literals
+    o{16}               match offset back from the current position (big endian, 1 to 65535)
+    e{8}*               match length extension
+
+The last sequence stops after its literals.  Matches may reach back into the dictionary
+and may overlap the bytes they produce.
+
+Matches are found with a hash table on the next 4 bytes and chain links to the previous
+position with the same 4 bytes, walked for at most max_chain links, with lazy matching.
+
+train_dictionary() picks the dictionary from sample payloads.  It scores segments by
+how many samples share their 8-byte substrings and greedily takes the best segments
+(the COVER algorithm from zstd), putting the best at the end where offsets are shortest.
+"""
+
+__author__ = 'mmosko'
+
+import heapq
+
+_min_match = 4
+_max_offset = 0xFFFF
+_nibble = 15
+
+# Matches at least this long are taken without looking at the next position
+_good_length = 32
+
+
+class CCNxLz77(object):
+    def __init__(self, dictionary=None, max_chain=16, lazy=True):
+        """
+        :param dictionary: Optional string of bytes to prime every packet with (at most 65535 used)
+        :param max_chain: The most hash chain links followed for one match
+        :param lazy: Use lazy matching
+        """
+        if dictionary is None:
+            dictionary = ""
+        self.__dictionary = bytearray(dictionary)[-_max_offset:]
+        self.__max_chain = max_chain
+        self.__lazy = lazy
+
+        self.__head = {}
+        self.__chain = [-1] * len(self.__dictionary)
+        for position in range(len(self.__dictionary) - _min_match + 1):
+            key = self.__key(self.__dictionary, position)
+            self.__chain[position] = self.__head.get(key, -1)
+            self.__head[key] = position
+
+    @property
+    def dictionary(self):
+        return str(self.__dictionary)
+
+    def compress(self, data):
+        """
+        :param data: A string, bytearray or list of bytes
+        :return: The block as a bytearray
+        """
+        data = bytearray(data)
+        base = len(self.__dictionary)
+        buf = self.__dictionary + data
+        end = len(buf)
+
+        # The positions in this packet, in front of the dictionary's index
+        head = {}
+        chain = [-1] * len(data)
+
+        def insert(p):
+            if p + _min_match <= end:
+                key = self.__key(buf, p)
+                chain[p - base] = head.get(key, self.__head.get(key, -1))
+                head[key] = p
+
+        def find(p):
+            if p + _min_match > end:
+                return 0, 0
+            key = self.__key(buf, p)
+            candidate = head.get(key, self.__head.get(key, -1))
+            max_length = end - p
+            best_length = 0
+            best_offset = 0
+            depth = self.__max_chain
+            while candidate >= 0 and depth > 0:
+                offset = p - candidate
+                if offset > _max_offset:
+                    break
+                if best_length == 0 or buf[candidate + best_length] == buf[p + best_length]:
+                    length = self.__match_length(buf, candidate, p, max_length)
+                    if length > best_length:
+                        best_length = length
+                        best_offset = offset
+                        if length == max_length:
+                            break
+                if candidate >= base:
+                    candidate = chain[candidate - base]
+                else:
+                    candidate = self.__chain[candidate]
+                depth -= 1
+            return best_length, best_offset
+
+        out = bytearray()
+        literal_start = base
+        position = base
+        while position < end:
+            length, offset = find(position)
+            insert(position)
+            if length == 0:
+                position += 1
+                continue
+
+            while self.__lazy and length < _good_length:
+                next_length, next_offset = find(position + 1)
+                if next_length <= length:
+                    break
+                position += 1
+                insert(position)
+                length, offset = next_length, next_offset
+
+            self.__sequence(out, buf[literal_start:position], offset, length)
+            for p in range(position + 1, position + length):
+                insert(p)
+            position += length
+            literal_start = position
+
+        self.__sequence(out, buf[literal_start:end], 0, 0)
+        return out
+
+    def decompress(self, block):
+        """
+        :param block: A block from compress() with the same dictionary
+        :return: The data as a string
+        :raises ValueError: On a bad block
+        """
+        block = bytearray(block)
+        out = bytearray(self.__dictionary)
+        base = len(out)
+        n = len(block)
+        position = 0
+        try:
+            while position < n:
+                token = block[position]
+                position += 1
+
+                count = token >> 4
+                if count == _nibble:
+                    extra, position = self.__read_count(block, position)
+                    count += extra
+                if position + count > n:
+                    raise ValueError("LZ77 literals past end of block")
+                out += block[position:position + count]
+                position += count
+                if position == n:
+                    break
+
+                offset = (block[position] << 8) | block[position + 1]
+                position += 2
+                length = token & _nibble
+                if length == _nibble:
+                    extra, position = self.__read_count(block, position)
+                    length += extra
+                length += _min_match
+
+                start = len(out) - offset
+                if offset == 0 or start < 0:
+                    raise ValueError("LZ77 match offset {} out of range".format(offset))
+                if offset >= length:
+                    out += out[start:start + length]
+                else:
+                    # overlapping, so repeat the period
+                    period = out[start:]
+                    out += (period * (length // offset + 1))[0:length]
+        except IndexError:
+            raise ValueError("LZ77 block truncated")
+
+        return str(out[base:])
+
+    # ###### Training
+
+    @staticmethod
+    def train_dictionary(samples, dictionary_size=4096, segment_length=64, dmer_length=8):
+        """
+        :param samples: A list of sample payloads (strings)
+        :param dictionary_size: The dictionary size in bytes
+        :param segment_length: The dictionary is made of segments this long
+        :param dmer_length: Substring length used to score segments
+        :return: The dictionary as a string
+        """
+        samples = [str(bytearray(s)) for s in samples]
+
+        # dmer -> number of samples it is in
+        frequency = {}
+        for sample in samples:
+            for dmer in set(sample[i:i + dmer_length] for i in range(len(sample) - dmer_length + 1)):
+                frequency[dmer] = frequency.get(dmer, 0) + 1
+
+        def dmers(segment):
+            return set(segment[i:i + dmer_length] for i in range(len(segment) - dmer_length + 1))
+
+        covered = set()
+
+        def score(segment):
+            return sum(frequency[d] for d in dmers(segment) if d not in covered and frequency[d] > 1)
+
+        segments = set()
+        step = max(1, segment_length // 2)
+        for sample in samples:
+            for start in range(0, max(1, len(sample) - segment_length + 1), step):
+                segments.add(sample[start:start + segment_length])
+
+        heap = [(-score(segment), segment) for segment in segments]
+        heapq.heapify(heap)
+
+        picked = []
+        total = 0
+        while len(heap) > 0 and total < dictionary_size:
+            bound, segment = heapq.heappop(heap)
+            current = score(segment)
+            if current <= 0:
+                continue
+            if len(heap) > 0 and current < -heap[0][0]:
+                # went down since it was scored, so put it back in line
+                heapq.heappush(heap, (-current, segment))
+                continue
+            picked.append(segment)
+            covered |= dmers(segment)
+            total += len(segment)
+
+        # the best segments go last, nearest to the packet
+        return "".join(reversed(picked))[-dictionary_size:]
+
+    # ###### Private API
+
+    @staticmethod
+    def __key(buf, position):
+        return (buf[position] << 24) | (buf[position + 1] << 16) | (buf[position + 2] << 8) | buf[position + 3]
+
+    @staticmethod
+    def __match_length(buf, candidate, position, max_length):
+        length = _min_match
+        # 16 bytes at a time, then byte by byte
+        while length + 16 <= max_length and \
+                buf[candidate + length:candidate + length + 16] == buf[position + length:position + length + 16]:
+            length += 16
+        while length < max_length and buf[candidate + length] == buf[position + length]:
+            length += 1
+        return length
+
+    @staticmethod
+    def __write_count(out, count):
+        while count >= 255:
+            out.append(255)
+            count -= 255
+        out.append(count)
+
+    @staticmethod
+    def __read_count(block, position):
+        count = 0
+        while True:
+            byte = block[position]
+            position += 1
+            count += byte
+            if byte != 255:
+                return count, position
+
+    @staticmethod
+    def __sequence(out, literals, offset, length):
+        count = len(literals)
+        token = min(count, _nibble) << 4
+        if length > 0:
+            token |= min(length - _min_match, _nibble)
+        out.append(token)
+        if count >= _nibble:
+            CCNxLz77.__write_count(out, count - _nibble)
+        out += literals
+        if length > 0:
+            out.append(offset >> 8)
+            out.append(offset & 0xFF)
+            if length - _min_match >= _nibble:
+                CCNxLz77.__write_count(out, length - _min_match - _nibble)
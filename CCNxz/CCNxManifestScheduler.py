@@ -0,0 +1,171 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Chooses the order in which the Interests of a manifest tree are sent.
+
+The data of a tree is in DFS pre-order: the data links of a manifest come before the
+data of its children.  Every manifest has a path in the tree, the indexes of the
+manifest links from the root, and ordering the data links by path gives the data in
+order.  So the scheduler keeps a heap of the Interest generators of each manifest
+it has received, keyed by
+
+    (0, path)       the manifest links of a manifest less than prefetch_depth deep
+    (1, path, 0)    the manifest links of a deeper manifest
+    (1, path, 1)    the data links of a manifest
+
+The top prefetch_depth levels of manifests are fetched before any data.  Below that,
+the children of a manifest are asked for before its data, which gives them the time
+of that data to arrive before their own data is needed.  Either way the window does
+not stall waiting for the next manifest.
+
+The scheduler is put on the FlowControllerThread user_read_queue as a source.  It
+yields (priority, CCNxInterest), with manifest Interests at _manifest_priority so they
+go ahead of data on the network too.  It yields None when it has nothing to send until
+another manifest arrives, and stops once every manifest asked for has arrived or
+failed and every Interest was taken.
+
+If given a have_chunk predicate, e.g. CCNxReassembler.have when resuming a download,
+data chunks it is true for are not asked for again.
+"""
+
+__author__ = 'mmosko'
+
+import heapq
+import threading
+
+from CCNx.CCNxName import *
+from CCNx.CCNxInterest import *
+
+
+class CCNxManifestScheduler(object):
+    _manifest_priority = 0
+    _data_priority = 1
+
+    def __init__(self, name, prefetch_depth=2, have_chunk=None):
+        """
+        :param name: The prefix to ask for (will append chunk numbers)
+        :param prefetch_depth: The number of levels of manifests to fetch ahead of the data
+        :param have_chunk: If not None, a function of a chunk number that is True if the data is not needed
+        """
+        if prefetch_depth < 0:
+            raise ValueError("prefetch_depth must be non-negative")
+
+        self.__name = name
+        self.__prefetch_depth = prefetch_depth
+        self.__have_chunk = have_chunk
+        self.__lock = threading.Lock()
+        self.__heap = []
+        self.__sequence = 0
+        # hash of each manifest linked from one received and not yet received -> path in the tree,
+        # the root has no hash
+        self.__paths = {None: ()}
+
+    @property
+    def pending_manifests(self):
+        """The number of manifests linked from the ones received that have not arrived"""
+        return len(self.__paths)
+
+    def add_manifest(self, manifest_hash, manifest):
+        """
+        Schedule the Interests of a manifest.
+
+        :param manifest_hash: The hash of the manifest content object
+        :param manifest: A CCNxManifestParser
+        """
+        with self.__lock:
+            key = tuple(manifest_hash)
+            if key not in self.__paths:
+                # the root was asked for by name
+                key = None
+            path = self.__paths.pop(key, ())
+            if len(path) < self.__prefetch_depth:
+                manifest_key = (0, path)
+            else:
+                manifest_key = (1, path, 0)
+
+            # the children are outstanding from now on, not only once their Interests are taken
+            for index, manifest_hash in enumerate(manifest.manifest_hash_list):
+                self.__paths[tuple(manifest_hash)] = path + (index,)
+
+            self.__push(manifest_key, self.__manifest_links(manifest))
+            self.__push((1, path, 1), self.__data_links(manifest))
+
+    def interest_failed(self, interest):
+        """
+        The transport gave up on an Interest.  If it was for a manifest, finish without it.
+        """
+        with self.__lock:
+            key = None
+            if interest.hash_restr is not None:
+                key = tuple(interest.hash_restr)
+            self.__paths.pop(key, None)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        """
+        :return: The next (priority, CCNxInterest), or None if there is none until a manifest arrives
+        """
+        with self.__lock:
+            while len(self.__heap) > 0:
+                try:
+                    return next(self.__heap[0][2])
+                except StopIteration:
+                    heapq.heappop(self.__heap)
+
+            if len(self.__paths) == 0:
+                raise StopIteration
+            return None
+
+    def __push(self, key, generator):
+        heapq.heappush(self.__heap, (key, self.__sequence, generator))
+        self.__sequence += 1
+
+    def __manifest_links(self, manifest):
+        return self.interests(self.__name, manifest.manifest_start_chunk, manifest.manifest_hash_list,
+                              self._manifest_priority)
+
+    def __data_links(self, manifest):
+        for priority, interest in self.interests(self.__name, manifest.data_start_chunk,
+                                                 manifest.data_hash_list, self._data_priority):
+            if self.__have_chunk is None or not self.__have_chunk(interest.name.chunk_number):
+                yield priority, interest
+
+    @staticmethod
+    def interests(name, start_chunk, hash_list, priority):
+        """
+        Generates (priority, CCNxInterest) for a section of a manifest.
+
+        :param name: The prefix to ask for (will append chunk numbers)
+        :param start_chunk: The chunk number of the first hash
+        :param hash_list: The hash restrictions
+        :param priority: The network priority of the Interests
+        """
+        chunk_number = start_chunk
+        for hash_value in hash_list:
+            chunked_name = CCNxNameFactory.from_name(name, chunk_number)
+            yield priority, CCNxInterest(chunked_name, None, hash_value)
+            chunk_number += 1
@@ -0,0 +1,180 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A small table of the Interests that recently crossed the compressed link.
+
+Both relays keep one.  The relay that compresses an Interest inserts its name
+and the relay that decompresses it does the same, so when the Content Object comes
+back the other way its T_NAME can be sent as a reference to the table slot instead
+of the full name.
+
+The slot is derived from a CRC32 of the uncompressed name so both sides compute
+the same slot without exchanging anything.  The reference also carries 8 more bits
+of the CRC as a check, so a slot that was overwritten on one side only is detected
+as a miss rather than expanding to the wrong name.
+
+Entries time out.  The decompressing side keeps entries for twice the timeout so
+that it never expires an entry the compressing side is still allowed to reference.
+"""
+
+__author__ = 'mmosko'
+
+import array
+import threading
+import time
+import zlib
+from collections import deque
+
+from CCNxz.CCNxNullCompressor import *
+
+
+class CCNxPendingInterestTable(object):
+    _default_timeout = 4.0
+    _default_max_entries = 4096
+
+    class PendingEntry(object):
+        def __init__(self, segments, check, insert_time):
+            self.__segments = segments
+            self.__check = check
+            self.__insert_time = insert_time
+
+        @property
+        def segments(self):
+            """The name segments as a list of CCNxTlv"""
+            return self.__segments
+
+        @property
+        def check(self):
+            return self.__check
+
+        @property
+        def insert_time(self):
+            return self.__insert_time
+
+    def __init__(self, timeout=_default_timeout, max_entries=_default_max_entries, clock=time.time):
+        """
+        :param timeout: Seconds an entry may be referenced after it is inserted
+        :param max_entries: Oldest entries are evicted beyond this size
+        :param clock: Something like time.time
+        """
+        self.__timeout = timeout
+        self.__max_entries = max_entries
+        self.__clock = clock
+        self.__entries = {}
+        self.__insert_order = deque()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    @staticmethod
+    def fingerprint(segments):
+        """
+        Computes the (slot, check) pair of a name.
+
+        :param segments: A list of CCNxTlv name segments (not including T_NAME)
+        :return: (16-bit slot, 8-bit check)
+        """
+        encoded = CCNxNullCompressor.encode_tlv_list(list(segments))
+        crc = zlib.crc32(array.array("B", encoded).tostring()) & 0xFFFFFFFF
+        return crc & 0xFFFF, (crc >> 16) & 0xFF
+
+    def insert(self, segments):
+        """
+        Remember a name that just went by in an Interest.
+
+        :param segments: A list of CCNxTlv name segments
+        """
+        slot, check = self.fingerprint(segments)
+        now = self.__clock()
+        with self.__lock:
+            self.__expire(now)
+            self.__entries[slot] = CCNxPendingInterestTable.PendingEntry(list(segments), check, now)
+            self.__insert_order.append((now, slot))
+
+    def match(self, segments):
+        """
+        Used by the compressor.  If the name is in the table and fresh, remove it and
+        return the reference to put on the wire.
+
+        :param segments: A list of CCNxTlv name segments
+        :return: (slot, check) or None on a miss
+        """
+        slot, check = self.fingerprint(segments)
+        now = self.__clock()
+        with self.__lock:
+            self.__expire(now)
+            entry = self.__entries.get(slot)
+            if entry is not None and entry.check == check and now - entry.insert_time < self.__timeout:
+                del self.__entries[slot]
+                self.__hits += 1
+                return slot, check
+
+            self.__misses += 1
+            return None
+
+    def resolve(self, slot, check):
+        """
+        Used by the decompressor.  Look up and remove the name referenced by (slot, check).
+
+        :return: A list of CCNxTlv name segments or None if the reference does not match
+        """
+        now = self.__clock()
+        with self.__lock:
+            self.__expire(now)
+            entry = self.__entries.get(slot)
+            if entry is None or entry.check != check:
+                self.__misses += 1
+                return None
+
+            del self.__entries[slot]
+            self.__hits += 1
+            return entry.segments
+
+    def __expire(self, now):
+        """
+        Drop entries older than the decompressor grace period (2x timeout) and
+        the oldest entries beyond max_entries.  Called with the lock held.
+        """
+        grace = 2 * self.__timeout
+        while len(self.__insert_order) > 0:
+            insert_time, slot = self.__insert_order[0]
+            if now - insert_time < grace and len(self.__insert_order) <= self.__max_entries:
+                break
+
+            self.__insert_order.popleft()
+            entry = self.__entries.get(slot)
+            if entry is not None and entry.insert_time == insert_time:
+                del self.__entries[slot]
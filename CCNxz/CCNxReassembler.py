@@ -0,0 +1,273 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Writes the data chunks of a manifest tree to a file as they arrive.
+
+Data chunks are numbered consecutively from the data start chunk of the root manifest
+and all carry the same payload size but the last.  So chunk c goes at offset
+(c - base_chunk) * payload_size.  The payload size is learned from the first chunk
+that is not the highest chunk the manifests know of, so is not the last one.  Until
+then (the first chunk is always at offset 0), and while the root manifest has not
+been seen, chunks wait in a reorder buffer
+of at most max_buffered chunks.  Once the file size is known from the manifests the
+file is extended to it, so the writes fill in a file of the right size.  The file is
+only complete once every manifest linked from the ones seen has been seen too, as the
+chunks of a resumed download may all be written before the last manifests arrive.
+
+A bitmap of the chunks written is kept in a resume file next to the output, saved
+every save_interval chunks and on close.  A reassembler opened on an existing output
+and resume file skips the chunks it already has, see have().
+"""
+
+__author__ = 'mmosko'
+
+import array
+import base64
+import json
+import os
+
+_resume_format = 1
+
+
+class CCNxReassembler(object):
+    def __init__(self, path, max_buffered=1024, save_interval=256, resume=True):
+        """
+        :param path: The output file
+        :param max_buffered: The most chunks held before they can be written
+        :param save_interval: Save the resume file after this many chunks
+        :param resume: Continue from the resume file, if there is one
+        """
+        self.__path = path
+        self.__resume_path = path + ".resume"
+        self.__max_buffered = max_buffered
+        self.__save_interval = save_interval
+
+        self.__base_chunk = None
+        self.__payload_size = None
+        self.__bitmap = bytearray()
+        self.__last_chunk = None
+        # manifests linked and not yet seen, starting with the root
+        self.__manifests = 1
+        self.__buffer = {}
+        self.__written = 0
+        self.__unsaved = 0
+        self.__contiguous = 0
+
+        if resume and os.path.exists(self.__resume_path) and os.path.exists(path):
+            self.__load_resume()
+            self.__fh = open(path, "r+b")
+        else:
+            self.__fh = open(path, "w+b")
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def payload_size(self):
+        return self.__payload_size
+
+    @property
+    def written(self):
+        """The number of chunks written to the file"""
+        return self.__written
+
+    @property
+    def contiguous(self):
+        """The number of chunks written in order from the start of the file"""
+        return self.__contiguous
+
+    @property
+    def buffered(self):
+        return len(self.__buffer)
+
+    @property
+    def complete(self):
+        """True if every manifest has been seen and every chunk they know of is written"""
+        if self.__last_chunk is None or self.__manifests > 0:
+            return False
+        return self.__contiguous == self.__last_chunk - self.__base_chunk + 1
+
+    def add_manifest(self, manifest):
+        """
+        Learn the data chunks of a manifest.  The first manifest must be the root.
+
+        :param manifest: A CCNxManifestParser
+        """
+        self.__manifests += len(manifest.manifest_hash_list) - 1
+        if manifest.data_start_chunk is None or len(manifest.data_hash_list) == 0:
+            return
+
+        first = manifest.data_start_chunk
+        last = first + len(manifest.data_hash_list) - 1
+        if self.__base_chunk is None:
+            self.__base_chunk = first
+        if first < self.__base_chunk:
+            raise ValueError("Data chunk {} is before the root data chunk {}".format(first, self.__base_chunk))
+
+        if self.__last_chunk is None or last > self.__last_chunk:
+            self.__last_chunk = last
+            self.__extend()
+        self.__place_buffered()
+
+    def have(self, chunk_number):
+        """
+        :return: True if the chunk is already written (e.g. before a resume)
+        """
+        if self.__base_chunk is None:
+            return False
+        index = chunk_number - self.__base_chunk
+        if index < 0 or (index >> 3) >= len(self.__bitmap):
+            return False
+        return (self.__bitmap[index >> 3] >> (index & 7)) & 1 == 1
+
+    def add_data(self, content_object):
+        """
+        Write the payload of a data chunk, or buffer it until its offset is known.
+
+        :param content_object: A CCNxMessage with a chunk number and payload
+        :raises ValueError: If the reorder buffer is full
+        """
+        chunk_number = content_object.name.chunk_number
+        if chunk_number is None:
+            raise ValueError("Data object has no chunk number")
+
+        payload = content_object.payload
+        if payload is None:
+            payload = array.array("B")
+        elif not isinstance(payload, array.array):
+            payload = array.array("B", payload)
+
+        self.__learn_payload_size(chunk_number, payload)
+
+        if self.__base_chunk is None or (self.__payload_size is None and chunk_number != self.__base_chunk):
+            if len(self.__buffer) >= self.__max_buffered:
+                raise ValueError("Reorder buffer full at {} chunks".format(len(self.__buffer)))
+            self.__buffer[chunk_number] = payload
+        else:
+            self.__write(chunk_number, payload)
+            self.__place_buffered()
+
+    def save(self):
+        """
+        Write the resume file.
+        """
+        self.__fh.flush()
+        state = {"format": _resume_format, "base_chunk": self.__base_chunk, "payload_size": self.__payload_size,
+                 "bitmap": base64.b64encode(str(self.__bitmap))}
+        with open(self.__resume_path, "w") as fh:
+            json.dump(state, fh, indent=1, sort_keys=True)
+        self.__unsaved = 0
+
+    def close(self):
+        """
+        Save the resume file, or remove it if the file is complete.
+        """
+        if self.complete:
+            self.__fh.flush()
+            if os.path.exists(self.__resume_path):
+                os.remove(self.__resume_path)
+        else:
+            self.save()
+        self.__fh.close()
+
+    def __load_resume(self):
+        with open(self.__resume_path, "r") as fh:
+            state = json.load(fh)
+        if state.get("format") != _resume_format:
+            raise ValueError("Unsupported resume format: {}".format(state.get("format")))
+
+        self.__base_chunk = state["base_chunk"]
+        self.__payload_size = state["payload_size"]
+        self.__bitmap = bytearray(base64.b64decode(state["bitmap"]))
+        for index in range(len(self.__bitmap) * 8):
+            if (self.__bitmap[index >> 3] >> (index & 7)) & 1:
+                self.__written += 1
+        self.__advance_contiguous()
+
+    def __extend(self):
+        """
+        Grow the file to the end of the last full chunk.  The last chunk may be short
+        and extends the file itself.
+        """
+        if self.__payload_size is None or self.__last_chunk is None:
+            return
+        size = (self.__last_chunk - self.__base_chunk) * self.__payload_size
+        self.__fh.seek(0, os.SEEK_END)
+        if self.__fh.tell() < size:
+            self.__fh.truncate(size)
+
+    def __learn_payload_size(self, chunk_number, payload):
+        if self.__payload_size is None and self.__last_chunk is not None and chunk_number < self.__last_chunk:
+            self.__payload_size = len(payload)
+            self.__extend()
+
+    def __place_buffered(self):
+        if self.__base_chunk is None:
+            return
+        buffered = self.__buffer
+        self.__buffer = {}
+        for chunk_number, payload in buffered.iteritems():
+            self.__learn_payload_size(chunk_number, payload)
+        for chunk_number in sorted(buffered.keys()):
+            if self.__payload_size is None and chunk_number != self.__base_chunk:
+                self.__buffer[chunk_number] = buffered[chunk_number]
+            else:
+                self.__write(chunk_number, buffered[chunk_number])
+
+    def __write(self, chunk_number, payload):
+        if self.have(chunk_number):
+            return
+
+        index = chunk_number - self.__base_chunk
+        if index < 0:
+            raise ValueError("Data chunk {} is before the root data chunk {}".format(chunk_number, self.__base_chunk))
+        if index == 0:
+            offset = 0
+        else:
+            offset = index * self.__payload_size
+        if self.__payload_size is not None and len(payload) > self.__payload_size:
+            raise ValueError("Chunk {} payload {} longer than {}".format(chunk_number, len(payload),
+                                                                        self.__payload_size))
+
+        self.__fh.seek(offset)
+        payload.tofile(self.__fh)
+
+        byte_index = index >> 3
+        if byte_index >= len(self.__bitmap):
+            self.__bitmap.extend(bytearray(byte_index + 1 - len(self.__bitmap)))
+        self.__bitmap[byte_index] |= 1 << (index & 7)
+        self.__written += 1
+        self.__advance_contiguous()
+
+        self.__unsaved += 1
+        if self.__unsaved >= self.__save_interval:
+            self.save()
+
+    def __advance_contiguous(self):
+        if self.__base_chunk is None:
+            return
+        while self.have(self.__base_chunk + self.__contiguous):
+            self.__contiguous += 1
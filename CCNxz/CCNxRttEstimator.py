@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Round trip time and retransmission timeout estimation (Jacobson/Karels, as in RFC 6298).
+
+The first sample R sets srtt = R and rttvar = R / 2.  Each later sample updates
+
+    rttvar = (1 - beta) * rttvar + beta * |srtt - R|
+    srtt   = (1 - alpha) * srtt + alpha * R
+
+with alpha = 1/8 and beta = 1/4, and the timeout is rto = srtt + max(G, 4 * rttvar),
+clamped to [min_rto, max_rto].  G is the clock granularity.
+
+The caller must not sample an Interest that was retransmitted (Karn's rule), as it
+cannot tell which transmission the content object answers.
+"""
+
+__author__ = 'mmosko'
+
+
+class CCNxRttEstimator(object):
+    _alpha = 0.125
+    _beta = 0.25
+    _k = 4
+
+    def __init__(self, initial_rto=0.100, min_rto=0.010, max_rto=10.0, granularity=0.001):
+        """
+        :param initial_rto: The timeout (seconds) before the first sample
+        :param min_rto: The smallest timeout
+        :param max_rto: The largest timeout
+        :param granularity: The clock granularity G
+        """
+        if not 0 < min_rto <= initial_rto <= max_rto:
+            raise ValueError("Must have 0 < min_rto <= initial_rto <= max_rto")
+
+        self.__min_rto = min_rto
+        self.__max_rto = max_rto
+        self.__granularity = granularity
+        self.__srtt = None
+        self.__rttvar = None
+        self.__min_rtt = None
+        self.__rto = initial_rto
+
+    @property
+    def srtt(self):
+        """The smoothed RTT, None before the first sample"""
+        return self.__srtt
+
+    @property
+    def rttvar(self):
+        return self.__rttvar
+
+    @property
+    def min_rtt(self):
+        """The smallest RTT sampled, None before the first sample"""
+        return self.__min_rtt
+
+    @property
+    def rto(self):
+        return self.__rto
+
+    @property
+    def max_rto(self):
+        return self.__max_rto
+
+    def backoff_rto(self, retries):
+        """
+        :param retries: The number of times the Interest was sent before
+        :return: The timeout doubled for each retry, at most max_rto
+        """
+        return min(self.__rto * (2 ** retries), self.__max_rto)
+
+    def sample(self, rtt):
+        """
+        Update the estimate with the RTT of an Interest that was sent only once.
+
+        :param rtt: The time from sending the Interest to receiving its content object
+        """
+        if rtt < 0:
+            raise ValueError("Negative RTT sample {}".format(rtt))
+
+        if self.__srtt is None:
+            self.__srtt = rtt
+            self.__rttvar = rtt / 2.0
+        else:
+            self.__rttvar = (1 - self._beta) * self.__rttvar + self._beta * abs(self.__srtt - rtt)
+            self.__srtt = (1 - self._alpha) * self.__srtt + self._alpha * rtt
+
+        if self.__min_rtt is None or rtt < self.__min_rtt:
+            self.__min_rtt = rtt
+
+        rto = self.__srtt + max(self.__granularity, self._k * self.__rttvar)
+        self.__rto = min(max(rto, self.__min_rto), self.__max_rto)
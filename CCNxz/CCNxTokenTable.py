@@ -0,0 +1,182 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+First-byte dispatch for the compressed TL tokens.
+
+Every format of CCNxCompressorFixedLength and CCNxCompressorVariableLength (and the
+learned tokens of CCNxCompressionContext) is identified by its first byte:
+
+    0zzzllll            3_4 variable length key
+    10zzzzzz            fixed length key
+    110zzzzl l{8}       4_9 variable length key
+    1110tttt            (15, 5) compact
+    11110xxx            learned numeric value
+    111110tt            (16, 10) compact
+    111111xx            learned payload, name reference, or (16, 16) compact
+
+The format of each first byte is worked out once, at import.  A CCNxTokenTable adds a
+dictionary to it: for each first byte, the decoder of its format and the static
+expansion of that byte in the dictionary (the whole TL pair of a 3_4 key or fixed
+length key, the type of a 4_9 key).  Decoding a token is then one indexed lookup and
+the decoder call, with no mask tests and no dictionary lookups.
+"""
+
+__author__ = 'mmosko'
+
+from CCNxz.CCNxCompressorFixedLength import *
+from CCNxz.CCNxCompressorVariableLength import *
+
+
+def _decode_invalid(byte_array, expansion, context):
+    return None
+
+
+def _decode_expansion(byte_array, expansion, context):
+    byte_array.pop(0)
+    return expansion
+
+
+def _decode_4_9(byte_array, expansion, context):
+    byte0 = byte_array.pop(0)
+    byte1 = byte_array.pop(0)
+    return [expansion[0], expansion[1], byte0 & 0x01, byte1]
+
+
+def _decode_15_5(byte_array, expansion, context):
+    byte0 = byte_array.pop(0)
+    byte1 = byte_array.pop(0)
+    byte2 = byte_array.pop(0)
+    return [((byte0 & 0x0F) << 3) | (byte1 >> 5), ((byte1 & 0x1F) << 3) | (byte2 >> 5), 0, byte2 & 0x1F]
+
+
+def _decode_16_10(byte_array, expansion, context):
+    byte0 = byte_array.pop(0)
+    byte1 = byte_array.pop(0)
+    byte2 = byte_array.pop(0)
+    byte3 = byte_array.pop(0)
+    return [((byte0 & 0x03) << 6) | (byte1 >> 2), ((byte1 & 0x03) << 6) | (byte2 >> 2), byte2 & 0x03, byte3]
+
+
+def _decode_16_16(byte_array, expansion, context):
+    byte_array.pop(0)
+    return [byte_array.pop(0), byte_array.pop(0), byte_array.pop(0), byte_array.pop(0)]
+
+
+def _decode_learned(byte_array, expansion, context):
+    if context is None:
+        return None
+    return context.decompress_type_length(byte_array)
+
+FORMAT_3_4 = "3_4"
+FORMAT_FIXED = "fixed"
+FORMAT_4_9 = "4_9"
+FORMAT_15_5 = "15_5"
+FORMAT_16_10 = "16_10"
+FORMAT_16_16 = "16_16"
+FORMAT_LEARNED = "learned"
+
+
+def _generate_formats():
+    """
+    :return: list of 256 format names, indexed by first byte
+    """
+    formats = []
+    for byte0 in range(256):
+        if byte0 < 0x80:
+            formats.append(FORMAT_3_4)
+        elif byte0 < 0xC0:
+            formats.append(FORMAT_FIXED)
+        elif byte0 < 0xE0:
+            formats.append(FORMAT_4_9)
+        elif byte0 < 0xF0:
+            formats.append(FORMAT_15_5)
+        elif byte0 < 0xF8:
+            formats.append(FORMAT_LEARNED)
+        elif byte0 < 0xFC:
+            formats.append(FORMAT_16_10)
+        elif byte0 < 0xFF:
+            formats.append(FORMAT_LEARNED)
+        else:
+            formats.append(FORMAT_16_16)
+    return formats
+
+_formats = _generate_formats()
+
+_static_decoders = {FORMAT_15_5: _decode_15_5, FORMAT_16_10: _decode_16_10, FORMAT_16_16: _decode_16_16,
+                    FORMAT_LEARNED: _decode_learned}
+
+
+class CCNxTokenTable(object):
+    def __init__(self, keys, decompression_dict):
+        """
+        :param keys: Key to Tuple dictionary (CCNxDictionary.keys)
+        :param decompression_dict: Key to VariableLengthEntry dictionary (CCNxDictionary.decompression_dict)
+        """
+        self.__entries = [self.__entry(byte0, keys, decompression_dict) for byte0 in range(256)]
+
+    @staticmethod
+    def format(byte0):
+        """The name of the token format that starts with byte0"""
+        return _formats[byte0]
+
+    @property
+    def entries(self):
+        """256 (decoder, expansion) pairs, indexed by first byte"""
+        return self.__entries
+
+    def decode(self, byte_array, context=None):
+        """
+        Decode one TL token, consuming its bytes from byte_array.
+
+        :param byte_array: The input byte stream
+        :param context: Optional CCNxCompressionContext to decode learned tokens with
+        :return: A list of 4 bytes (or the token string of a fixed length key) or None
+        """
+        decoder, expansion = self.__entries[byte_array[0]]
+        return decoder(byte_array, expansion, context)
+
+    @staticmethod
+    def __entry(byte0, keys, decompression_dict):
+        format = _formats[byte0]
+        if format in _static_decoders:
+            return _static_decoders[format], None
+
+        if format == FORMAT_FIXED:
+            tuple = keys.get(byte0)
+            if tuple is None:
+                return _decode_invalid, None
+            return _decode_expansion, tuple.token_string
+
+        if format == FORMAT_3_4:
+            vle = decompression_dict.get(byte0 & 0xF0)
+            if vle is None:
+                return _decode_invalid, None
+            length = byte0 & 0x0F
+            return _decode_expansion, [vle.type >> 8, vle.type & 0xFF, 0, length]
+
+        vle = decompression_dict.get(byte0 & 0xFE)
+        if vle is None:
+            return _decode_invalid, None
+        return _decode_4_9, [vle.type >> 8, vle.type & 0xFF]
@@ -0,0 +1,177 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Forwarding between two compressed links without decompressing and recompressing.
+
+A relay in the middle of a multi-hop path receives compressed packets on one link and
+sends them on another.  Each link has its own CCNxContextTable.  The packet is always
+decoded with its rx context, because that keeps the rx link's learned state (sequence
+numbers, bases, pending Interests) right.  What it saves is the encode: if the rx and tx
+contexts use the same dictionary (same id and digest), the compressed bytes are sent
+on with a new context ID.  The learned tokens decide if that is possible:
+
+    LZ77 payload        only depends on the dictionary, forwarded as-is
+    name reference      rewritten to the tx link's reference; if the tx link has no
+                        pending Interest for the name, transcode
+    numeric absolute    forwarded, and it sets the tx base the way it sets the peer's
+    numeric delta       forwarded if the tx base is the rx base, else transcode
+    MPPC payload        depends on the link's history, transcode
+
+Name references and numeric tokens are only looked at in a dictionary without a Huffman
+code, where the parser knows where they are in the packet.  With a Huffman code they
+are transcoded.
+
+Anything else, and any packet between contexts with different dictionaries, is fully
+decompressed and compressed again with the tx context.
+"""
+
+__author__ = 'mmosko'
+
+from CCNx.CCNxParser import *
+from CCNx.CCNxTypes import *
+from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxNullCompressor import *
+from CCNxz.CCNxCompressionContext import *
+from CCNxz.CCNxCompressorContextID import *
+from CCNxz.CCNxCompressorNumericValue import *
+from CCNxz.CCNxCompressorPayload import *
+from CCNxz.CCNxLinkFrame import *
+
+_name_reference_length = 4
+
+_counter_names = ['transit_forwarded', 'transit_rewritten', 'transit_transcoded']
+
+
+class CCNxTransit(object):
+    def __init__(self, rx_contexts, tx_contexts):
+        """
+        :param rx_contexts: The CCNxContextTable of the link packets arrive on
+        :param tx_contexts: The CCNxContextTable of the link packets leave on
+        """
+        self.__rx = rx_contexts
+        self.__tx = tx_contexts
+        self.__counters = dict.fromkeys(_counter_names, 0)
+
+    @property
+    def tx_contexts(self):
+        return self.__tx
+
+    @property
+    def counters(self):
+        """transit_forwarded counts packets sent on as-is, transit_rewritten those with a new name reference"""
+        return dict(self.__counters)
+
+    def forward(self, datagram):
+        """
+        :param datagram: A compressed packet, maybe in a sequenced frame, from the rx link
+                         (after CCNxContextTable.receive_link)
+        :return: The datagrams to send on the tx link
+        :raises ValueError: If the packet does not decompress
+        """
+        context = self.__rx.decompression_context(datagram)
+        packet = list(datagram)
+        if CCNxLinkFrame.is_sequenced(packet[0]):
+            context.unframe(packet)
+        compressed = list(packet)
+
+        try:
+            parser = CCNxParser(packet, context)
+            parser.parse()
+        except ValueError:
+            context.decode_failed()
+            raise
+
+        def encode(tx_context):
+            encoded = self.__rewrite(parser, compressed, context, tx_context)
+            if encoded is None:
+                encoded = self.__transcode(parser, tx_context)
+                self.__counters['transit_transcoded'] += 1
+            return encoded
+
+        return self.__tx.compress(encode)
+
+    def __rewrite(self, parser, compressed, rx_context, tx_context):
+        """
+        :return: The packet in the tx context, or None if it has to be transcoded
+        """
+        if not CCNxTransit.__same(rx_context.dictionary, tx_context.dictionary):
+            return None
+
+        huffman = tx_context.dictionary.huffman_code is not None
+        references = []
+        numeric_types = []
+        absolutes = []
+        for byte0, offset in parser.learned_tokens:
+            if CCNxCompressorPayload.is_lz77_token(byte0):
+                continue
+            if huffman:
+                return None
+            if CCNxCompressionContext.is_name_reference(byte0):
+                references.append(offset)
+                continue
+            if CCNxCompressorNumericValue.is_numeric_token(byte0):
+                tlv_type = compressed[offset + 1] & 0x7F
+                if tlv_type in numeric_types:
+                    return None
+                numeric_types.append(tlv_type)
+                if compressed[offset + 1] & 0x80 == 0:
+                    absolutes.append(tlv_type)
+                elif tx_context.tx_bases.get(tlv_type) != rx_context.rx_bases.get(tlv_type):
+                    return None
+                continue
+            return None
+
+        for tlv_type in absolutes:
+            tx_context.tx_bases[tlv_type] = rx_context.rx_bases[tlv_type]
+
+        for offset in references:
+            reference = tx_context.compress_name(parser.name_tlv.value)
+            if reference is None:
+                return None
+            compressed[offset:offset + _name_reference_length] = reference
+
+        if len(parser.body) > 0 and parser.body[0].type == T_INTEREST and parser.name_tlv is not None:
+            tx_context.interest_seen(parser.name_tlv.value)
+
+        CCNxCompressorContextID.decode(compressed)
+        if len(references) > 0:
+            self.__counters['transit_rewritten'] += 1
+        else:
+            self.__counters['transit_forwarded'] += 1
+        return CCNxCompressorContextID.encode(tx_context.context_id) + compressed
+
+    @staticmethod
+    def __transcode(parser, tx_context):
+        decompressor = CCNxNullCompressor(parser)
+        decompressor.encode()
+        uncompressed = CCNxParser(decompressor.encoded)
+        uncompressed.parse()
+        compressor = CCNxCompressor(uncompressed, tx_context)
+        compressor.encode()
+        return compressor.encoded
+
+    @staticmethod
+    def __same(a, b):
+        return a is not None and b is not None and a.dictionary_id == b.dictionary_id and a.digest == b.digest
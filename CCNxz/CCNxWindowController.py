@@ -0,0 +1,186 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Window controllers decide how many Interests the FlowControllerThread keeps outstanding.
+
+The flow controller calls acked() for each content object that satisfies an outstanding
+Interest and lost() for each Interest that times out.  The window is reduced at most
+once per window of Interests: a loss of an Interest sent before the last reduction
+does not reduce it again.
+
+CCNxWindowController itself keeps a fixed window of initial_window Interests.
+
+CCNxAimdWindowController is TCP Reno style.  It doubles the window each RTT in slow
+start, then adds one Interest per RTT, and halves the window on a loss.
+
+CCNxDelayWindowController is TCP Vegas style.  It compares the window with the
+bandwidth-delay product it measures, window * min_rtt / rtt, and keeps between alpha
+and beta Interests queued in the network.  It grows the window while the RTT stays
+near the minimum, so it fills a long path without first having to overflow a buffer,
+and backs off by a factor of 0.7 (as CUBIC does) on a loss.
+"""
+
+__author__ = 'mmosko'
+
+
+class CCNxWindowController(object):
+    def __init__(self, initial_window=4, min_window=1, max_window=128):
+        """
+        :param initial_window: The starting window (Interests)
+        :param min_window: The smallest window
+        :param max_window: The largest window
+        """
+        if not 0 < min_window <= initial_window <= max_window:
+            raise ValueError("Must have 0 < min_window <= initial_window <= max_window")
+
+        self.__min_window = min_window
+        self.__max_window = max_window
+        self.__cwnd = float(initial_window)
+        self.__last_decrease = None
+
+    @property
+    def window(self):
+        """The number of Interests that may be outstanding"""
+        return int(self.__cwnd)
+
+    @property
+    def cwnd(self):
+        """The window as a float, it grows by fractions of an Interest"""
+        return self.__cwnd
+
+    @cwnd.setter
+    def cwnd(self, cwnd):
+        self.__cwnd = min(max(float(cwnd), self.__min_window), self.__max_window)
+
+    @property
+    def min_window(self):
+        return self.__min_window
+
+    @property
+    def max_window(self):
+        return self.__max_window
+
+    def acked(self, rtt):
+        """
+        A content object satisfied an outstanding Interest.
+
+        :param rtt: The RTT sample, or None if the Interest was retransmitted (Karn's rule)
+        """
+        pass
+
+    def lost(self, send_time, now):
+        """
+        An Interest timed out.
+
+        :param send_time: When the Interest was sent
+        :param now: The current time
+        :return: True if the window was reduced
+        """
+        if self.__last_decrease is not None and send_time < self.__last_decrease:
+            return False
+        self.__last_decrease = now
+        self.decrease()
+        return True
+
+    def decrease(self):
+        """Reduce the window after a loss, a fixed window stays as it is"""
+        pass
+
+
+class CCNxAimdWindowController(CCNxWindowController):
+    def __init__(self, initial_window=4, min_window=1, max_window=128):
+        super(CCNxAimdWindowController, self).__init__(initial_window, min_window, max_window)
+        self.__ssthresh = float(max_window)
+
+    @property
+    def ssthresh(self):
+        return self.__ssthresh
+
+    def acked(self, rtt):
+        if self.cwnd < self.__ssthresh:
+            self.cwnd += 1
+        else:
+            self.cwnd += 1.0 / self.cwnd
+
+    def decrease(self):
+        self.__ssthresh = max(self.cwnd / 2.0, self.min_window)
+        self.cwnd = self.__ssthresh
+
+
+class CCNxDelayWindowController(CCNxWindowController):
+    _decrease_factor = 0.7
+
+    def __init__(self, initial_window=4, min_window=1, max_window=128, alpha=1.0, beta=3.0):
+        """
+        :param alpha: Grow the window when fewer than alpha Interests are queued
+        :param beta: Shrink the window when more than beta Interests are queued
+        """
+        super(CCNxDelayWindowController, self).__init__(initial_window, min_window, max_window)
+        if not 0 <= alpha < beta:
+            raise ValueError("Must have 0 <= alpha < beta")
+
+        self.__alpha = alpha
+        self.__beta = beta
+        self.__ssthresh = float(max_window)
+        self.__min_rtt = None
+
+    @property
+    def ssthresh(self):
+        return self.__ssthresh
+
+    def queued(self, rtt):
+        """
+        :return: The estimated number of our Interests (or content objects) queued in the network
+        """
+        return self.cwnd * (rtt - self.__min_rtt) / rtt if rtt > 0 else 0.0
+
+    def acked(self, rtt):
+        if rtt is None:
+            return
+
+        if self.__min_rtt is None or rtt < self.__min_rtt:
+            self.__min_rtt = rtt
+
+        queued = self.queued(rtt)
+        if self.cwnd < self.__ssthresh:
+            if queued <= self.__alpha:
+                self.cwnd += 1
+            else:
+                # leave slow start once a queue builds up
+                self.__ssthresh = self.cwnd
+        elif queued < self.__alpha:
+            self.cwnd += 1.0 / self.cwnd
+        elif queued > self.__beta:
+            self.cwnd -= 1.0 / self.cwnd
+
+    def decrease(self):
+        self.__ssthresh = max(self.cwnd * self._decrease_factor, self.min_window)
+        self.cwnd = self.__ssthresh
+
+
+window_controllers = {
+    'aimd': CCNxAimdWindowController,
+    'delay': CCNxDelayWindowController
+}
@@ -0,0 +1,210 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Runs a client transfer on one thread, driven by socket readiness and the flow
+controller's retransmission timer.
+
+The threaded client passes every packet through a SocketReaderThread, ParserThread,
+FlowControllerThread, ManifestProcessorThread and SocketWriterThread, each polling a
+Queue.  The engine uses the same FlowControllerThread and ManifestProcessorThread
+objects without starting them.  It waits in select() for a datagram or until the
+time FlowControllerThread.service() returns, then parses what was read and passes
+it to FlowControllerThread.receive() inline.  Content objects go from the flow controller
+straight to ManifestProcessorThread.receive() and Interests straight to sendto(),
+through Inline adapters that look like the queues they replace.
+
+Typical usage:
+    engine = CCNxzClientEngine(port, ("127.0.0.1", 9696), name, keyid, reassembler=reassembler)
+    try:
+        engine.run()
+    finally:
+        engine.close()
+"""
+
+__author__ = 'mmosko'
+
+import errno
+import select
+import socket
+import time
+import Queue
+
+from CCNx.CCNxMessageFactory import *
+from CCNxz.QueueEntry import *
+from CCNxz.FlowControllerThread import FlowControllerThread
+from CCNxz.ManifestProcessorThread import ManifestProcessorThread
+
+
+class CCNxzClientEngine(object):
+    _max_reads = 64
+    _read_size = 8192
+
+    class Inline(object):
+        """
+        Stands in for a Queue: put() calls the function with the item right away.
+        """
+        def __init__(self, function):
+            self.__function = function
+
+        def put(self, item):
+            self.__function(item)
+
+    def __init__(self, port, peer, name, keyid, window_controller=None, prefetch_depth=2, reassembler=None,
+                 verifier=None, hash_pool=None, clock=time.time, max_retries=5):
+        """
+        :param port: The local UDP port
+        :param peer: The (host, port) to send Interests to
+        :param name: The CCNxName to fetch
+        :param keyid: byte array of the keyid of the root manifest
+        :param window_controller: A CCNxWindowController, default CCNxAimdWindowController
+        :param prefetch_depth: The number of levels of manifests to fetch ahead of the data
+        :param reassembler: If not None, a CCNxReassembler for the data, else it goes on user_queue
+        :param verifier: If not None, a CCNxVerifier for the root manifest
+        :param hash_pool: An optional CCNxHashPool
+        :param clock: The timer clock, must advance while blocked in select() (so not time.clock)
+        :param max_retries: The number of times an Interest is retransmitted before the transfer fails
+        """
+        self.__peer = peer
+        self.__kill = False
+        self.__send_errors = 0
+
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__socket.bind(("0.0.0.0", port))
+        self.__socket.setblocking(0)
+
+        # Only the root Interest and the manifest scheduler are put on it
+        interest_queue = Queue.Queue()
+        self.__user_queue = Queue.Queue()
+
+        self.__flow_controller = FlowControllerThread(user_read_queue=interest_queue,
+                                                      user_write_queue=CCNxzClientEngine.Inline(self.__deliver),
+                                                      net_read_queue=None,
+                                                      net_write_queue=CCNxzClientEngine.Inline(self.__send),
+                                                      clock=clock,
+                                                      window_controller=window_controller,
+                                                      hash_pool=hash_pool,
+                                                      max_retries=max_retries)
+
+        self.__processor = ManifestProcessorThread(name=name,
+                                                   keyid=keyid,
+                                                   user_write_queue=self.__user_queue,
+                                                   transport_read_queue=None,
+                                                   transport_write_queue=interest_queue,
+                                                   prefetch_depth=prefetch_depth,
+                                                   reassembler=reassembler,
+                                                   verifier=verifier)
+
+    @property
+    def flow_controller(self):
+        return self.__flow_controller
+
+    @property
+    def processor(self):
+        return self.__processor
+
+    @property
+    def user_queue(self):
+        """Content objects for the user, if there is no reassembler"""
+        return self.__user_queue
+
+    @property
+    def failed(self):
+        """Why the transfer failed, or None"""
+        return self.__processor.failed
+
+    @property
+    def socket(self):
+        return self.__socket
+
+    @property
+    def send_errors(self):
+        """The number of Interests the socket would not take"""
+        return self.__send_errors
+
+    def run(self):
+        """
+        Runs the transfer until it is done, fails or stop() is called.
+
+        :return: True if the transfer finished without failing
+        """
+        self.__processor.begin()
+        try:
+            while not self.__kill and not self.__processor.done:
+                timeout = self.__flow_controller.service()
+                readable, writable, errors = select.select([self.__socket], [], [], timeout)
+                if len(readable) > 0:
+                    self.__read()
+        finally:
+            self.__processor.finish()
+
+        print "CCNxzClientEngine exiting run"
+        return self.__processor.done and self.__processor.failed is None
+
+    def stop(self):
+        """
+        Makes run() return the next time it wakes up.  May be called from another thread.
+        """
+        self.__kill = True
+
+    def close(self):
+        """Closes the UDP socket"""
+        self.__socket.close()
+
+    def __read(self):
+        """
+        Reads the datagrams waiting on the socket, up to _max_reads, and gives them to the flow controller.
+        """
+        entries = []
+        while len(entries) < self._max_reads:
+            try:
+                data, address = self.__socket.recvfrom(self._read_size)
+            except socket.error as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+
+            try:
+                message = CCNxMessageFactory.from_wire_format(data)
+            except ValueError as e:
+                print "ERROR: could not parse packet from {}: {}".format(address, e)
+                continue
+            entries.append(QueueEntry(address, data, self.__socket, message))
+
+        if len(entries) > 0:
+            self.__flow_controller.receive(entries)
+
+    def __deliver(self, message):
+        self.__processor.receive(message)
+
+    def __send(self, item):
+        priority, message = item
+        try:
+            self.__socket.sendto(message.wire_format, self.__peer)
+        except socket.error as e:
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS):
+                raise
+            # the Interest times out and is sent again
+            self.__send_errors += 1
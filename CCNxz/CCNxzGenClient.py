@@ -27,113 +27,70 @@
 
 __author__ = 'mmosko'
 
-import time
+import os
 
 from Crypto.PublicKey import RSA
 
-from CCNxz.SocketReaderThread import *
-from CCNxz.CCNxzGenServer import ParserThread
 from CCNx.CCNxName import *
-from CCNxz.FlowControllerThread import *
-from CCNxz.ManifestProcessorThread import *
+from CCNx.CCNxVerifier import CCNxVerifier
+from CCNxz.CCNxHashPool import CCNxHashPool
+from CCNxz.CCNxReassembler import CCNxReassembler
+from CCNxz.CCNxWindowController import window_controllers
+from CCNxz.CCNxzClientEngine import CCNxzClientEngine
 
 
 class CCNxzGenClient(object):
     def __init__(self, args):
         self.__port = args['port']
         self.__name = CCNxNameFactory.from_uri(args['name'])
-        self.__peer = args['peer']
+        host, port = args['peer'].split(":")
+        self.__peer = (host, int(port))
         self.__pubkey = RSA.importKey(open(args['pubkey']).read())
+        self.__verifier = CCNxVerifier()
+        self.__keyid = self.__verifier.add_key(self.__pubkey)
+        self.__window = args.get('window') or 'aimd'
+        self.__hash_threads = args.get('hash_threads') or 0
+        self.__output = args.get('output') or os.path.basename(args['name'].rstrip('/'))
 
     def loop(self):
-        # ======= Queues between components
-
-        # From network to Parser
-        net_to_parser_queue = Queue.Queue()
-
-        # From Parser to Flow Controller
-        parser_to_flow_controller_queue = Queue.Queue()
-
-        # From Manifest Processor to User
-        manifest_to_user_queue = Queue.Queue()
-
-        # From Manifest Processor to Flow Controller
-        manifest_to_flow_controller_queue = Queue.Queue()
-        flow_controller_to_manifest_queue = Queue.Queue()
-
-        socket_writer_queue = Queue.Queue()
-
-        # ======= Threads
-
-        socket_reader_thread = SocketReaderThread(self.__port, net_to_parser_queue, timeout=0.5)
-        parser_thread = ParserThread(net_to_parser_queue, parser_to_flow_controller_queue)
-
-        manifest_processor_thread = ManifestProcessorThread(name=self.__name,
-                                                            user_write_queue=manifest_to_user_queue,
-                                                            to_transport_queue=manifest_to_flow_controller_queue,
-                                                            from_transport_queue=flow_controller_to_manifest_queue)
-
-        flow_controller_thread = FlowControllerThread(user_read_queue=manifest_to_flow_controller_queue,
-                                                      user_write_queue=flow_controller_to_manifest_queue,
-                                                      net_read_queue=parser_to_flow_controller_queue,
-                                                      net_write_queue=socket_writer_queue,
-                                                      clock=time.clock)
-
-        socket_writer_thread = CCNxzGenClient.SocketWriterThread(read_queue=socket_writer_queue,
-                                                                 socket=socket_reader_thread.socket,
-                                                                 peer=self.__peer)
-
-        threads = [socket_reader_thread, parser_thread, flow_controller_thread, manifest_processor_thread,
-                   socket_writer_thread]
-
-        # ====== Now run it all
-
-        for t in threads:
-            t.start()
+        """
+        Runs the transfer on a single thread with a CCNxzClientEngine
 
-        # block until it exits
+        :return: True if the transfer finished, False if it failed or was interrupted
+        """
+        hash_pool = None
+        if self.__hash_threads > 0:
+            hash_pool = CCNxHashPool(self.__hash_threads)
+
+        # Data goes straight to the output file, resuming from a previous run if there is one
+        reassembler = CCNxReassembler(self.__output)
+        if reassembler.written > 0:
+            print "Resuming {} with {} chunks".format(self.__output, reassembler.written)
+
+        engine = CCNxzClientEngine(port=self.__port,
+                                   peer=self.__peer,
+                                   name=self.__name,
+                                   keyid=self.__keyid,
+                                   window_controller=window_controllers[self.__window](),
+                                   reassembler=reassembler,
+                                   verifier=self.__verifier,
+                                   hash_pool=hash_pool)
+
+        # block until the transfer is done
+        ok = False
         try:
-            self.__join(socket_reader_thread)
+            ok = engine.run()
 
         except (KeyboardInterrupt, SystemExit):
             print "Got keyboard interrupt or SystemExit"
 
-        for t in threads:
-            t.stop()
-
-        for t in threads:
-            self.__join(t)
-
-        socket_reader_thread.close()
-
-        print "Exiting CCNxzGenServer loop"
-
-    @staticmethod
-    def __join(thread):
-        while thread.is_alive():
-            thread.join(timeout=0.25)
-
-    class SocketWriterThread(threading.Thread):
-        """
-        The read_queue is a PriorityQueue and the entries are (priority, CCNxMessage).  Reads
-        the CCNxMessage from the read_queue and sends them to self.__peer using self.__socket.
-        """
-        def __init__(self, read_queue, socket, peer):
-            super(CCNxzGenClient.SocketWriterThread, self).__init__()
-
-            self.__read_queue = read_queue
-            self.__socket = socket
-            self.__peer = peer
-            self.__kill = False
-
-        def run(self):
-            while not self.__kill:
-                try:
-                    priority, message = self.__read_queue.get(block=True, timeout=0.2)
-                    self.__socket.sendto(message.wire_format, self.__peer)
-
-                except Queue.Empty:
-                    pass
+        finally:
+            engine.close()
+            if hash_pool is not None:
+                hash_pool.close()
 
-        def stop(self):
-            self.__kill = True
+        print "Flow controller counters: ", engine.flow_controller.counters
+        if engine.failed is not None:
+            print "Transfer failed: ", engine.failed
+        print "Exiting CCNxzGenClient loop"
+        return ok
@@ -25,11 +25,14 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import threading
+import heapq
 from collections import deque
 import Queue
 
 from CCNx.CCNxMessage import *
 from CCNx.CCNxName import *
+from CCNxz.CCNxRttEstimator import *
+from CCNxz.CCNxWindowController import *
 
 __author__ = 'mmosko'
 
@@ -38,19 +41,47 @@ class FlowControllerThread(threading.Thread):
     _rtx_priority = 0
     _data_priority = 1
     _max_expiry_time = 0xFFFFFFFFFFFFFFFF
+    _recent_size = 1024
+    _hash_batch_size = 64
+    _counter_names = ['retransmissions', 'failed', 'late', 'duplicates', 'unmatched']
+
+    class FailedInterest(object):
+        """
+        Put on the user_write_queue in place of a content object when an Interest
+        is still not satisfied after max_retries retransmissions.
+        """
+        def __init__(self, interest, retries):
+            self.__interest = interest
+            self.__retries = retries
+
+        @property
+        def interest(self):
+            return self.__interest
+
+        @property
+        def retries(self):
+            return self.__retries
 
     class TxQueueEntry(object):
         """
-        Stored in the FlowControllerThread __tx_queue.
+        Stored in the FlowControllerThread __tx_queue, a heap ordered by expiry_time.
+
+        When a content object matches the entry, it is marked removed and left in
+        the __tx_queue, which discards it when it reaches the head.
         """
-        def __init__(self, data, expiry_time, send_time):
+        def __init__(self, data, expiry_time, send_time, retransmitted=False):
             self.__data = data
             self.__expiry_time = expiry_time
             self.__send_time = send_time
+            self.__retransmitted = retransmitted
+            self.__removed = False
 
         def __eq__(self, other):
             return self.data == other.data
 
+        def __lt__(self, other):
+            return self.__expiry_time < other.expiry_time
+
         @property
         def data(self):
             return self.__data
@@ -63,22 +94,52 @@ class FlowControllerThread(threading.Thread):
         def send_time(self):
             return self.__send_time
 
-    def __init__(self, user_read_queue, user_write_queue, net_read_queue, net_write_queue, clock):
+        @property
+        def retransmitted(self):
+            """True if the Interest was sent before, so the RTT cannot be sampled (Karn's rule)"""
+            return self.__retransmitted
+
+        @property
+        def removed(self):
+            return self.__removed
+
+        @removed.setter
+        def removed(self, removed):
+            self.__removed = removed
+
+    def __init__(self, user_read_queue, user_write_queue, net_read_queue, net_write_queue, clock,
+                 window_controller=None, max_retries=5, hash_pool=None):
         """
         Reads a queue of Interests from the user and issues them to the network.  handles
         keeping the outstanding number of Interests a reasonable size and hndles re-transmissions.
 
+        Each retransmission of an Interest doubles its timeout.  After max_retries an Interest
+        is given up and a FailedInterest is put on the user_write_queue.  A content object
+        that arrives after its Interest timed out, but before it was sent again, is still
+        delivered.  A second copy of a content object already delivered is dropped.
+
         The net_write_queue is a PriorityQueue and the entries are (priority, CCNxMessage).  Lower
         priorities take precedence.
 
         The net_read_queue should have already parsed the QueueEntry and included the parser
         in the QueueEntry.
 
-        :param user_read_queue: A queue of CCNxMessage (interests) from user to fetch from network
+        The user_read_queue may also hold iterators of CCNxInterest, such as the
+        CCNxManifestScheduler of the ManifestProcessorThread.  They are taken in order and an
+        Interest is only pulled from an iterator when there is room in the window, so
+        memory is bounded by the window and not by the number of Interests.  See __next_interest.
+
+        With a hash_pool, the content objects waiting on the net_read_queue are taken in
+        batches of up to _hash_batch_size and hashed together before they are matched.
+
+        :param user_read_queue: A queue of CCNxMessage (interests), or iterators of them, to fetch from network
         :param user_write_queue: Return CCNxMessage (objects) to user
         :param net_read_queue: A queue of QueueEntry from the network
         :param net_write_queue: A queue of (priority, CCNxMessage) to send to network
         :param clock: Something like time.clock
+        :param window_controller: A CCNxWindowController, default CCNxAimdWindowController
+        :param max_retries: The number of times an Interest is retransmitted before it fails
+        :param hash_pool: An optional CCNxHashPool
         :return:
         """
         super(FlowControllerThread, self).__init__()
@@ -88,23 +149,53 @@ class FlowControllerThread(threading.Thread):
         self.__net_read_queue = net_read_queue
         self.__net_write_queue = net_write_queue
         self.__clock = clock
+        self.__hash_pool = hash_pool
         self.__kill = False
 
-        self.__max_window = 128
-        self.__window_size = 4
-        self.__tx_queue = deque()
+        if window_controller is None:
+            window_controller = CCNxAimdWindowController()
+        self.__window = window_controller
+        self.__rtt = CCNxRttEstimator()
+        self.__tx_queue = []
+        # Outstanding TxQueueEntry indexed by name wire format and by hash restriction.
+        # Each value is a list of entries in send order.
+        self.__by_name = {}
+        self.__by_hash = {}
+        self.__outstanding = 0
         self.__rtx_queue = deque()
-        self.__rtt_estimate = 0.100
-        self.__min_expiry_time = self._max_expiry_time
+        # iterators of Interests taken from the user_read_queue, the head is pulled from first
+        self.__sources = deque()
+
+        # Interests that timed out and are not yet satisfied: key -> (TxQueueEntry, retries)
+        self.__max_retries = max_retries
+        self.__retries = {}
+        # ids of Interests on the rtx queue that were satisfied before they were sent again
+        self.__rtx_cancelled = set()
+        # keys of the last _recent_size satisfied Interests, to recognize duplicates
+        self.__recent = deque()
+        self.__recent_keys = set()
+        self.__counters = dict.fromkeys(self._counter_names, 0)
 
     @property
     def current_window_size(self):
-        return self.__window_size
+        return self.__window.window
+
+    @property
+    def counters(self):
+        return dict(self.__counters)
+
+    @property
+    def window_controller(self):
+        return self.__window
+
+    @property
+    def rtt_estimator(self):
+        return self.__rtt
 
     @property
     def tx_queue_length(self):
-        """Possibly not thread safe..."""
-        return len(self.__tx_queue)
+        """The number of outstanding Interests.  Possibly not thread safe..."""
+        return self.__outstanding
 
     @property
     def rtx_queue_length(self):
@@ -137,6 +228,79 @@ class FlowControllerThread(threading.Thread):
             ok = True
         return ok
 
+    @staticmethod
+    def __name_key(name):
+        if name is None:
+            return None
+        return tuple(name.encode())
+
+    @staticmethod
+    def __hash_key(hash_restr):
+        return tuple(hash_restr)
+
+    @staticmethod
+    def __interest_key(interest):
+        """
+        :return: A key that identifies the content object an Interest asks for
+        """
+        if interest.hash_restr is not None:
+            return 'hash', FlowControllerThread.__hash_key(interest.hash_restr)
+        return 'name', FlowControllerThread.__name_key(interest.name)
+
+    def __index(self, entry):
+        """
+        An Interest with a hash restriction is indexed by the hash, otherwise by name.
+        """
+        if entry.data.hash_restr is not None:
+            index = self.__by_hash
+            key = self.__hash_key(entry.data.hash_restr)
+        else:
+            index = self.__by_name
+            key = self.__name_key(entry.data.name)
+        index.setdefault(key, []).append(entry)
+        self.__outstanding += 1
+
+    def __unindex(self, entry):
+        """
+        Removes the entry from its index.  Does nothing if the entry was not indexed.
+        """
+        if entry.data.hash_restr is not None:
+            index = self.__by_hash
+            key = self.__hash_key(entry.data.hash_restr)
+        else:
+            index = self.__by_name
+            key = self.__name_key(entry.data.name)
+        entries = index.get(key, [])
+        for i in range(len(entries)):
+            if entries[i] is entry:
+                del entries[i]
+                if len(entries) == 0:
+                    del index[key]
+                self.__outstanding -= 1
+                return
+
+    def __lookup(self, message):
+        """
+        Finds the oldest outstanding Interest satisfied by the message.  The message hash
+        is only computed if there are Interests with a hash restriction.
+
+        :param message: A CCNxMessage received from the network
+        :return: The TxQueueEntry or None
+        """
+        name_key = self.__name_key(message.name)
+        candidates = []
+        if len(self.__by_hash) > 0:
+            candidates = self.__by_hash.get(self.__hash_key(message.hash()), [])
+        if name_key is not None:
+            candidates = candidates + self.__by_name.get(name_key, [])
+
+        for tx_entry in candidates:
+            if tx_entry.data.name is not None and self.__name_key(tx_entry.data.name) != name_key:
+                continue
+            if self.__keyid_ok(tx_entry, message):
+                return tx_entry
+        return None
+
     @staticmethod
     def __keyid_from_valag(valalg_tlv):
         for tlv in valalg_tlv.value:
@@ -149,20 +313,14 @@ class FlowControllerThread(threading.Thread):
 
     def run(self):
         while not self.__kill:
-            # will remove expired Interests from the tx queue and put
-            # them on the rtx queue
-            self.__expire_tx_queue()
-            self.__enqueue_tx()
+            wait_time = self.service()
 
             try:
-                wait_time = self.__rtt_estimate
-                if len(self.__tx_queue) > 0:
-                    next_expiry_time = self.__tx_queue[0].expiry_time
-                    delta = max(self.__clock() - next_expiry_time, 0)
-                    wait_time = min(delta, wait_time)
-
                 queue_entry = self.__net_read_queue.get(block=True, timeout=wait_time)
-                self.__receive(queue_entry)
+                if self.__hash_pool is None:
+                    self.receive([queue_entry])
+                else:
+                    self.receive(self.__take_batch(queue_entry))
             except Queue.Empty:
                 pass
 
@@ -171,87 +329,249 @@ class FlowControllerThread(threading.Thread):
     def stop(self):
         self.__kill = True
 
-    def __append_tx_queue(self, message):
+    def service(self):
+        """
+        Does the timer driven work: moves expired Interests to the rtx queue and sends
+        as many Interests as the window allows.  run() calls it every time it wakes up, an
+        event loop driving the flow controller without its thread calls it the same way.
+
+        :return: The number of seconds until service() needs to be called again if nothing arrives
+        """
+        # will remove expired Interests from the tx queue and put
+        # them on the rtx queue
+        self.__expire_tx_queue()
+        self.__enqueue_tx()
+        return self.__wait_time()
+
+    def receive(self, queue_entries):
+        """
+        Matches messages from the network to outstanding Interests.  With a hash_pool,
+        the messages are hashed together first.  Only needed if an Interest has a hash restriction.
+
+        :param queue_entries: A list of parsed QueueEntry
+        """
+        if self.__hash_pool is not None and len(queue_entries) > 1 and len(self.__by_hash) > 0:
+            self.__hash_pool.hash_all([entry.message for entry in queue_entries if entry.message is not None])
+
+        for queue_entry in queue_entries:
+            self.__receive(queue_entry)
+
+    def __take_batch(self, queue_entry):
+        """
+        Takes the entries waiting on the net_read_queue, up to _hash_batch_size.
+
+        :return: The list of QueueEntry, starting with queue_entry
+        """
+        batch = [queue_entry]
+        try:
+            while len(batch) < self._hash_batch_size:
+                batch.append(self.__net_read_queue.get(block=False))
+        except Queue.Empty:
+            pass
+        return batch
+
+    def __wait_time(self):
+        """
+        How long to block on the net_read_queue: until the next retransmission deadline.
+        If the window has room we cannot block on the user_read_queue too, so wake up at
+        least every retransmission timeout to look for new Interests.
+        """
+        next_expiry_time = self.__next_expiry_time()
+        if next_expiry_time == self._max_expiry_time:
+            return self.__rtt.rto
+
+        wait_time = max(next_expiry_time - self.__clock(), 0)
+        if self.__outstanding < self.__window.window:
+            wait_time = min(wait_time, self.__rtt.rto)
+        return wait_time
+
+    def __next_expiry_time(self):
+        """
+        :return: The earliest expiry_time of an outstanding Interest, or _max_expiry_time
+        """
+        self.__discard_removed()
+        if len(self.__tx_queue) > 0:
+            return self.__tx_queue[0].expiry_time
+        return self._max_expiry_time
+
+    def __discard_removed(self):
+        while len(self.__tx_queue) > 0 and self.__tx_queue[0].removed:
+            heapq.heappop(self.__tx_queue)
+
+    def __append_tx_queue(self, message, retransmitted=False):
         """
         Appends a CCNxMessage to the tx_queue with appropriate send_time and
-        expiry_time (based on RTT estimate).
+        expiry_time (based on the retransmission timeout).
 
         :param message: A CCNxMessage
+        :param retransmitted: True if the message was sent before
         :return:
         """
         send_time = self.__clock()
-        expiry_time = send_time + self.__rtt_estimate
-        entry = FlowControllerThread.TxQueueEntry(message, expiry_time, send_time)
-        self.__tx_queue.append(entry)
-        if expiry_time < self.__min_expiry_time:
-            self.__min_expiry_time = expiry_time
+        retries = 0
+        if retransmitted:
+            retries = self.__retries.get(self.__interest_key(message), (None, 0))[1]
+        expiry_time = send_time + self.__rtt.backoff_rto(retries)
+        entry = FlowControllerThread.TxQueueEntry(message, expiry_time, send_time, retransmitted)
+        heapq.heappush(self.__tx_queue, entry)
+        self.__index(entry)
 
     def __receive(self, queue_entry):
         """
-        Match packet to the TX queue.  Update our estimate of the RTT.
-        Remove entry from TX queue.  Send data to the user.
+        Match packet to the TX queue by a dictionary lookup on its name or hash.
+        Update our estimate of the RTT, unless the Interest was retransmitted (Karn's rule),
+        and open the window.  Remove entry from TX queue.  Send data to the user.
         :param queue_entry: A QueueEntry from the network
         :return:
         """
         if queue_entry.message is None:
             raise ValueError("The QueueEntry received from the network does not have a message")
 
-        name = queue_entry.message.name
+        tx_entry = self.__lookup(queue_entry.message)
+        if tx_entry is None:
+            self.__receive_unmatched(queue_entry.message)
+            return
+
+        print "Found match in tx_queue"
+        rtt = None
+        if not tx_entry.retransmitted:
+            rtt = self.__clock() - tx_entry.send_time
+            self.__rtt.sample(rtt)
+        self.__window.acked(rtt)
+
+        self.__unindex(tx_entry)
+        tx_entry.removed = True
+        self.__compact_tx_queue()
+        self.__satisfied(self.__interest_key(tx_entry.data))
+        self.__user_write_queue.put(queue_entry.message)
+
+    def __receive_unmatched(self, message):
+        """
+        The message matches no outstanding Interest.  If it matches an Interest that timed
+        out and waits on the rtx queue, deliver it and cancel the retransmission.  If it
+        is a copy of one we delivered, drop it.
+        """
+        keys = [('name', self.__name_key(message.name)), ('hash', self.__hash_key(message.hash()))]
+        for key in keys:
+            timed_out = self.__retries.get(key)
+            if timed_out is not None and self.__keyid_ok(timed_out[0], message):
+                self.__counters['late'] += 1
+                self.__rtx_cancelled.add(id(timed_out[0].data))
+                self.__window.acked(None)
+                self.__satisfied(key)
+                self.__user_write_queue.put(message)
+                return
+
+        for key in keys:
+            if key in self.__recent_keys:
+                self.__counters['duplicates'] += 1
+                return
+
+        self.__counters['unmatched'] += 1
+        print "ERROR: Could not match packet to TX queue: ", message.wire_format
+
+    def __satisfied(self, key):
+        self.__retries.pop(key, None)
+        if key in self.__recent_keys:
+            return
+        self.__recent.append(key)
+        self.__recent_keys.add(key)
+        if len(self.__recent) > self._recent_size:
+            self.__recent_keys.discard(self.__recent.popleft())
+
+    def __compact_tx_queue(self):
+        """
+        Removed entries stay in the heap until their expiry_time.  If they come to
+        outnumber the outstanding Interests, rebuild the heap without them.
+        """
+        self.__discard_removed()
+        if len(self.__tx_queue) > 2 * self.__outstanding + self.__window.window:
+            self.__tx_queue = [entry for entry in self.__tx_queue if not entry.removed]
+            heapq.heapify(self.__tx_queue)
 
-        for i in range(len(self.__tx_queue)):
-            try:
-                tx_entry = self.__tx_queue[i]
-            except IndexError as err:
-                print "Error trying to read index {} out of {}".format(i, len(self.__tx_queue))
-                raise err
-
-            if tx_entry.data.name == name:
-                if self.__keyid_ok(tx_entry, queue_entry.message) and self.__hash_ok(tx_entry, queue_entry.message):
-                    # Found match!
-                    print "Found match in tx_queue"
-                    del self.__tx_queue[i]
-                    self.__set_min_expiry_time()
-                    self.__user_write_queue.put(queue_entry.message)
-                    break
-            print "ERROR: Could not match packet to TX queue: ", queue_entry.message.wire_format
+    def __input_available(self):
+        return (len(self.__rtx_queue) > 0) or (len(self.__sources) > 0) or (not self.__user_read_queue.empty())
 
-    def __set_min_expiry_time(self):
-        if len(self.__tx_queue) > 0:
-            self.__min_expiry_time = self.__tx_queue[0].expiry_time
-        else:
-            self.__min_expiry_time = self._max_expiry_time
+    def __next_interest(self):
+        """
+        A source may yield a CCNxInterest, a (priority, CCNxInterest) to send it at that
+        network priority, or None if it has nothing to send now but may have later.
 
-    def __input_available(self):
-        return (len(self.__rtx_queue) > 0) or (not self.__user_read_queue.empty())
+        :return: The next (priority, Interest) from the user, or None if there is none now
+        """
+        index = 0
+        while True:
+            if index < len(self.__sources):
+                try:
+                    item = next(self.__sources[index])
+                except StopIteration:
+                    del self.__sources[index]
+                    continue
+                if item is None:
+                    index += 1
+                    continue
+            else:
+                try:
+                    item = self.__user_read_queue.get(block=False)
+                except Queue.Empty:
+                    return None
+                if not isinstance(item, CCNxMessage):
+                    self.__sources.append(iter(item))
+                    continue
+
+            if isinstance(item, CCNxMessage):
+                return self._data_priority, item
+            return item
 
     def __expire_tx_queue(self):
         """
-        Look at the expiry_time at the had of the tx queue and move to rtx queue
-        if it has expired.  Finished when head of queue is not expired.
-
-        This is not correct, as there could be entries beyond the head that will
-        expire sooner because the RTT estimate has decreased.
+        Pop every entry whose expiry_time has passed off the tx queue and move it
+        to the rtx queue and tell the window controller of the loss.  Entries already
+        matched by __receive are discarded.  An Interest that was already retransmitted
+        max_retries times fails.
 
         :return:
         """
+        now = self.__clock()
         while len(self.__tx_queue) > 0:
-            next_expiry = self.__tx_queue[0].expiry_time
-            remaining_expiry_time = next_expiry - self.__clock()
-            if remaining_expiry_time <= 0:
-                expired = self.__tx_queue.popleft()
-                self.__rtx_queue.append(expired.data)
+            if self.__tx_queue[0].removed:
+                heapq.heappop(self.__tx_queue)
+            elif self.__tx_queue[0].expiry_time <= now:
+                expired = heapq.heappop(self.__tx_queue)
+                self.__unindex(expired)
+                self.__window.lost(expired.send_time, now)
+                self.__retransmit(expired)
             else:
                 break
 
+    def __retransmit(self, expired):
+        key = self.__interest_key(expired.data)
+        retries = self.__retries.get(key, (None, 0))[1]
+        if retries >= self.__max_retries:
+            print "ERROR: Interest failed after {} retransmissions: {}".format(retries, expired.data.name)
+            del self.__retries[key]
+            self.__counters['failed'] += 1
+            self.__user_write_queue.put(FlowControllerThread.FailedInterest(expired.data, retries))
+        else:
+            self.__retries[key] = (expired, retries + 1)
+            self.__rtx_queue.append(expired.data)
+
     def __enqueue_tx(self):
-        while len(self.__tx_queue) < self.__window_size and self.__input_available():
+        while self.__outstanding < self.__window.window and self.__input_available():
             # If we have retransmissions waiting, service them first
             if len(self.__rtx_queue) > 0:
                 interest = self.__rtx_queue.popleft()
+                if id(interest) in self.__rtx_cancelled:
+                    self.__rtx_cancelled.remove(id(interest))
+                    continue
+                self.__counters['retransmissions'] += 1
                 self.__net_write_queue.put((self._rtx_priority, interest))
-                self.__append_tx_queue(interest)
-            elif not self.__user_read_queue.empty():
-                interest = self.__user_read_queue.get()
-                self.__net_write_queue.put((self._data_priority, interest))
+                self.__append_tx_queue(interest, retransmitted=True)
+            else:
+                item = self.__next_interest()
+                if item is None:
+                    break
+                priority, interest = item
+                self.__net_write_queue.put((priority, interest))
                 self.__append_tx_queue(interest)
 
@@ -30,18 +30,27 @@ from collections import deque
 from CCNx.CCNxName import *
 from CCNx.CCNxInterest import *
 from CCNx.CCNxManifestParser import *
+from CCNxz.FlowControllerThread import FlowControllerThread
+from CCNxz.CCNxManifestScheduler import *
 
 __author__ = 'mmosko'
 
 
 class ManifestProcessorThread(threading.Thread):
-    def __init__(self, name, keyid, user_write_queue, transport_read_queue, transport_write_queue):
+    def __init__(self, name, keyid, user_write_queue, transport_read_queue, transport_write_queue,
+                 prefetch_depth=2, reassembler=None, verifier=None):
         """
         :param name: The prefix to ask for (will append chunk numbers)
         :param keyid: byte array of the keyid to use when we don't know a hash
         :param user_write_queue: queue of CCNxContentObjects up to user
         :param transport_read_queue: input from the transport (a parsed CCNxMessage)
-        :param transport_write_queue: output to the transport (a CCNxInterest)
+        :param transport_write_queue: output to the transport (a CCNxInterest or a CCNxManifestScheduler)
+        :param prefetch_depth: The number of levels of manifests to fetch ahead of the data
+        :param reassembler: If not None, a CCNxReassembler the data is written to instead of the user_write_queue.
+                            The thread exits once it is complete.
+        :param verifier: If not None, a CCNxVerifier for the signature of the root manifest.  The rest of
+                         the tree is fetched by hash, so is trusted through the root.  The thread exits if
+                         the root does not verify.
         :return:
         """
         super(ManifestProcessorThread, self).__init__()
@@ -50,47 +59,121 @@ class ManifestProcessorThread(threading.Thread):
         self.__user_write_queue = user_write_queue
         self.__transport_read_queue = transport_read_queue
         self.__transport_write_queue = transport_write_queue
+        self.__reassembler = reassembler
+        self.__verifier = verifier
+        self.__have_root = False
+        have_chunk = reassembler.have if reassembler is not None else None
+        self.__scheduler = CCNxManifestScheduler(name, prefetch_depth, have_chunk)
         self.__kill = False
+        self.__failed = None
+
+    @property
+    def scheduler(self):
+        return self.__scheduler
+
+    @property
+    def done(self):
+        """True once the transfer is complete, has failed or the thread was stopped"""
+        return self.__kill
+
+    @property
+    def failed(self):
+        """Why the transfer failed, or None"""
+        return self.__failed
 
     def run(self):
-        self.__fetch_first_manifest()
+        self.begin()
         while not self.__kill:
             try:
                 message = self.__transport_read_queue.get(block=True, timeout=0.2)
-                if message.manifest is None:
-                    # it's data
-                    self.__user_write_queue.put(message)
-                else:
-                    # it's a manifest
-                    self.__receive_manifest(message)
-
+                self.receive(message)
             except Queue.Empty:
                 pass
 
+        self.finish()
         print "ManifestProcessorThread exiting run"
 
     def stop(self):
         self.__kill = True
 
+    def begin(self):
+        """
+        Asks for the root manifest.  run() calls it, an event loop driving the processor
+        without its thread calls begin(), then receive() for each message and finish() when done.
+        """
+        self.__fetch_first_manifest()
+
+    def receive(self, message):
+        """
+        :param message: A CCNxMessage or FlowControllerThread.FailedInterest from the transport
+        """
+        if isinstance(message, FlowControllerThread.FailedInterest):
+            # the transport gave up on a manifest or data chunk, so the transfer cannot finish
+            self.__scheduler.interest_failed(message.interest)
+            self.__fail("Interest {} failed after {} retransmissions".format(message.interest.name,
+                                                                             message.retries))
+        elif message.manifest is None:
+            # it's data
+            self.__receive_data(message)
+        else:
+            # it's a manifest
+            self.__receive_manifest(message)
+
+    def finish(self):
+        """Closes the reassembler, if there is one"""
+        if self.__reassembler is not None:
+            self.__reassembler.close()
+
     def __fetch_first_manifest(self):
         chunk_0 = CCNxNameFactory.from_name(self.__name, 0)
         first_interest = CCNxInterest(chunk_0, self.__keyid, None)
         self.__transport_write_queue.put(first_interest)
+        self.__transport_write_queue.put(self.__scheduler)
 
     def __receive_manifest(self, message):
+        """
+        Give the manifest to the scheduler, the flow controller takes its Interests from there.
+        """
+        if not self.__have_root:
+            # the first manifest is the root, asked for by name and keyid
+            if self.__verifier is not None and not self.__verifier.verify(message):
+                self.__fail("root manifest {} failed verification".format(message.name))
+                return
+            self.__have_root = True
+
         manifest = CCNxManifestParser(message)
-        chunk_number = manifest.manifest_start_chunk
-        for hash_value in manifest.manifest_hash_list:
-            chunked_name = CCNxNameFactory.from_name(self.__name, chunk_number)
-            interest = CCNxInterest(chunked_name, None, hash_value)
-            self.__transport_write_queue.put(interest)
-            print "ManifestProcessor put ", interest
-            chunk_number += 1
-
-        chunk_number = manifest.data_start_chunk
-        for hash_value in manifest.data_hash_list:
-            chunked_name = CCNxNameFactory.from_name(self.__name, chunk_number)
-            interest = CCNxInterest(chunked_name, None, hash_value)
-            self.__transport_write_queue.put(interest)
-            print "ManifestProcessor put ", interest
-            chunk_number += 1
+        if self.__reassembler is not None:
+            try:
+                self.__reassembler.add_manifest(manifest)
+            except ValueError as e:
+                self.__fail("manifest {}: {}".format(message.name, e))
+                return
+        self.__scheduler.add_manifest(message.hash(), manifest)
+        self.__check_complete()
+
+    def __receive_data(self, message):
+        if self.__reassembler is None:
+            self.__user_write_queue.put(message)
+            return
+
+        try:
+            self.__reassembler.add_data(message)
+        except ValueError as e:
+            # e.g. the reorder buffer is full or the chunk does not fit
+            self.__fail("data {}: {}".format(message.name, e))
+            return
+        self.__check_complete()
+
+    def __fail(self, reason):
+        print "ERROR: {}".format(reason)
+        self.__failed = reason
+        self.__kill = True
+
+    def __check_complete(self):
+        """
+        Done once all the manifests have arrived and the reassembler has all their data
+        """
+        if self.__reassembler is not None and self.__reassembler.complete and self.__scheduler.pending_manifests == 0:
+            print "ManifestProcessorThread wrote {} chunks to {}".format(self.__reassembler.written,
+                                                                         self.__reassembler.path)
+            self.__kill = True
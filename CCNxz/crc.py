@@ -0,0 +1,153 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Table-driven CRCs of up to 8 bits, in the bit order of the RFC 4995 shift registers
+(crc3.py, crc7.py, crc8.py).
+
+The register is an integer, kept left aligned in a byte so any width uses the same
+byte step:
+
+    register = table[register ^ byte]
+
+where table[x] is 8 shifts of x through the register with no input.  The tables are
+built once per polynomial.  update_bit() still steps one bit at a time.
+
+batch() runs the same CRC over many equal length byte strings at once with NumPy,
+if it is installed.
+"""
+
+__author__ = 'mmosko'
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_tables = {}
+
+
+def _generate_table(width, taps):
+    """
+    :param width: CRC width in bits (at most 8)
+    :param taps: The register bits XORed with the feedback bit, as an integer
+    :return: list of 256 left aligned registers
+    """
+    shifted_taps = taps << (8 - width)
+    table = []
+    for x in range(256):
+        for i in range(8):
+            if x & 0x80:
+                x = ((x << 1) & 0xFF) ^ shifted_taps
+            else:
+                x = (x << 1) & 0xFF
+        table.append(x)
+    return table
+
+
+class CRC(object):
+    """
+    Subclasses set width and taps.  The register starts as all 1's, like RFC 4995.
+    """
+    width = 8
+    taps = 0
+
+    def __init__(self):
+        key = (self.width, self.taps)
+        if key not in _tables:
+            _tables[key] = _generate_table(self.width, self.taps)
+        self.__table = _tables[key]
+        self.__shift = 8 - self.width
+        self.__taps = self.taps << self.__shift
+        self.__register = 0
+        self.initialize()
+
+    @property
+    def table(self):
+        """The 256 entry table, left aligned"""
+        return self.__table
+
+    def initialize(self):
+        """
+        Set the crc to the initial state.  RFC 4995 initializes the CRC to all 1's.
+        """
+        self.__register = (0xFF << self.__shift) & 0xFF
+
+    def update_bit(self, bit):
+        feedback = bit ^ (self.__register >> 7)
+        self.__register = (self.__register << 1) & 0xFF
+        if feedback:
+            self.__register ^= self.__taps
+
+    def update_byte(self, byte):
+        self.__register = self.__table[self.__register ^ byte]
+
+    def update_bytes(self, byte_list):
+        """
+        :param byte_list: Input octet sequence (list, array, bytearray or string)
+        """
+        if isinstance(byte_list, str):
+            byte_list = bytearray(byte_list)
+        table = self.__table
+        register = self.__register
+        for byte in byte_list:
+            register = table[register ^ byte]
+        self.__register = register
+
+    def finalize(self):
+        return self.__register >> self.__shift
+
+    @classmethod
+    def compute(cls, byte_list):
+        """
+        :return: The CRC of byte_list from the initial state
+        """
+        crc = cls()
+        crc.update_bytes(byte_list)
+        return crc.finalize()
+
+    @classmethod
+    def batch(cls, rows):
+        """
+        The CRC of each row, computed column by column for all rows at once.
+
+        :param rows: 2-d array-like of bytes, one row per input (all the same length)
+        :return: numpy array of CRCs
+        :raises ImportError: If NumPy is not installed
+        """
+        if numpy is None:
+            raise ImportError("CRC.batch needs numpy")
+
+        crc = cls()
+        table = numpy.array(crc.table, dtype=numpy.uint8)
+        rows = numpy.asarray(rows, dtype=numpy.uint8)
+        if rows.ndim != 2:
+            raise ValueError("rows must be 2-dimensional")
+
+        register = numpy.empty(rows.shape[0], dtype=numpy.uint8)
+        crc.initialize()
+        register.fill(crc.__register)
+        for column in range(rows.shape[1]):
+            register = table[register ^ rows[:, column]]
+        return register >> crc.__shift
@@ -47,53 +47,10 @@ Number bit errors   Undetected count
 
 # __author__ = 'mmosko'
 
+from CCNxz.crc import CRC
 
-class CRC3(object):
-    def __init__(self):
-        self.__crc = []
-        self.initialize()
-
-    @staticmethod
-    def _bit_position(bit):
-        return bit % 8
-
-    @staticmethod
-    def _byte_position(bit):
-        return bit / 8
-
-    def initialize(self):
-        """
-        Set the crc to the initial state.  RFC 4995 initializes the CRC to all 1's.
-
-        :return:
-        """
-        self.__crc = [1, 1, 1]
-
-    def update_bit(self, bit):
-        inverted = bit ^ self.__crc[2]
-        self.__crc[2] = self.__crc[1]
-        self.__crc[1] = self.__crc[0] ^ inverted
-        self.__crc[0] = inverted
-
-    def update_byte(self, byte):
-        for pos in range(0, 8):
-            shift = 7 - pos
-            mask = 1 << shift
-            input_bit = (byte & mask) >> shift
-            self.update_bit(input_bit)
-
-    def update_bytes(self, list):
-        """
-        Given a list of bytes, calculate the CRC3 over them.
-
-        :param list: Input octet sequence
-        :return: CRC3 as 1 byte -- only bottom 3 bits matter
-        """
-
-        for pos in range(0, len(list)):
-            self.update_byte(list[pos])
-
-    def finalize(self):
-        output = self.__crc[2] << 2 | self.__crc[1] << 1 | self.__crc[0]
-        return output
 
+class CRC3(CRC):
+    """The RFC 4995 shift register, table-driven (see crc.py)"""
+    width = 3
+    taps = 0b011
@@ -0,0 +1,96 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+crc-32c (Castagnoli) from RFC 3720
+
+polynomial = 0x1EDC6F41, reflected 0x82F63B78
+
+Table-driven like crc.py, but reflected: the register shifts right and the low byte
+indexes the table.  The register starts as all 1's and is inverted at the end, so
+compute("123456789") is 0xE3069283.
+
+Used as the optional whole-frame trailer on the compressed link (see CCNxLinkFrame),
+where 8 bits do not catch enough of the multi-bit errors in a long frame.
+"""
+
+__author__ = 'mmosko'
+
+_polynomial = 0x82F63B78
+_mask = 0xFFFFFFFF
+
+
+def _generate_table():
+    table = []
+    for x in range(256):
+        for i in range(8):
+            if x & 1:
+                x = (x >> 1) ^ _polynomial
+            else:
+                x >>= 1
+        table.append(x)
+    return table
+
+_table = _generate_table()
+
+
+class CRC32C(object):
+    width = 32
+
+    def __init__(self):
+        self.__register = _mask
+
+    @property
+    def table(self):
+        return _table
+
+    def initialize(self):
+        self.__register = _mask
+
+    def update_byte(self, byte):
+        self.__register = _table[(self.__register ^ byte) & 0xFF] ^ (self.__register >> 8)
+
+    def update_bytes(self, byte_list):
+        """
+        :param byte_list: Input octet sequence (list, array, bytearray or string)
+        """
+        if isinstance(byte_list, str):
+            byte_list = bytearray(byte_list)
+        table = _table
+        register = self.__register
+        for byte in byte_list:
+            register = table[(register ^ byte) & 0xFF] ^ (register >> 8)
+        self.__register = register
+
+    def finalize(self):
+        return self.__register ^ _mask
+
+    @classmethod
+    def compute(cls, byte_list):
+        """
+        :return: The CRC of byte_list from the initial state
+        """
+        crc = cls()
+        crc.update_bytes(byte_list)
+        return crc.finalize()
@@ -82,58 +82,10 @@ tested 10 bits of error, ran 1 tests, 0 undetected
 
 # __author__ = 'mmosko'
 
-class CRC7(object):
-    def __init__(self):
-        self.__crc = []
-        self.initialize()
+from CCNxz.crc import CRC
 
-    @staticmethod
-    def _bit_position(bit):
-        return bit % 8
-
-    @staticmethod
-    def _byte_position(bit):
-        return bit / 8
-
-    def initialize(self):
-        """
-        Set the crc to the initial state.  RFC 4995 initializes the CRC to all 1's.
-
-        :return:
-        """
-        self.__crc = [1] * 7
-
-    def update_bit(self, bit):
-        inverted = bit ^ self.__crc[6]
-        self.__crc[6] = self.__crc[5] ^ inverted
-        self.__crc[5] = self.__crc[4]
-        self.__crc[4] = self.__crc[3]
-        self.__crc[3] = self.__crc[2] ^ inverted
-        self.__crc[2] = self.__crc[1] ^ inverted
-        self.__crc[1] = self.__crc[0] ^ inverted
-        self.__crc[0] = inverted
-
-    def update_byte(self, byte):
-        for pos in range(0, 8):
-            shift = 7 - pos
-            mask = 1 << shift
-            input_bit = (byte & mask) >> shift
-            self.update_bit(input_bit)
-
-    def update_bytes(self, list):
-        """
-        Given a list of bytes, calculate the CRC3 over them.
-
-        :param list: Input octet sequence
-        :return: CRC3 as 1 byte -- only bottom 3 bits matter
-        """
-
-        for pos in range(0, len(list)):
-            self.update_byte(list[pos])
-
-    def finalize(self):
-        output = self.__crc[6] << 6 | self.__crc[5] << 5 | self.__crc[4] << 4 |\
-                 self.__crc[3] << 3 | self.__crc[2] << 2 | self.__crc[1] << 1 | \
-                 self.__crc[0]
-        return output
 
+class CRC7(CRC):
+    """The RFC 4995 shift register, table-driven (see crc.py)"""
+    width = 7
+    taps = 0b1001111
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNx.CCNxTypes import *
+from CCNxz.CCNxCompressorNumericValue import *
+
+
+class TestCCNxCompressorNumericValue(unittest.TestCase):
+    def test_varint(self):
+        vectors = [
+            {'n': 0, 'byte_array': [0x00]},
+            {'n': 0x7F, 'byte_array': [0x7F]},
+            {'n': 0x80, 'byte_array': [0x80, 0x01]},
+            {'n': 0x3FFF, 'byte_array': [0xFF, 0x7F]},
+        ]
+
+        for v in vectors:
+            test = CCNxCompressorNumericValue.encode_varint(v['n'])
+            self.assertEqual(test, v['byte_array'])
+            byte_array = v['byte_array'] + [0xFF]
+            self.assertEqual(CCNxCompressorNumericValue.decode_varint(byte_array), v['n'])
+            self.assertEqual(byte_array, [0xFF], "decode_varint consumed too many bytes")
+
+    def test_zigzag(self):
+        for n in [0, 1, -1, 63, -64, 1000, -1000]:
+            self.assertEqual(CCNxCompressorNumericValue.unzigzag(CCNxCompressorNumericValue.zigzag(n)), n)
+
+    def test_expiry_absolute_then_delta(self):
+        encoder = CCNxCompressorNumericValue()
+        decoder = CCNxCompressorNumericValue()
+        expiry = CCNxTlv.number_to_array(0x000001434b198400)
+        # number_to_array gives 8 bytes for 41 bits
+        tlv = CCNxTlv(T_EXPIRY, len(expiry), expiry)
+
+        first = encoder.compress(tlv)
+        second = encoder.compress(tlv)
+        self.assertTrue(len(first) < 1 + tlv.length, "absolute should beat the raw value")
+        self.assertEqual(len(second), 4, "delta of 0 should be 4 bytes, got {}".format(second))
+
+        for encoded in [first, second]:
+            byte_array = list(encoded) + [0xFF]
+            type_length, value = decoder.decompress(byte_array)
+            self.assertEqual(type_length, [0, T_EXPIRY, 0, 8])
+            self.assertEqual(value, list(expiry))
+            self.assertEqual(byte_array, [0xFF])
+
+    def test_not_shorter(self):
+        """A 1-byte chunk number does not get smaller"""
+        encoder = CCNxCompressorNumericValue()
+        tlv = CCNxTlv(T_CHUNK, 1, [5])
+        self.assertTrue(encoder.compress(tlv) is None)
+
+    def test_delta_without_base(self):
+        decoder = CCNxCompressorNumericValue()
+        byte_array = [0xF7, 0x80 | T_EXPIRY, 0x00, 0x00]
+        self.assertRaises(ValueError, decoder.decompress, byte_array)
+
+    def test_truncated(self):
+        decoder = CCNxCompressorNumericValue()
+        token = CCNxCompressorNumericValue().compress(CCNxTlv(T_EXPIRY, 8, [0, 0, 0, 0, 0, 1, 0, 0]))
+        for length in range(1, len(token)):
+            self.assertRaises(ValueError, decoder.decompress, token[:length])
+        self.assertRaises(ValueError, decoder.decompress, [0xF7, 0x80 | T_EXPIRY])
+
+    def test_delta_wrong_base(self):
+        """The decoder missed the absolute value that moved the base"""
+        encoder = CCNxCompressorNumericValue()
+        decoder = CCNxCompressorNumericValue()
+        decoder.decompress(encoder.compress(CCNxTlv(T_EXPIRY, 8, [0, 0, 0, 0, 0, 1, 0, 0])))
+
+        # lost on the link
+        encoder.compress(CCNxTlv(T_EXPIRY, 8, [0, 0, 0, 0, 0, 2, 0, 0]))
+
+        delta = encoder.compress(CCNxTlv(T_EXPIRY, 8, [0, 0, 0, 0, 0, 2, 0, 1]))
+        self.assertTrue(delta[1] & 0x80, "expected a delta: {}".format(delta))
+        self.assertRaises(ValueError, decoder.decompress, list(delta))
+
+        decoder.install(encoder.bases)
+        type_length, value = decoder.decompress(list(delta))
+        self.assertEqual(value, [0, 0, 0, 0, 0, 2, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
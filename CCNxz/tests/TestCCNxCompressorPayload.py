@@ -0,0 +1,156 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+
+from CCNx.CCNxContentObject import *
+from CCNx.CCNxName import *
+from CCNxz.CCNxCompressionContext import *
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxNullCompressor import *
+
+
+def _content_object(chunk, payload):
+    name = CCNxNameFactory.from_uri("lci:/parc/ccnx/log")
+    payload_tlv = CCNxTlv(T_PAYLOAD, len(payload), list(payload))
+    co = CCNxContentObject(CCNxNameFactory.from_name(name, chunk), None, payload_tlv)
+    return list(co.wire_format)
+
+
+def _compress(packet, context):
+    parser = CCNxParser(list(packet))
+    parser.parse()
+    compressor = CCNxCompressor(parser, context)
+    compressor.encode()
+    return compressor.encoded
+
+
+def _decompress(packet, context):
+    parser = CCNxParser(list(packet), context)
+    parser.parse()
+    decompressor = CCNxNullCompressor(parser)
+    decompressor.encode()
+    return decompressor.encoded
+
+
+class TestCCNxCompressorPayload(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(33)
+        self.tx = CCNxCompressionContext(payload_compression="mppc")
+        self.rx = CCNxCompressionContext()
+
+    def _log_line(self, i):
+        level = self.rand.choice(["INFO", "DEBUG", "WARNING"])
+        return [ord(c) for c in "2016-05-0%d %s forwarder: interest lci:/parc/ccnx/log/chunk=%d satisfied\n"
+                % (self.rand.randint(1, 9), level, i)]
+
+    def _relay(self, packet):
+        encoded = _compress(packet, self.tx)
+        self.assertEqual(_decompress(encoded, self.rx), packet)
+        return encoded
+
+    def test_history_across_packets(self):
+        sizes = []
+        for i in range(20):
+            packet = _content_object(i, self._log_line(i) * 2)
+            sizes.append(len(self._relay(packet)))
+
+        counters = self.tx.counters
+        self.assertEqual(counters['payloads_compressed'], 20)
+        self.assertTrue(counters['payload_bytes_out'] < counters['payload_bytes_in'] / 2)
+        # later packets compress better than the first
+        self.assertTrue(sizes[-1] < sizes[0])
+
+    def test_random_payload_sent_as_is(self):
+        payload = [self.rand.randint(0, 255) for i in range(500)]
+        self.assertTrue(CCNxCompressorPayload.sample_entropy(payload) > 7.0)
+        self._relay(_content_object(1, payload))
+        self._relay(_content_object(2, payload[0:80]))
+        self.assertEqual(self.tx.counters['payloads_uncompressed'], 2)
+        self.assertEqual(self.tx.counters['payloads_compressed'], 0)
+
+    def test_short_payload_sent_as_is(self):
+        self._relay(_content_object(1, [0x41] * 10))
+        self.assertEqual(self.tx.counters['payloads_uncompressed'], 1)
+
+    def test_flush_on_loss(self):
+        """
+        A lost payload puts the decompressor out of sync until the NACK flushes the
+        compressor's history
+        """
+        for i in range(3):
+            self._relay(_content_object(i, self._log_line(i) * 2))
+
+        # lost on the way
+        _compress(_content_object(3, self._log_line(3) * 2), self.tx)
+
+        packet = _content_object(4, self._log_line(4) * 2)
+        self.assertRaises(ValueError, _decompress, _compress(packet, self.tx), self.rx)
+        self.rx.decode_failed()
+
+        nack = self.rx.pending_nack()
+        self.assertIsNotNone(nack)
+        self.tx.receive_control(nack)
+        self.assertEqual(self.tx.counters['payload_flushes'], 1)
+
+        self._relay(_content_object(5, self._log_line(5) * 2))
+        self._relay(_content_object(6, self._log_line(6) * 2))
+
+    def test_restarted_decompressor(self):
+        """A new decompressor does not trust a packet that needs history it never saw"""
+        self._relay(_content_object(1, self._log_line(1) * 2))
+        encoded = _compress(_content_object(2, self._log_line(2) * 2), self.tx)
+        self.assertRaises(ValueError, _decompress, encoded, CCNxCompressionContext())
+
+    def test_lz77_dictionary(self):
+        """LZ77 payloads decode on their own with the dictionary, whatever was lost before them"""
+        samples = [self._log_line(i) for i in range(50)]
+        builtin = CCNxDictionary.builtin()
+        dictionary = CCNxDictionary(5, builtin.tuples, builtin.vles,
+                                    payload_dictionary=CCNxLz77.train_dictionary(samples, 2048))
+        self.tx = CCNxCompressionContext(dictionary=dictionary, payload_compression="lz77")
+        self.rx = CCNxCompressionContext(dictionary=dictionary)
+
+        for i in range(5):
+            payload = self._log_line(i)
+            if i % 2 == 0:
+                _compress(_content_object(i, payload), self.tx)
+                continue
+            self._relay(_content_object(i, payload))
+
+        counters = self.tx.counters
+        self.assertEqual(counters['payloads_compressed'], 5)
+        self.assertTrue(counters['payload_bytes_out'] < counters['payload_bytes_in'] / 2)
+
+        loaded = CCNxDictionary.from_dict(dictionary.to_dict())
+        self.assertEqual(loaded.payload_dictionary, dictionary.payload_dictionary)
+        self.assertNotEqual(CCNxDictionary(5, builtin.tuples, builtin.vles).digest, dictionary.digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
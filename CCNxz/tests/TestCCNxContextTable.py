@@ -0,0 +1,308 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import tempfile
+import threading
+import os
+
+from CCNxz.CCNxContextTable import *
+from CCNxz.CCNxDictionaryTrainer import *
+from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxNullCompressor import *
+from CCNxz.Packets import *
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _trained_dictionary(dictionary_id=5):
+    trainer = CCNxDictionaryTrainer()
+    trainer.add_packet(list(Packets.interest))
+    trainer.add_packet(list(Packets.content_object))
+    return trainer.train(dictionary_id)
+
+
+def _compress(contexts, packet):
+    """:return: (context ID used, list of datagrams)"""
+    parser = CCNxParser(list(packet))
+    parser.parse()
+    context = contexts.compression_context()
+    compressor = CCNxCompressor(parser, context)
+    compressor.encode()
+    return context.context_id, contexts.frame(context, compressor.encoded)
+
+
+def _decompress(contexts, datagram):
+    datagram = list(datagram)
+    context = contexts.decompression_context(datagram)
+    context.unframe(datagram)
+    parser = CCNxParser(datagram, context)
+    parser.parse()
+    decompressor = CCNxNullCompressor(parser)
+    decompressor.encode()
+    return decompressor.encoded
+
+
+class TestCCNxContextTable(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.dictionary = _trained_dictionary()
+        self.table_a = CCNxContextTable(clock=self.clock)
+        self.table_b = CCNxContextTable(clock=self.clock)
+
+    def __exchange(self, packet):
+        """Send packet from A to B, delivering any control messages.  Returns what B decoded."""
+        context_id, datagrams = _compress(self.table_a, packet)
+        output = None
+        for datagram in datagrams:
+            if CCNxLinkFrame.is_control(datagram[0]):
+                reply = self.table_b.receive_control(datagram)
+                if reply is not None:
+                    self.table_a.receive_control(reply)
+            else:
+                output = _decompress(self.table_b, datagram)
+        return output
+
+    def test_builtin(self):
+        self.assertEqual(self.table_a.active_context_id, 1)
+        self.assertEqual(self.__exchange(Packets.interest), list(Packets.interest))
+
+    def test_rollover(self):
+        self.table_b.add_dictionary(self.dictionary)
+        context_id = self.table_a.rollover(self.dictionary)
+        self.assertNotEqual(context_id, 1)
+        self.assertEqual(self.table_a.rollover(self.dictionary), context_id, "same dictionary is not a new context")
+
+        # the ANNOUNCE goes ahead of a packet still in the built-in context
+        old_id, old_datagrams = _compress(self.table_a, Packets.content_object)
+        self.assertEqual(old_id, 1)
+        self.assertEqual(old_datagrams[0][0], CCNxLinkFrame.ANNOUNCE)
+        self.table_a.receive_control(self.table_b.receive_control(old_datagrams[0]))
+        self.assertEqual(self.table_a.active_context_id, context_id)
+        self.assertTrue(self.table_a.pending_context_id is None)
+
+        new_id, datagrams = _compress(self.table_a, Packets.interest)
+        self.assertEqual(new_id, context_id)
+        self.assertEqual(_decompress(self.table_b, datagrams[-1]), list(Packets.interest))
+        self.assertEqual(_decompress(self.table_b, old_datagrams[-1]), list(Packets.content_object))
+
+    def test_peer_without_dictionary(self):
+        context_id = self.table_a.rollover(self.dictionary)
+        self.assertEqual(self.__exchange(Packets.interest), list(Packets.interest))
+        self.assertEqual(self.table_a.active_context_id, 1)
+        self.assertEqual(self.table_a.pending_context_id, context_id)
+        self.assertEqual(self.table_a.counters['rejects_received'], 1)
+
+        # announces are rate limited
+        id, datagrams = _compress(self.table_a, Packets.interest)
+        self.assertEqual(len(datagrams), 1)
+        self.clock.now += 2.0
+        id, datagrams = _compress(self.table_a, Packets.interest)
+        self.assertEqual(datagrams[0][0], CCNxLinkFrame.ANNOUNCE)
+
+    def test_peer_restart(self):
+        """The peer forgets our context, we get a REJECT and fall back to context 1"""
+        self.table_b.add_dictionary(self.dictionary)
+        context_id = self.table_a.rollover(self.dictionary)
+        self.__exchange(Packets.interest)
+        self.assertEqual(self.table_a.active_context_id, context_id)
+
+        self.table_b = CCNxContextTable(clock=self.clock)
+        id, datagrams = _compress(self.table_a, Packets.interest)
+        self.assertRaises(ValueError, self.table_b.decompression_context, datagrams[-1])
+
+        replies = self.table_b.pending_replies()
+        self.assertEqual(len(replies), 1)
+        self.table_a.receive_control(replies[0])
+        self.assertEqual(self.table_a.active_context_id, 1)
+        self.assertEqual(self.table_a.pending_context_id, context_id)
+
+    def test_save_load_state(self):
+        self.table_b.add_dictionary(self.dictionary)
+        context_id = self.table_a.rollover(self.dictionary)
+        for i in range(3):
+            self.__exchange(Packets.content_object)
+        tx_state = self.table_a.compression_context().export_state()
+        self.assertTrue(len(tx_state["compress"]) > 0)
+
+        (fd, path) = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.table_a.save_state(path)
+            restored = CCNxContextTable(clock=self.clock)
+            restored.add_dictionary(self.dictionary)
+            restored.load_state(path)
+        finally:
+            os.remove(path)
+
+        # announced again before use, but the bases survive
+        self.assertEqual(restored.active_context_id, 1)
+        self.assertEqual(restored.pending_context_id, context_id)
+        restored.receive_control(CCNxLinkFrame.encode_binding(CCNxLinkFrame.ACCEPT, context_id,
+                                                              self.dictionary.dictionary_id, self.dictionary.digest))
+        self.assertEqual(restored.compression_context().export_state(), tx_state)
+
+    def test_frame_check(self):
+        for frame_check in CCNxLinkFrame.frame_checks:
+            table_a = CCNxContextTable(clock=self.clock, frame_check=frame_check)
+            table_b = CCNxContextTable(clock=self.clock, frame_check=frame_check)
+            id, datagrams = _compress(table_a, Packets.interest)
+            plain_id, plain = _compress(CCNxContextTable(clock=self.clock), Packets.interest)
+            trailer = len(datagrams[-1]) - len(plain[-1])
+            self.assertEqual(trailer, 1 if frame_check == CCNxLinkFrame.CHECK_CRC8 else 4)
+
+            # a bit error is dropped before it reaches the context
+            corrupt = list(datagrams[-1])
+            corrupt[len(corrupt) / 2] ^= 0x10
+            self.assertFalse(table_b.verify_frame(corrupt))
+            self.assertEqual(len(corrupt), len(datagrams[-1]), "bad frame not modified")
+            counters = table_b.counters
+            self.assertEqual(counters['frames_corrupt'], 1)
+            self.assertEqual(counters['frames_received'], 0)
+            self.assertEqual(counters['decode_errors'], 0)
+
+            datagram = list(datagrams[-1])
+            self.assertTrue(table_b.verify_frame(datagram))
+            self.assertEqual(_decompress(table_b, datagram), list(Packets.interest))
+
+            # control replies carry the trailer too
+            self.assertRaises(ValueError, table_b.decompression_context, CCNxCompressorContextID.encode(9) + [0x00])
+            replies = table_b.pending_replies()
+            self.assertEqual(len(replies), 1)
+            self.assertTrue(table_a.verify_frame(replies[0]))
+            self.assertEqual(replies[0][0], CCNxLinkFrame.REJECT)
+
+    def test_fec(self):
+        table_a = CCNxContextTable(clock=self.clock, frame_check=CCNxLinkFrame.CHECK_CRC8, fec_group=4, fec_repair=1)
+        table_b = CCNxContextTable(clock=self.clock, frame_check=CCNxLinkFrame.CHECK_CRC8)
+        packets = [Packets.interest, Packets.content_object, Packets.interest, Packets.content_object]
+        datagrams = []
+        for packet in packets:
+            id, sent = _compress(table_a, packet)
+            datagrams.extend(sent)
+        self.assertEqual(len(datagrams), 5)
+
+        # lose the second datagram, the XOR parity repairs it before the context sees a gap
+        output = []
+        for i, datagram in enumerate(datagrams):
+            if i == 1:
+                continue
+            datagram = list(datagram)
+            self.assertTrue(table_b.verify_frame(datagram))
+            for inner in table_b.receive_link(datagram):
+                output.append(_decompress(table_b, inner))
+        self.assertEqual(output, [list(packet) for packet in packets])
+        counters = table_b.counters
+        self.assertEqual(counters['fec_recovered'], 1)
+        self.assertEqual(counters['frames_lost'], 0)
+
+    def test_bundle(self):
+        table_a = CCNxContextTable(clock=self.clock, bundle_size=1400, bundle_delay=0.001)
+        packets = [Packets.interest, Packets.content_object, Packets.interest]
+        for packet in packets:
+            id, datagrams = _compress(table_a, packet)
+            self.assertEqual(datagrams, [], "held for the bundle")
+        self.assertAlmostEqual(table_a.bundle_wait(0.1), 0.001)
+        self.assertEqual(table_a.bundle_flush(), [])
+
+        self.clock.now += 0.001
+        self.assertEqual(table_a.bundle_wait(0.1), 0.0)
+        bundles = table_a.bundle_flush()
+        self.assertEqual(len(bundles), 1)
+        self.assertEqual(table_a.counters['bundled_frames'], 3)
+        self.assertEqual([_decompress(self.table_b, d) for d in self.table_b.receive_link(bundles[0])],
+                         [list(packet) for packet in packets])
+
+    def test_bundle_size(self):
+        table_a = CCNxContextTable(clock=self.clock, bundle_size=200)
+        sent = []
+        for i in range(8):
+            id, datagrams = _compress(table_a, Packets.interest)
+            sent.extend(datagrams)
+        sent.extend(table_a.bundle_flush(force=True))
+        self.assertTrue(len(sent) > 1)
+        self.assertTrue(all(len(d) <= 200 for d in sent))
+
+        received = []
+        for datagram in sent:
+            received.extend(self.table_b.receive_link(datagram))
+        self.assertEqual(len(received), 8)
+        self.assertEqual(_decompress(self.table_b, received[-1]), list(Packets.interest))
+
+    def test_bundle_size_fec_crc(self):
+        """The FEC header and the frame check fit in the bundle size, repairs included"""
+        table_a = CCNxContextTable(clock=self.clock, bundle_size=165, frame_check=CCNxLinkFrame.CHECK_CRC32C,
+                                   fec_group=4, fec_repair=1)
+        table_b = CCNxContextTable(clock=self.clock, frame_check=CCNxLinkFrame.CHECK_CRC32C)
+        sent = []
+        for i in range(40):
+            id, datagrams = _compress(table_a, Packets.interest)
+            sent.extend(datagrams)
+        sent.extend(table_a.bundle_flush(force=True))
+        sent.extend(table_a.fec_flush())
+        self.assertTrue(len(sent) > 1)
+        self.assertTrue(all(len(d) <= 165 for d in sent), [len(d) for d in sent])
+
+        received = []
+        for datagram in sent:
+            datagram = list(datagram)
+            self.assertTrue(table_b.verify_frame(datagram))
+            received.extend(table_b.receive_link(datagram))
+        self.assertEqual(len(received), 40)
+
+    def test_compress_holds_lock(self):
+        """A NACK on another thread waits until the packet being compressed is framed"""
+        parser = CCNxParser(list(Packets.interest))
+        parser.parse()
+        replies = []
+        nack = threading.Thread(target=lambda: replies.append(
+            self.table_a.receive_control(CCNxLinkFrame.encode_nack(1, 0))))
+
+        def encode(context):
+            nack.start()
+            nack.join(0.1)
+            self.assertTrue(nack.is_alive(), "the NACK did not wait for the compression")
+            compressor = CCNxCompressor(parser, context)
+            compressor.encode()
+            return compressor.encoded
+
+        datagrams = self.table_a.compress(encode)
+        nack.join()
+        self.assertEqual(replies[0][0], CCNxLinkFrame.REFRESH)
+        self.assertEqual(_decompress(self.table_b, datagrams[-1]), list(Packets.interest))
+
+    def test_frame_check_unknown(self):
+        self.assertRaises(ValueError, CCNxContextTable, frame_check="md5")
+
+
+if __name__ == "__main__":
+    unittest.main()
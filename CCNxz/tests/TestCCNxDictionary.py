@@ -0,0 +1,118 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import tempfile
+import os
+
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxDictionaryTrainer import *
+from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxNullCompressor import *
+from CCNxz.Packets import *
+
+
+def _compress(packet):
+    parser = CCNxParser(list(packet))
+    parser.parse()
+    compressor = CCNxCompressor(parser)
+    compressor.encode()
+    return compressor.encoded
+
+
+def _decompress(packet):
+    parser = CCNxParser(list(packet))
+    parser.parse()
+    decompressor = CCNxNullCompressor(parser)
+    decompressor.encode()
+    return decompressor.encoded
+
+
+class TestCCNxDictionary(unittest.TestCase):
+    def tearDown(self):
+        CCNxDictionary.builtin().install()
+
+    def test_builtin_round_trip(self):
+        builtin = CCNxDictionary.builtin()
+        (fd, path) = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            builtin.save(path)
+            loaded = CCNxDictionary.load(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(loaded.dictionary_id, 0)
+        self.assertEqual(loaded.to_dict(), builtin.to_dict())
+
+    def test_bad_entries(self):
+        good = Tuple([0x00, 0x05, 0x00, 0x01], 0x80, 0x0001)
+        self.assertRaises(ValueError, CCNxDictionary, 1, [good, Tuple([0x00, 0x06, 0x00, 0x01], 0x80, 1)], [])
+        self.assertRaises(ValueError, CCNxDictionary, 1, [Tuple([0x00, 0x05, 0x00, 0x01], 0x80, 2)], [])
+        self.assertRaises(ValueError, CCNxDictionary, 1, [Tuple([0x00, 0x05, 0x00, 0x01], 0xC0, 1)], [])
+        self.assertRaises(ValueError, CCNxDictionary, 1, [], [VariableLengthEntry(1, 0x00, 0x08)])
+
+        d = CCNxDictionary(1, [good], []).to_dict()
+        d["format"] = 99
+        self.assertRaises(ValueError, CCNxDictionary.from_dict, d)
+
+    def test_train(self):
+        builtin_lengths = [len(_compress(p)) for p in [Packets.interest, Packets.content_object]]
+
+        trainer = CCNxDictionaryTrainer()
+        (fd, path) = tempfile.mkstemp()
+        try:
+            os.write(fd, array.array("B", Packets.interest * 3 + Packets.content_object).tostring())
+            os.close(fd)
+            trainer.add_file(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(trainer.packets, 4)
+
+        dictionary = trainer.train(dictionary_id=7)
+        self.assertEqual(dictionary.dictionary_id, 7)
+        self.assertTrue(len(dictionary.tuples) > 0)
+        dictionary.install()
+
+        for packet, builtin_length in zip([Packets.interest, Packets.content_object], builtin_lengths):
+            encoded = _compress(packet)
+            self.assertTrue(len(encoded) <= builtin_length,
+                            "trained {} bytes, built-in {} bytes".format(len(encoded), builtin_length))
+            self.assertEqual(_decompress(encoded), list(packet))
+
+    def test_bad_corpus(self):
+        trainer = CCNxDictionaryTrainer()
+        (fd, path) = tempfile.mkstemp()
+        try:
+            os.write(fd, array.array("B", Packets.interest[:-1]).tostring())
+            os.close(fd)
+            self.assertRaises(ValueError, trainer.add_file, path)
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+
+from CCNxz.CCNxFec import *
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCCNxFec(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(38)
+        self.clock = FakeClock()
+
+    def __datagrams(self, count):
+        return [[self.rand.randint(0, 255) for i in range(self.rand.randint(1, 80))] for j in range(count)]
+
+    def __send(self, encoder, datagrams):
+        packets = []
+        for datagram in datagrams:
+            packets.extend(encoder.encode(datagram))
+        return packets
+
+    def test_any_m_losses(self):
+        for repair in range(1, 5):
+            for trial in range(20):
+                encoder = CCNxFecEncoder(group_size=8, repair=repair)
+                decoder = CCNxFecDecoder()
+                datagrams = self.__datagrams(8)
+                packets = self.__send(encoder, datagrams)
+                self.assertEqual(len(packets), 8 + repair)
+
+                lost = set(self.rand.sample(range(len(packets)), repair))
+                output = []
+                for i, packet in enumerate(packets):
+                    if i not in lost:
+                        output.extend(decoder.receive(packet))
+                self.assertEqual(output, datagrams)
+                self.assertEqual(decoder.counters['fec_lost'], 0)
+
+    def test_xor_parity(self):
+        encoder = CCNxFecEncoder(group_size=4, repair=1)
+        datagrams = [[1, 2, 3], [4, 5], [6], [7, 8, 9, 10]]
+        packets = self.__send(encoder, datagrams)
+        parity = packets[-1][3:]
+        self.assertEqual(parity, [0 ^ 0 ^ 0 ^ 0, 3 ^ 2 ^ 1 ^ 4, 1 ^ 4 ^ 6 ^ 7, 2 ^ 5 ^ 8, 3 ^ 9, 10])
+
+    def test_in_order_hold(self):
+        encoder = CCNxFecEncoder(group_size=4, repair=1)
+        decoder = CCNxFecDecoder()
+        datagrams = self.__datagrams(4)
+        packets = self.__send(encoder, datagrams)
+
+        self.assertEqual(decoder.receive(packets[0]), [datagrams[0]])
+        self.assertEqual(decoder.receive(packets[2]), [], "held behind the loss")
+        self.assertEqual(decoder.receive(packets[3]), [])
+        self.assertEqual(decoder.receive(packets[4]), datagrams[1:])
+        self.assertEqual(decoder.counters['fec_recovered'], 1)
+
+    def test_unrepaired_loss(self):
+        encoder = CCNxFecEncoder(group_size=4, repair=1)
+        decoder = CCNxFecDecoder(hold_time=0.5, clock=self.clock)
+        datagrams = self.__datagrams(4)
+        packets = self.__send(encoder, datagrams)
+
+        decoder.receive(packets[0])
+        decoder.receive(packets[2])
+        self.assertEqual(decoder.expire(), [])
+        self.clock.now += 1.0
+        self.assertEqual(decoder.expire(), [datagrams[2]])
+
+        # the next group starts, the rest of the old one is given up
+        self.assertEqual(decoder.receive(packets[3]), [datagrams[3]])
+        next_group = self.__send(encoder, self.__datagrams(1))
+        decoder.receive(next_group[0])
+        self.assertEqual(decoder.counters['fec_lost'], 1)
+
+    def test_flush(self):
+        encoder = CCNxFecEncoder(group_size=8, repair=2)
+        decoder = CCNxFecDecoder()
+        datagrams = self.__datagrams(3)
+        packets = self.__send(encoder, datagrams)
+        self.assertEqual(len(packets), 3)
+        packets.extend(encoder.flush())
+        self.assertEqual(len(packets), 5)
+        self.assertEqual(encoder.flush(), [])
+
+        output = []
+        for packet in packets[2:]:
+            output.extend(decoder.receive(packet))
+        self.assertEqual(output, datagrams)
+
+    def test_flush_no_repair(self):
+        encoder = CCNxFecEncoder(group_size=8, repair=0)
+        decoder = CCNxFecDecoder(hold_time=0.5, clock=self.clock)
+        datagrams = self.__datagrams(3)
+        packets = self.__send(encoder, datagrams)
+        end = encoder.flush()
+        self.assertEqual(end, [[CCNxLinkFrame.FEC_REPAIR, 0, 2]])
+
+        output = []
+        for packet in packets + end:
+            output.extend(decoder.receive(packet))
+        self.assertEqual(output, datagrams)
+
+        # the group had 3 sources, not 8, so nothing was lost
+        decoder.receive(self.__send(encoder, self.__datagrams(1))[0])
+        self.assertEqual(decoder.counters['fec_lost'], 0)
+
+    def test_recover_on_late_source(self):
+        encoder = CCNxFecEncoder(group_size=4, repair=1)
+        decoder = CCNxFecDecoder()
+        datagrams = self.__datagrams(4)
+        packets = self.__send(encoder, datagrams)
+
+        # source 1 is lost and source 3 arrives after the repair
+        output = []
+        for i in [0, 2, 4, 3]:
+            output.extend(decoder.receive(packets[i]))
+        self.assertEqual(output, datagrams)
+        self.assertEqual(decoder.counters['fec_recovered'], 1)
+
+    def test_empty_source(self):
+        """A corrupt source with no datagram, or an empty datagram, is not handed on"""
+        encoder = CCNxFecEncoder(group_size=4, repair=1)
+        decoder = CCNxFecDecoder()
+        datagrams = self.__datagrams(4)
+        packets = self.__send(encoder, datagrams)
+
+        self.assertEqual(decoder.receive(packets[0][:3]), [])
+        self.assertEqual(decoder.receive(packets[1]), [datagrams[1]])
+        self.assertEqual(decoder.receive(packets[3][:3]), [], "held behind the loss")
+        self.assertEqual(decoder.receive(packets[2]), [datagrams[2]])
+        self.assertEqual(decoder.receive(packets[4]), [])
+        self.assertEqual(decoder.receive([]), [])
+
+    def test_pass_through(self):
+        decoder = CCNxFecDecoder()
+        self.assertEqual(decoder.receive([0x81, 0x01]), [[0x81, 0x01]])
+
+    def test_adaptive(self):
+        encoder = CCNxFecEncoder(group_size=8, repair=4, adaptive=True, max_repair=4)
+        decoder = CCNxFecDecoder(report_interval=2)
+        for group in range(5):
+            packets = self.__send(encoder, self.__datagrams(8))
+            for packet in packets[2:]:
+                decoder.receive(packet)
+            report = decoder.pending_report()
+            if report is not None:
+                encoder.receive_report(report)
+        self.assertTrue(encoder.loss > 0.0)
+        self.assertTrue(encoder.repair >= 2)
+
+        for group in range(20):
+            encoder.receive_report([CCNxLinkFrame.FEC_REPORT, 0, 32])
+        self.assertEqual(encoder.repair, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNx.CCNxContentObject import *
+from CCNx.CCNxName import *
+from CCNxz.CCNxHashPool import *
+
+
+class TestCCNxHashPool(unittest.TestCase):
+    @staticmethod
+    def make_messages():
+        name = CCNxNameFactory.from_uri("lci:/apple")
+        messages = []
+        for chunk_number in range(10):
+            payload = [chunk_number] * (500 * chunk_number)
+            payload_tlv = CCNxTlv(T_PAYLOAD, len(payload), payload)
+            messages.append(CCNxContentObject(CCNxNameFactory.from_name(name, chunk_number), None, payload_tlv))
+        return messages
+
+    def setUp(self):
+        # hashed on their own, so the pool does not find the digests cached
+        self.truth = [co.hash() for co in self.make_messages()]
+
+    def test_threads(self):
+        pool = CCNxHashPool(threads=3)
+        try:
+            self.assertEqual(pool.hash_all(self.make_messages()), self.truth)
+        finally:
+            pool.close()
+
+    def test_no_threads(self):
+        pool = CCNxHashPool(threads=0)
+        self.assertEqual(pool.hash_all(self.make_messages()), self.truth)
+        pool.close()
+
+    def test_bad_threads(self):
+        self.assertRaises(ValueError, CCNxHashPool, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
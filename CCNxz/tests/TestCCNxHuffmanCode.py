@@ -0,0 +1,155 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+
+from CCNxz.CCNxHuffmanCode import *
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxDictionaryTrainer import *
+from CCNxz.CCNxCompressionContext import *
+from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxNullCompressor import *
+from CCNxz.Packets import *
+
+
+def _compress(packet, context):
+    parser = CCNxParser(list(packet))
+    parser.parse()
+    compressor = CCNxCompressor(parser, context)
+    compressor.encode()
+    return compressor.encoded
+
+
+def _decompress(packet, context):
+    parser = CCNxParser(list(packet), context)
+    parser.parse()
+    decompressor = CCNxNullCompressor(parser)
+    decompressor.encode()
+    return decompressor.encoded
+
+
+def _huffman_dictionary():
+    trainer = CCNxDictionaryTrainer()
+    for packet in [Packets.interest, Packets.interest, Packets.content_object]:
+        trainer.add_packet(list(packet))
+    return trainer.train(dictionary_id=3, huffman=True)
+
+
+class TestCCNxHuffmanCode(unittest.TestCase):
+    def test_canonical(self):
+        code = CCNxHuffmanCode.from_counts({'A': 10, 'B': 5, 'C': 3, 'D': 3, 'E': 1}, add_escapes=False)
+        self.assertEqual(code.code_lengths, {'A': 1, 'B': 2, 'C': 4, 'D': 3, 'E': 4})
+        self.assertEqual(code.encode_table['A'], (0b0, 1))
+        self.assertEqual(code.encode_table['B'], (0b10, 2))
+        self.assertEqual(code.encode_table['D'], (0b110, 3))
+        self.assertEqual(code.encode_table['C'], (0b1110, 4))
+        self.assertEqual(code.encode_table['E'], (0b1111, 4))
+
+    def test_length_limit(self):
+        # Fibonacci weights give a maximally deep tree
+        counts = {}
+        a, b = 1, 1
+        for symbol in range(30):
+            counts[symbol] = a
+            a, b = b, a + b
+
+        self.assertRaises(ValueError, CCNxHuffmanCode.from_counts, counts, 17)
+
+        code = CCNxHuffmanCode.from_counts(counts, 8, add_escapes=False)
+        self.assertEqual(code.max_code_length, 8)
+        self.assertEqual(sum(2 ** -n for n in code.code_lengths.values()), 1.0)
+        # more frequent symbols never get longer codes
+        self.assertTrue(code.code_lengths[29] <= code.code_lengths[10] <= code.code_lengths[0])
+
+    def test_bad_lengths(self):
+        self.assertRaises(ValueError, CCNxHuffmanCode, {'A': 1})
+        self.assertRaises(ValueError, CCNxHuffmanCode, {'A': 1, 'B': 2})
+        self.assertRaises(ValueError, CCNxHuffmanCode, {'A': 1, 'B': 1, 'C': 2})
+
+    def test_bit_stream(self):
+        rand = random.Random(7)
+        counts = dict((symbol, rand.randint(1, 1000)) for symbol in range(100))
+        code = CCNxHuffmanCode.from_counts(counts, 10)
+        symbols = [rand.randint(0, 99) for i in range(500)] + [ESCAPE, LEARNED]
+
+        writer = CCNxBitWriter()
+        for symbol in symbols:
+            writer.write(*code.encode_table[symbol])
+        writer.write(0xABCD, 16)
+        reader = CCNxBitReader(writer.flush())
+
+        self.assertEqual([reader.decode(code) for symbol in symbols], symbols)
+        self.assertEqual(reader.read(16), 0xABCD)
+        self.assertRaises(ValueError, reader.decode, code)
+
+
+class TestCCNxCompressorHuffman(unittest.TestCase):
+    def setUp(self):
+        self.dictionary = _huffman_dictionary()
+
+    def test_dictionary_round_trip(self):
+        loaded = CCNxDictionary.from_dict(self.dictionary.to_dict())
+        self.assertEqual(loaded.huffman_code.code_lengths, self.dictionary.huffman_code.code_lengths)
+        self.assertEqual(loaded.digest, self.dictionary.digest)
+
+        plain = CCNxDictionary(3, self.dictionary.tuples, self.dictionary.vles)
+        self.assertNotEqual(plain.digest, self.dictionary.digest)
+
+    def test_round_trip(self):
+        for packet in [Packets.interest, Packets.content_object]:
+            byte_codec = _compress(packet, CCNxCompressionContext())
+            encoded = _compress(packet, CCNxCompressionContext(dictionary=self.dictionary))
+            self.assertTrue(len(encoded) < len(byte_codec),
+                            "Huffman {} bytes, byte codec {} bytes".format(len(encoded), len(byte_codec)))
+            self.assertEqual(_decompress(encoded, CCNxCompressionContext(dictionary=self.dictionary)), packet)
+
+    def test_unknown_tl_pair(self):
+        # A code that knows none of the packet's TL pairs escapes every one
+        code = CCNxHuffmanCode.from_counts({})
+        dictionary = CCNxDictionary(4, [], [], code)
+        encoded = _compress(Packets.interest, CCNxCompressionContext(dictionary=dictionary))
+        self.assertEqual(_decompress(encoded, CCNxCompressionContext(dictionary=dictionary)), Packets.interest)
+
+    def test_learned_tokens(self):
+        """Name elision and numeric values go through the LEARNED symbol"""
+        context_a = CCNxCompressionContext(dictionary=self.dictionary)
+        context_b = CCNxCompressionContext(dictionary=self.dictionary)
+
+        self._relay(Packets.interest, context_a, context_b)
+        first = self._relay(Packets.content_object, context_b, context_a)
+        self._relay(Packets.interest, context_a, context_b)
+        second = self._relay(Packets.content_object, context_b, context_a)
+        self.assertTrue(len(second) < len(first))
+
+    def _relay(self, packet, tx, rx):
+        encoded = _compress(packet, tx)
+        self.assertEqual(_decompress(encoded, rx), packet)
+        return encoded
+
+
+if __name__ == "__main__":
+    unittest.main()
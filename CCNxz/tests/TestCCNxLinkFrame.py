@@ -0,0 +1,161 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNx.CCNxTypes import *
+from CCNx.CCNxTlv import *
+from CCNxz.CCNxLinkFrame import *
+from CCNxz.CCNxCompressionContext import *
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _expiry(value):
+    return CCNxTlv(T_EXPIRY, 8, [(value >> (8 * i)) & 0xFF for i in range(7, -1, -1)])
+
+
+class TestCCNxLinkFrame(unittest.TestCase):
+    def test_first_bytes(self):
+        """Link frames must not collide with a context ID"""
+        for byte0 in range(0x80, 0xE0):
+            self.assertFalse(CCNxLinkFrame.is_link_frame(byte0))
+        self.assertTrue(CCNxLinkFrame.is_sequenced(0xE5))
+        self.assertTrue(CCNxLinkFrame.is_control(CCNxLinkFrame.REFRESH))
+        self.assertTrue(CCNxLinkFrame.is_control(CCNxLinkFrame.NACK))
+
+    def test_bundle(self):
+        datagrams = [[0xE1, 0x81], range(200), [CCNxLinkFrame.NACK, 1, 3]]
+        bundle = CCNxLinkFrame.encode_bundle(datagrams)
+        self.assertEqual(bundle[0:4], [CCNxLinkFrame.BUNDLE, 2, 0xE1, 0x81])
+        self.assertEqual(len(bundle), 1 + 1 + 2 + 2 + 200 + 1 + 3)
+        self.assertEqual(CCNxLinkFrame.decode_bundle(bundle), datagrams)
+        self.assertEqual(CCNxLinkFrame.decode_bundle([0xE1, 0x81]), [[0xE1, 0x81]])
+        self.assertRaises(ValueError, CCNxLinkFrame.decode_bundle, bundle[:-1])
+
+    def test_sequenced(self):
+        frame = CCNxLinkFrame.encode_sequenced(21, [0x81, 0x02])
+        self.assertEqual(frame, [0xE5, 0x81, 0x02])
+        self.assertEqual(CCNxLinkFrame.decode_sequenced(frame), 5)
+        self.assertEqual(frame, [0x81, 0x02])
+
+    def test_refresh(self):
+        bases = {T_EXPIRY: 0x000001434b198400, T_CHUNK: 7}
+        message = CCNxLinkFrame.encode_refresh(3, bases)
+        self.assertEqual(CCNxLinkFrame.decode_refresh(message), (3, bases))
+
+        message[4] ^= 0x10
+        self.assertRaises(ValueError, CCNxLinkFrame.decode_refresh, message)
+
+    def test_nack(self):
+        message = CCNxLinkFrame.encode_nack(3, 9)
+        self.assertEqual(CCNxLinkFrame.decode_nack(message), (3, 9))
+
+
+class TestCCNxContextResync(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.context_a = CCNxCompressionContext(refresh_interval=0, clock=self.clock)
+        self.context_b = CCNxCompressionContext(refresh_interval=0, clock=self.clock)
+
+    def __send(self, value):
+        """Compress a T_EXPIRY at A and return the frame B would receive"""
+        encoded = self.context_a.compress_number(_expiry(value))
+        datagrams = self.context_a.frame(encoded)
+        self.assertEqual(len(datagrams), 1)
+        return datagrams[0]
+
+    def __receive(self, frame):
+        byte_array = list(frame)
+        self.context_b.unframe(byte_array)
+        try:
+            type_length, value = self.context_b.decompress_type_length(byte_array), byte_array
+            return CCNxTlv.array_to_number(value)
+        except ValueError:
+            self.context_b.decode_failed()
+            return None
+
+    def test_in_order(self):
+        for value in [0x10000, 0x10001, 0x10002]:
+            self.assertEqual(self.__receive(self.__send(value)), value)
+        self.assertTrue(self.context_b.pending_nack() is None)
+        self.assertEqual(self.context_b.counters['frames_received'], 3)
+        self.assertEqual(self.context_b.counters['frames_lost'], 0)
+
+    def test_loss_nack_refresh(self):
+        self.__receive(self.__send(0x10000))
+        self.__send(0x20000)        # lost, moves the base
+        delta = self.__send(0x20001)
+
+        self.assertTrue(self.__receive(delta) is None)
+        counters = self.context_b.counters
+        self.assertEqual(counters['frames_lost'], 1)
+        self.assertEqual(counters['decode_errors'], 1)
+
+        nack = self.context_b.pending_nack()
+        self.assertEqual(nack[0], CCNxLinkFrame.NACK)
+        self.assertTrue(self.context_b.pending_nack() is None, "only one NACK per loss")
+
+        refresh = self.context_a.receive_control(nack)
+        self.assertEqual(refresh[0], CCNxLinkFrame.REFRESH)
+        self.assertTrue(self.context_b.receive_control(refresh) is None)
+
+        self.assertEqual(self.__receive(self.__send(0x20002)), 0x20002)
+        self.assertEqual(self.context_a.counters['nacks_received'], 1)
+        self.assertEqual(self.context_b.counters['refreshes_received'], 1)
+
+    def test_nack_holdoff(self):
+        self.__receive(self.__send(0x10000))
+        self.context_b.decode_failed()
+        self.assertTrue(self.context_b.pending_nack() is not None)
+        self.context_b.decode_failed()
+        self.assertTrue(self.context_b.pending_nack() is None)
+        self.clock.now += 1.0
+        self.assertTrue(self.context_b.pending_nack() is not None)
+
+    def test_periodic_refresh(self):
+        context = CCNxCompressionContext(refresh_interval=4)
+        context.compress_number(_expiry(0x10000))
+        counts = [len(context.frame([0x81])) for i in range(8)]
+        self.assertEqual(counts, [2, 1, 1, 1, 2, 1, 1, 1])
+
+    def test_corrupt_refresh(self):
+        self.__send(0x10000)
+        refresh = self.context_a.refresh()
+        refresh[-1] ^= 0x01
+        self.assertTrue(self.context_b.receive_control(refresh) is None)
+        self.assertEqual(self.context_b.counters['control_errors'], 1)
+        self.assertEqual(self.context_b.counters['refreshes_received'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+
+from CCNxz.CCNxLz77 import *
+
+
+class TestCCNxLz77(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(77)
+
+    def _record(self, i):
+        return '{"user":"u%d","op":"%s","path":"/parc/ccnx/data/%d","ok":true}' % (
+            i, self.rand.choice(["read", "write", "stat"]), self.rand.randint(0, 1000))
+
+    def test_round_trip(self):
+        lz77 = CCNxLz77()
+        cases = ["", "a", "abcd" * 3, "a" * 5000, "".join(chr(self.rand.randint(0, 255)) for i in range(3000)),
+                 "".join(self._record(i) for i in range(100))]
+        for data in cases:
+            block = lz77.compress(data)
+            self.assertEqual(lz77.decompress(block), data)
+
+        self.assertTrue(len(lz77.compress("a" * 5000)) < 50)
+        # literal and match lengths past a nibble, and offsets past a byte
+        data = "".join(chr(self.rand.randint(0, 255)) for i in range(300)) * 3
+        self.assertEqual(lz77.decompress(lz77.compress(data)), data)
+
+    def test_dictionary(self):
+        samples = [self._record(i) for i in range(200)]
+        dictionary = CCNxLz77.train_dictionary(samples[0:100], dictionary_size=1024)
+        self.assertTrue(0 < len(dictionary) <= 1024)
+
+        plain = CCNxLz77()
+        primed = CCNxLz77(dictionary)
+        plain_length = 0
+        primed_length = 0
+        for data in samples[100:]:
+            block = primed.compress(data)
+            self.assertEqual(primed.decompress(block), data)
+            primed_length += len(block)
+            plain_length += len(plain.compress(data))
+        self.assertTrue(primed_length < plain_length / 2,
+                        "primed {} bytes, plain {} bytes".format(primed_length, plain_length))
+
+        # a block that copies from the dictionary does not decode without it
+        block = primed.compress(samples[150])
+        self.assertNotEqual(self._decompress_or_none(plain, block), samples[150])
+
+    @staticmethod
+    def _decompress_or_none(lz77, block):
+        try:
+            return lz77.decompress(block)
+        except ValueError:
+            return None
+
+    def test_bad_block(self):
+        lz77 = CCNxLz77()
+        # 1 literal then a match with offset 2 (before the start)
+        self.assertRaises(ValueError, lz77.decompress, [0x10, 0x41, 0x00, 0x02])
+        # truncated literals
+        self.assertRaises(ValueError, lz77.decompress, [0x50, 0x41])
+        # truncated offset
+        self.assertRaises(ValueError, lz77.decompress, [0x10, 0x41, 0x00])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNxz.CCNxManifestScheduler import *
+
+
+class FakeManifest(object):
+    """Stands in for a CCNxManifestParser, hashes are [chunk_number]"""
+    def __init__(self, manifest_chunks, data_chunks):
+        self.manifest_start_chunk = manifest_chunks[0] if manifest_chunks else None
+        self.manifest_hash_list = [[c] for c in manifest_chunks]
+        self.data_start_chunk = data_chunks[0] if data_chunks else None
+        self.data_hash_list = [[c] for c in data_chunks]
+
+
+class TestCCNxManifestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.name = CCNxNameFactory.from_uri("lci:/apple")
+
+    @staticmethod
+    def drain(scheduler):
+        """:return: list of (priority, chunk) until the scheduler is idle or done"""
+        out = []
+        for item in scheduler:
+            if item is None:
+                break
+            out.append((item[0], item[1].name.chunk_number))
+        return out
+
+    def test_manifests_before_data(self):
+        scheduler = CCNxManifestScheduler(self.name, prefetch_depth=2)
+        scheduler.add_manifest([0], FakeManifest([1, 2], [100, 101]))
+        self.assertEqual(self.drain(scheduler), [(0, 1), (0, 2), (1, 100), (1, 101)])
+        self.assertEqual(scheduler.pending_manifests, 2)
+
+        # the grandchild manifest goes ahead of all data, then the data in tree order
+        scheduler.add_manifest([2], FakeManifest([3], [104, 105]))
+        scheduler.add_manifest([1], FakeManifest([], [102, 103]))
+        self.assertEqual(self.drain(scheduler), [(0, 3), (1, 102), (1, 103), (1, 104), (1, 105)])
+
+    def test_data_in_pre_order(self):
+        """Data of the manifests received is taken in tree order, whatever order they arrived in"""
+        scheduler = CCNxManifestScheduler(self.name, prefetch_depth=0)
+        scheduler.add_manifest([0], FakeManifest([1, 2], [100]))
+        self.assertEqual(self.drain(scheduler), [(0, 1), (0, 2), (1, 100)])
+
+        scheduler.add_manifest([2], FakeManifest([], [103]))
+        scheduler.add_manifest([1], FakeManifest([3], [101]))
+        # the deep manifest 3 goes just ahead of the data of its parent
+        self.assertEqual(self.drain(scheduler), [(0, 3), (1, 101), (1, 103)])
+        scheduler.add_manifest([3], FakeManifest([], [102]))
+        self.assertEqual(self.drain(scheduler), [(1, 102)])
+        self.assertRaises(StopIteration, scheduler.next)
+
+    def test_idle_and_done(self):
+        scheduler = CCNxManifestScheduler(self.name)
+        self.assertIsNone(scheduler.next())
+
+        scheduler.add_manifest([0], FakeManifest([1], []))
+        self.assertEqual(self.drain(scheduler), [(0, 1)])
+        self.assertIsNone(scheduler.next())
+
+        failed = CCNxInterest(CCNxNameFactory.from_name(self.name, 1), None, [1])
+        scheduler.interest_failed(failed)
+        self.assertEqual(scheduler.pending_manifests, 0)
+        self.assertRaises(StopIteration, scheduler.next)
+
+    def test_pending_before_taken(self):
+        """The children of a manifest are outstanding as soon as it arrives"""
+        scheduler = CCNxManifestScheduler(self.name)
+        scheduler.add_manifest([0], FakeManifest([1, 2], [100]))
+        self.assertEqual(scheduler.pending_manifests, 2)
+        self.assertEqual(scheduler.next()[1].name.chunk_number, 1)
+
+        scheduler.add_manifest([1], FakeManifest([], [101]))
+        self.assertEqual(scheduler.pending_manifests, 1)
+        self.assertEqual(self.drain(scheduler), [(0, 2), (1, 100), (1, 101)])
+        self.assertEqual(scheduler.pending_manifests, 1)
+
+    def test_have_chunk(self):
+        """Data already on hand, e.g. from a resumed download, is not asked for"""
+        scheduler = CCNxManifestScheduler(self.name, have_chunk=lambda chunk: chunk in (100, 102))
+        scheduler.add_manifest([0], FakeManifest([1], [100, 101, 102, 103]))
+        self.assertEqual(self.drain(scheduler), [(0, 1), (1, 101), (1, 103)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNx.CCNxName import *
+from CCNxz.CCNxPendingInterestTable import *
+
+
+class TestCCNxPendingInterestTable(unittest.TestCase):
+    def clock(self):
+        return self.time
+
+    def setUp(self):
+        self.time = 100.0
+        self.table = CCNxPendingInterestTable(timeout=1.0, clock=self.clock)
+        self.apple = CCNxNameFactory.from_uri("lci:/apple/pie").segments()
+        self.berry = CCNxNameFactory.from_uri("lci:/berry/pie").segments()
+
+    def test_match_after_insert(self):
+        self.table.insert(self.apple)
+        reference = self.table.match(self.apple)
+        self.assertEqual(reference, CCNxPendingInterestTable.fingerprint(self.apple))
+        # a match consumes the entry
+        self.assertEqual(len(self.table), 0)
+
+    def test_match_miss(self):
+        self.table.insert(self.apple)
+        self.assertTrue(self.table.match(self.berry) is None, "berry should not match")
+        self.assertEqual(self.table.misses, 1)
+
+    def test_resolve(self):
+        self.table.insert(self.apple)
+        slot, check = CCNxPendingInterestTable.fingerprint(self.apple)
+        segments = self.table.resolve(slot, check)
+        self.assertEqual(CCNxNameFactory.from_tlv_list(segments), CCNxNameFactory.from_tlv_list(self.apple))
+
+    def test_resolve_bad_check(self):
+        self.table.insert(self.apple)
+        slot, check = CCNxPendingInterestTable.fingerprint(self.apple)
+        self.assertTrue(self.table.resolve(slot, check ^ 0xFF) is None, "bad check should not resolve")
+
+    def test_timeout(self):
+        self.table.insert(self.apple)
+        self.time += 1.5
+        # Too old for the compressor to reference ...
+        self.assertTrue(self.table.match(self.apple) is None, "expired entry should not match")
+
+        # ... but the decompressor keeps it for the grace period
+        self.table.insert(self.berry)
+        self.time += 1.5
+        slot, check = CCNxPendingInterestTable.fingerprint(self.berry)
+        self.assertTrue(self.table.resolve(slot, check) is not None, "entry should still resolve")
+
+        self.table.insert(self.berry)
+        self.time += 2.5
+        self.assertTrue(self.table.resolve(slot, check) is None, "entry should have expired")
+
+    def test_max_entries(self):
+        table = CCNxPendingInterestTable(timeout=1.0, max_entries=2, clock=self.clock)
+        for i in range(0, 3):
+            name = CCNxNameFactory.from_uri("lci:/apple/" + str(i)).segments()
+            table.insert(name)
+        first = CCNxNameFactory.from_uri("lci:/apple/0").segments()
+        self.assertTrue(table.match(first) is None, "oldest entry should have been evicted")
+
+
+if __name__ == "__main__":
+    unittest.main()
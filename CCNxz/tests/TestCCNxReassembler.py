@@ -0,0 +1,169 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import array
+import os
+import shutil
+import tempfile
+import unittest
+
+from CCNx.CCNxName import *
+from CCNxz.CCNxReassembler import *
+
+
+class FakeManifest(object):
+    """Stands in for a CCNxManifestParser, only the data section and the number of manifest links matter"""
+    def __init__(self, data_chunks, manifest_chunks=()):
+        self.manifest_hash_list = [[c] for c in manifest_chunks]
+        self.data_start_chunk = data_chunks[0] if data_chunks else None
+        self.data_hash_list = [[c] for c in data_chunks]
+
+
+class FakeData(object):
+    def __init__(self, name, chunk_number, payload):
+        self.name = CCNxNameFactory.from_name(name, chunk_number)
+        self.payload = array.array("B", payload)
+
+
+class TestCCNxReassembler(unittest.TestCase):
+    def setUp(self):
+        self.name = CCNxNameFactory.from_uri("lci:/apple")
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "apple")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def data(self, chunk_number, payload):
+        return FakeData(self.name, chunk_number, payload)
+
+    def contents(self):
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    def test_out_of_order(self):
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_manifest(FakeManifest([1, 2], [5]))
+        reassembler.add_manifest(FakeManifest([3, 4]))
+
+        # the last chunk does not give the payload size, so waits
+        reassembler.add_data(self.data(4, "g"))
+        self.assertEqual(reassembler.buffered, 1)
+        reassembler.add_data(self.data(3, "ef"))
+        self.assertEqual(reassembler.buffered, 0)
+        self.assertEqual(reassembler.contiguous, 0)
+        reassembler.save()
+        self.assertEqual(os.path.getsize(self.path), 7)
+
+        reassembler.add_data(self.data(1, "ab"))
+        self.assertEqual(reassembler.contiguous, 1)
+        reassembler.add_data(self.data(2, "cd"))
+        self.assertTrue(reassembler.complete)
+        reassembler.close()
+
+        self.assertEqual(self.contents(), "abcdefg")
+        self.assertFalse(os.path.exists(self.path + ".resume"))
+
+    def test_data_before_manifest(self):
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_data(self.data(2, "cd"))
+        reassembler.add_data(self.data(1, "ab"))
+        self.assertEqual(reassembler.buffered, 2)
+        reassembler.add_manifest(FakeManifest([1, 2]))
+        self.assertTrue(reassembler.complete)
+        reassembler.close()
+        self.assertEqual(self.contents(), "abcd")
+
+    def test_single_chunk(self):
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_manifest(FakeManifest([1]))
+        reassembler.add_data(self.data(1, "abc"))
+        self.assertTrue(reassembler.complete)
+        reassembler.close()
+        self.assertEqual(self.contents(), "abc")
+
+    def test_buffer_bound(self):
+        reassembler = CCNxReassembler(self.path, max_buffered=2)
+        reassembler.add_data(self.data(1, "ab"))
+        reassembler.add_data(self.data(2, "cd"))
+        self.assertRaises(ValueError, reassembler.add_data, self.data(3, "ef"))
+        reassembler.close()
+
+    def test_resume(self):
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_manifest(FakeManifest([1, 2, 3, 4]))
+        reassembler.add_data(self.data(1, "ab"))
+        reassembler.add_data(self.data(3, "ef"))
+        reassembler.close()
+        self.assertTrue(os.path.exists(self.path + ".resume"))
+
+        reassembler = CCNxReassembler(self.path)
+        self.assertEqual(reassembler.written, 2)
+        self.assertEqual(reassembler.contiguous, 1)
+        self.assertTrue(reassembler.have(1))
+        self.assertFalse(reassembler.have(2))
+        self.assertTrue(reassembler.have(3))
+
+        reassembler.add_manifest(FakeManifest([1, 2, 3, 4]))
+        reassembler.add_data(self.data(4, "g"))
+        reassembler.add_data(self.data(2, "cd"))
+        self.assertTrue(reassembler.complete)
+        reassembler.close()
+        self.assertEqual(self.contents(), "abcdefg")
+
+        # without resume the file starts over
+        reassembler = CCNxReassembler(self.path, resume=False)
+        self.assertEqual(reassembler.written, 0)
+        reassembler.close()
+
+    def test_resume_unfetched_manifest(self):
+        """All the root's data was written before, the child manifest has not arrived"""
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_manifest(FakeManifest([2, 3], [9]))
+        reassembler.add_data(self.data(2, "ab"))
+        reassembler.add_data(self.data(3, "cd"))
+        reassembler.close()
+
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_manifest(FakeManifest([2, 3], [9]))
+        self.assertFalse(reassembler.complete)
+        reassembler.close()
+        self.assertTrue(os.path.exists(self.path + ".resume"))
+
+        reassembler = CCNxReassembler(self.path)
+        reassembler.add_manifest(FakeManifest([2, 3], [9]))
+        reassembler.add_manifest(FakeManifest([4, 5]))
+        self.assertFalse(reassembler.complete)
+        reassembler.add_data(self.data(5, "g"))
+        reassembler.add_data(self.data(4, "ef"))
+        self.assertTrue(reassembler.complete)
+        reassembler.close()
+        self.assertEqual(self.contents(), "abcdefg")
+        self.assertFalse(os.path.exists(self.path + ".resume"))
+
+
+if __name__ == '__main__':
+    unittest.main()
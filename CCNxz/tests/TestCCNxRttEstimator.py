@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNxz.CCNxRttEstimator import *
+
+
+class TestCCNxRttEstimator(unittest.TestCase):
+    def test_first_sample(self):
+        rtt = CCNxRttEstimator()
+        self.assertEqual(rtt.rto, 0.100)
+        self.assertIsNone(rtt.srtt)
+
+        rtt.sample(0.040)
+        self.assertAlmostEqual(rtt.srtt, 0.040)
+        self.assertAlmostEqual(rtt.rttvar, 0.020)
+        self.assertAlmostEqual(rtt.rto, 0.040 + 4 * 0.020)
+
+    def test_converges(self):
+        rtt = CCNxRttEstimator()
+        for i in range(100):
+            rtt.sample(0.050)
+        self.assertAlmostEqual(rtt.srtt, 0.050)
+        # rttvar decays to nothing, the timeout is held above srtt by the clock granularity
+        self.assertAlmostEqual(rtt.rto, 0.051, places=4)
+
+    def test_update(self):
+        rtt = CCNxRttEstimator()
+        rtt.sample(0.100)
+        rtt.sample(0.200)
+        # rttvar = 0.75 * 0.05 + 0.25 * 0.1, srtt = 0.875 * 0.1 + 0.125 * 0.2
+        self.assertAlmostEqual(rtt.rttvar, 0.0625)
+        self.assertAlmostEqual(rtt.srtt, 0.1125)
+        self.assertAlmostEqual(rtt.rto, 0.3625)
+        self.assertAlmostEqual(rtt.min_rtt, 0.100)
+
+    def test_clamp(self):
+        rtt = CCNxRttEstimator(min_rto=0.020, max_rto=1.0)
+        rtt.sample(0.001)
+        self.assertEqual(rtt.rto, 0.020)
+        rtt.sample(10.0)
+        self.assertEqual(rtt.rto, 1.0)
+
+        self.assertRaises(ValueError, rtt.sample, -1)
+        self.assertRaises(ValueError, CCNxRttEstimator, 0.1, 0.2)
+
+    def test_backoff(self):
+        rtt = CCNxRttEstimator(initial_rto=0.100, max_rto=1.0)
+        self.assertAlmostEqual(rtt.backoff_rto(0), 0.100)
+        self.assertAlmostEqual(rtt.backoff_rto(2), 0.400)
+        self.assertEqual(rtt.backoff_rto(10), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+
+from CCNxz.CCNxTokenTable import *
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxDictionaryTrainer import *
+from CCNxz.Packets import *
+
+
+def _chain(byte_array, dictionary):
+    """The fixed length then variable length decode the table replaces"""
+    result = CCNxCompressorFixedLength.decompress(byte_array, dictionary.keys)
+    if result is None:
+        result = CCNxCompressorVariableLength.decompress(byte_array, dictionary.decompression_dict)
+    return result
+
+
+class TestCCNxTokenTable(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(37)
+        trainer = CCNxDictionaryTrainer()
+        trainer.add_packet(list(Packets.interest))
+        trainer.add_packet(list(Packets.content_object))
+        self.dictionaries = [CCNxDictionary.builtin(), trainer.train(3)]
+
+    def test_matches_chain(self):
+        for dictionary in self.dictionaries:
+            table = dictionary.token_table
+            for byte0 in range(256):
+                tail = [self.rand.randint(0, 255) for i in range(6)]
+                expected_array = [byte0] + tail
+                test_array = [byte0] + tail
+                expected = _chain(expected_array, dictionary)
+                test = table.decode(test_array)
+                self.assertEqual(test, expected, "byte0 {}".format(hex(byte0)))
+                self.assertEqual(test_array, expected_array, "byte0 {} consumed".format(hex(byte0)))
+
+    def test_formats(self):
+        self.assertEqual(CCNxTokenTable.format(0x10), FORMAT_3_4)
+        self.assertEqual(CCNxTokenTable.format(0x85), FORMAT_FIXED)
+        self.assertEqual(CCNxTokenTable.format(0xC3), FORMAT_4_9)
+        self.assertEqual(CCNxTokenTable.format(0xE9), FORMAT_15_5)
+        self.assertEqual(CCNxTokenTable.format(0xF3), FORMAT_LEARNED)
+        self.assertEqual(CCNxTokenTable.format(0xFA), FORMAT_16_10)
+        self.assertEqual(CCNxTokenTable.format(0xFE), FORMAT_LEARNED)
+        self.assertEqual(CCNxTokenTable.format(0xFF), FORMAT_16_16)
+
+    def test_learned_needs_context(self):
+        table = self.dictionaries[0].token_table
+        self.assertTrue(table.decode([0xF0, 0x01]) is None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNxz.CCNxTransit import *
+from CCNxz.CCNxContextTable import *
+from CCNxz.CCNxDictionaryTrainer import *
+from CCNxz.Packets import *
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _compress(contexts, packet):
+    parser = CCNxParser(list(packet))
+    parser.parse()
+    context = contexts.compression_context()
+    compressor = CCNxCompressor(parser, context)
+    compressor.encode()
+    return contexts.frame(context, compressor.encoded)
+
+
+def _decompress(contexts, datagram):
+    datagram = list(datagram)
+    context = contexts.decompression_context(datagram)
+    context.unframe(datagram)
+    parser = CCNxParser(datagram, context)
+    parser.parse()
+    decompressor = CCNxNullCompressor(parser)
+    decompressor.encode()
+    return decompressor.encoded
+
+
+class TestCCNxTransit(unittest.TestCase):
+    """
+    client A -- link 1 -- transit relay -- link 2 -- client B
+    """
+    def setUp(self):
+        self.clock = FakeClock()
+        self.end_1 = CCNxContextTable(clock=self.clock)
+        self.link_1 = CCNxContextTable(clock=self.clock)
+        self.link_2 = CCNxContextTable(clock=self.clock)
+        self.end_2 = CCNxContextTable(clock=self.clock)
+        self.forward = CCNxTransit(self.link_1, self.link_2)
+        self.reverse = CCNxTransit(self.link_2, self.link_1)
+
+    def __across(self, sender, transit, receiver, packet):
+        """Control messages (REFRESH) end at the next hop, packets go all the way"""
+        rx_contexts = self.link_1 if transit is self.forward else self.link_2
+        output = []
+        for datagram in _compress(sender, packet):
+            if CCNxLinkFrame.is_control(datagram[0]):
+                rx_contexts.receive_control(datagram)
+                continue
+            for forwarded in transit.forward(datagram):
+                if CCNxLinkFrame.is_control(forwarded[0]):
+                    receiver.receive_control(forwarded)
+                else:
+                    output.append(_decompress(receiver, forwarded))
+        return output
+
+    def test_forward_as_is(self):
+        # the first packet of a context teaches numeric bases, later ones need only a new context ID
+        for i in range(3):
+            self.assertEqual(self.__across(self.end_1, self.forward, self.end_2, Packets.interest),
+                             [list(Packets.interest)])
+        self.assertEqual(self.forward.counters['transit_forwarded'], 3)
+        self.assertEqual(self.link_2.compression_context().tx_bases, self.end_1.compression_context().tx_bases)
+
+    def test_name_reference_rewrite(self):
+        self.assertEqual(self.__across(self.end_2, self.reverse, self.end_1, Packets.interest),
+                         [list(Packets.interest)])
+        self.assertEqual(self.__across(self.end_1, self.forward, self.end_2, Packets.content_object),
+                         [list(Packets.content_object)])
+        self.assertEqual(self.forward.counters['transit_rewritten'], 1)
+
+    def test_no_pending_interest(self):
+        """Link 2 has lost the Interest, so it cannot reference the name"""
+        self.__across(self.end_2, self.reverse, self.end_1, Packets.interest)
+        self.assertTrue(self.link_2.pending_interests.match(self.__name(Packets.interest)) is not None)
+
+        self.assertEqual(self.__across(self.end_1, self.forward, self.end_2, Packets.content_object),
+                         [list(Packets.content_object)])
+        self.assertEqual(self.forward.counters['transit_transcoded'], 1)
+
+    @staticmethod
+    def __name(packet):
+        parser = CCNxParser(list(packet))
+        parser.parse()
+        return parser.name_tlv.value
+
+    def test_different_dictionaries(self):
+        trainer = CCNxDictionaryTrainer()
+        trainer.add_packet(list(Packets.interest))
+        trainer.add_packet(list(Packets.content_object))
+        dictionary = trainer.train(5)
+        self.link_2.add_dictionary(dictionary)
+        self.end_2.add_dictionary(dictionary)
+        context_id = self.link_2.rollover(dictionary)
+        announce = CCNxLinkFrame.encode_binding(CCNxLinkFrame.ANNOUNCE, context_id, dictionary.dictionary_id,
+                                                dictionary.digest)
+        self.link_2.receive_control(self.end_2.receive_control(announce))
+        self.assertEqual(self.link_2.active_context_id, context_id)
+
+        for i in range(2):
+            self.assertEqual(self.__across(self.end_1, self.forward, self.end_2, Packets.interest),
+                             [list(Packets.interest)])
+        self.assertEqual(self.forward.counters['transit_transcoded'], 2)
+        self.assertEqual(self.forward.counters['transit_forwarded'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
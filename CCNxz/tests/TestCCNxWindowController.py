@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+
+from CCNxz.CCNxWindowController import *
+
+
+class TestCCNxWindowController(unittest.TestCase):
+    def test_fixed_window(self):
+        wc = CCNxWindowController(initial_window=8)
+        for i in range(20):
+            wc.acked(0.1)
+        self.assertEqual(wc.window, 8)
+        self.assertTrue(wc.lost(1.0, 2.0))
+        self.assertEqual(wc.window, 8)
+
+
+class TestCCNxAimdWindowController(unittest.TestCase):
+    def test_slow_start(self):
+        wc = CCNxAimdWindowController(initial_window=4, max_window=64)
+        for i in range(4):
+            wc.acked(0.1)
+        self.assertEqual(wc.window, 8)
+
+        for i in range(100):
+            wc.acked(0.1)
+        self.assertEqual(wc.window, 64)
+
+    def test_congestion_avoidance(self):
+        wc = CCNxAimdWindowController(initial_window=20, max_window=128)
+        self.assertTrue(wc.lost(send_time=1.0, now=2.0))
+        self.assertEqual(wc.window, 10)
+        self.assertEqual(wc.ssthresh, 10)
+
+        # one more Interest per window of acks
+        for i in range(10):
+            wc.acked(0.1)
+        self.assertEqual(wc.window, 10)
+        wc.acked(0.1)
+        self.assertEqual(wc.window, 11)
+
+    def test_decrease_once_per_window(self):
+        wc = CCNxAimdWindowController(initial_window=32)
+        self.assertTrue(wc.lost(send_time=1.0, now=2.0))
+        # sent before the decrease at 2.0
+        self.assertFalse(wc.lost(send_time=1.5, now=2.1))
+        self.assertEqual(wc.window, 16)
+        self.assertTrue(wc.lost(send_time=2.0, now=3.0))
+        self.assertEqual(wc.window, 8)
+
+    def test_min_window(self):
+        wc = CCNxAimdWindowController(initial_window=2, min_window=1)
+        for i in range(5):
+            wc.lost(send_time=i, now=i)
+        self.assertEqual(wc.window, 1)
+        self.assertRaises(ValueError, CCNxAimdWindowController, 0)
+
+
+class TestCCNxDelayWindowController(unittest.TestCase):
+    def test_grows_without_queueing(self):
+        wc = CCNxDelayWindowController(initial_window=4, max_window=128)
+        for i in range(200):
+            wc.acked(0.050)
+        self.assertEqual(wc.window, 128)
+
+    def test_leaves_slow_start_on_queue(self):
+        wc = CCNxDelayWindowController(initial_window=4, max_window=128)
+        wc.acked(0.050)
+        for i in range(20):
+            wc.acked(0.050)
+        window = wc.window
+        # the RTT doubles, half of the window is queued
+        wc.acked(0.100)
+        self.assertEqual(wc.ssthresh, wc.cwnd)
+        for i in range(100):
+            wc.acked(0.100)
+        self.assertTrue(wc.window < window)
+
+    def test_converges_on_bottleneck(self):
+        """A 50 ms path through a 100 Interest/s bottleneck holds 5 Interests, keep 1 to 3 queued"""
+        wc = CCNxDelayWindowController(initial_window=4, max_window=128)
+        for i in range(2000):
+            wc.acked(max(0.050, wc.cwnd / 100.0))
+        self.assertTrue(6 <= wc.window <= 8, "window {}".format(wc.window))
+
+    def test_karn_sample_ignored(self):
+        wc = CCNxDelayWindowController(initial_window=4)
+        wc.acked(None)
+        self.assertEqual(wc.window, 4)
+
+    def test_loss(self):
+        wc = CCNxDelayWindowController(initial_window=20)
+        wc.lost(send_time=0, now=1)
+        self.assertEqual(wc.window, 14)
+
+
+if __name__ == '__main__':
+    unittest.main()
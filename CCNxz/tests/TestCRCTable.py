@@ -0,0 +1,88 @@
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+
+from CCNxz.crc import *
+from CCNxz.crc3 import *
+from CCNxz.crc7 import *
+from CCNxz.crc8 import *
+from CCNxz.crc32c import *
+
+
+def _bitwise(cls, byte_list):
+    crc = cls()
+    for byte in byte_list:
+        for shift in range(7, -1, -1):
+            crc.update_bit((byte >> shift) & 1)
+    return crc.finalize()
+
+
+class TestCRCTable(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(4995)
+        self.inputs = [[self.rand.randint(0, 255) for i in range(self.rand.randint(0, 16))] for j in range(200)]
+
+    def test_table_matches_shift_register(self):
+        for cls in [CRC3, CRC7, CRC8]:
+            for byte_list in self.inputs:
+                self.assertEqual(cls.compute(byte_list), _bitwise(cls, byte_list))
+
+    def test_update_bytes_types(self):
+        byte_list = [0xC0, 0x03, 0xBE, 0xEF, 0x01, 0x02]
+        truth = CRC8.compute(byte_list)
+        self.assertEqual(CRC8.compute(bytearray(byte_list)), truth)
+        self.assertEqual(CRC8.compute(str(bytearray(byte_list))), truth)
+
+        # in pieces
+        crc = CRC8()
+        crc.update_bytes(byte_list[0:2])
+        crc.update_byte(byte_list[2])
+        crc.update_bytes(byte_list[3:])
+        self.assertEqual(crc.finalize(), truth)
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_batch(self):
+        rows = [[self.rand.randint(0, 255) for i in range(4)] for j in range(500)]
+        for cls in [CRC3, CRC7, CRC8]:
+            result = cls.batch(rows)
+            self.assertEqual(list(result), [cls.compute(row) for row in rows])
+
+    def test_crc32c(self):
+        # RFC 3720 B.4 check value and all-zero vector
+        self.assertEqual(CRC32C.compute("123456789"), 0xE3069283)
+        self.assertEqual(CRC32C.compute([0] * 32), 0x8A9136AA)
+
+        crc = CRC32C()
+        crc.update_bytes([0x31, 0x32, 0x33])
+        crc.update_byte(0x34)
+        crc.update_bytes("56789")
+        self.assertEqual(crc.finalize(), 0xE3069283)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,8 @@ __author__ = 'mmosko'
 import unittest
 
 from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxCompressionContext import *
+from CCNxz.CCNxNullCompressor import *
 from CCNxz.Packets import *
 
 
@@ -53,6 +55,89 @@ class TestCCNxCompressor(unittest.TestCase):
         encoded = compressor.encoded
         self.assertTrue(Packets.compressed_object == encoded)
 
+    @staticmethod
+    def _compress(packet, context):
+        parser = CCNxParser(list(packet))
+        parser.parse()
+        compressor = CCNxCompressor(parser, context)
+        compressor.encode()
+        return compressor.encoded
+
+    @staticmethod
+    def _decompress(packet, context):
+        parser = CCNxParser(list(packet), context)
+        parser.parse()
+        decompressor = CCNxNullCompressor(parser)
+        decompressor.encode()
+        return decompressor.encoded
+
+    def test_name_elision(self):
+        """
+        Relay A compresses the Interest and relay B decompresses it.  The Content Object
+        (which has the same name) then goes the other way with its name elided.
+        """
+        context_a = CCNxCompressionContext()
+        context_b = CCNxCompressionContext()
+
+        compressed_interest = self._compress(Packets.interest, context_a)
+        self.assertTrue(Packets.compressed_interest == compressed_interest)
+        self._decompress(compressed_interest, context_b)
+
+        compressed_object = self._compress(Packets.content_object, context_b)
+        self.assertTrue(len(compressed_object) < len(Packets.compressed_object),
+                        "Expected elided name, got length {}".format(len(compressed_object)))
+
+        test = self._decompress(compressed_object, context_a)
+        self.assertTrue(Packets.content_object == test)
+
+    def test_name_elision_miss(self):
+        """Without a pending Interest the Content Object keeps its name"""
+        encoded = self._compress(Packets.content_object, CCNxCompressionContext())
+        test = self._decompress(encoded, CCNxCompressionContext())
+        self.assertTrue(Packets.content_object == test)
+
+        original = CCNxParser(list(Packets.content_object))
+        original.parse()
+        decoded = CCNxParser(list(test))
+        decoded.parse()
+        self.assertEqual([(tlv.type, tlv.value) for tlv in decoded.name_tlv.value],
+                         [(tlv.type, tlv.value) for tlv in original.name_tlv.value])
+
+        # The hit path puts a 4 byte reference where the miss path has the literal name,
+        # which is coded as in the static (no context) encoding
+        context_b = CCNxCompressionContext()
+        context_b.interest_seen(original.name_tlv.value)
+        elided = self._compress(Packets.content_object, context_b)
+        start = elided.index(0xFE)
+        end = start + len(encoded) - len(elided) + 4
+        self.assertEqual(encoded[:start], elided[:start])
+        self.assertEqual(encoded[end:], elided[start + 4:])
+        self.assertEqual(encoded[start:end], Packets.compressed_object[start:end])
+        self.assertNotEqual(encoded[start], 0xFE)
+
+    def test_numeric_values(self):
+        """The second Content Object codes T_EXPIRY as a delta against the first"""
+        context_a = CCNxCompressionContext()
+        context_b = CCNxCompressionContext()
+
+        first = self._compress(Packets.content_object, context_b)
+        second = self._compress(Packets.content_object, context_b)
+        static_length = len(Packets.compressed_object)
+        self.assertTrue(len(first) < static_length, "absolute expiry should save a byte")
+        self.assertTrue(len(second) <= static_length - 5,
+                        "Expected at least 5 bytes saved, got {} vs {}".format(len(second), static_length))
+
+        self.assertTrue(Packets.content_object == self._decompress(first, context_a))
+        self.assertTrue(Packets.content_object == self._decompress(second, context_a))
+
+    def test_name_reference_unknown(self):
+        """A reference the decompressor cannot resolve is an error, not a wrong name"""
+        context_b = CCNxCompressionContext()
+        self._decompress(self._compress(Packets.interest, CCNxCompressionContext()), context_b)
+        compressed_object = self._compress(Packets.content_object, context_b)
+
+        self.assertRaises(ValueError, self._decompress, compressed_object, CCNxCompressionContext())
+
 
 if __name__ == "__main__":
     unittest.main()
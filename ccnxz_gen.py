@@ -58,8 +58,9 @@ chunk_size = 1500
 
 def _run_client(args):
     print "Running client"
-    client = CCNxzGenClient(args)
-    client.loop()
+    client = CCNxzGenClient(vars(args))
+    if not client.loop():
+        exit(1)
 
 
 def _add_manifest_tree(objects_by_name, objects_by_hash, manifest):
@@ -141,6 +142,12 @@ def _parse_args():
     client_parser.add_argument('--name', required=True, dest='name', help='The content name')
     client_parser.add_argument('--peer', required=True, dest='peer', help='The client nexthop (host:port)')
     client_parser.add_argument('--pubkey', required=True, dest='pubkey', help='The servers public key (DER or PEM)')
+    client_parser.add_argument('--window', dest='window', choices=['aimd', 'delay'], default='aimd',
+                               help='Window control: loss based AIMD or delay based (default aimd)')
+    client_parser.add_argument('--output', dest='output',
+                               help='The file to write, resumed if interrupted (default: last name segment)')
+    client_parser.add_argument('--hash-threads', dest='hash_threads', type=int, default=0,
+                               help='Verify content hashes in batches on this many threads (default 0)')
 
     args = parser.parse_args()
     return args
@@ -37,7 +37,50 @@ Runs as four threads:
     server: runs SocketServer loop
     worker1: from remote1 to remote2
     worker2: from remote2 to remote1
+
+The two workers share one CCNxContextTable, so an Interest that goes through
+one worker is remembered when its Content Object comes back through the other.
+Compressed packets are sent in sequenced frames.  If the decompressing side sees a
+gap or cannot decode a packet, it sends a NACK back and the compressing relay
+answers with a REFRESH of its context (see CCNxLinkFrame).  The recovery counters
+are printed every few seconds.
+
+With --dictionary, the relay announces the dictionary to its peer and compresses
+with it once the peer has it too.  The file is checked for changes and a new version
+is rolled over to without a restart.  With --state, learned context state is saved
+on exit (and with each report) and loaded at start.
+
+With --payload mppc, payloads are also compressed with an MPPC history per context
+(RFC 2118) that carries over from packet to packet.  On loss the peer's NACK flushes
+the history.  With --payload lz77, each payload is compressed on its own with the
+payload dictionary of the --dictionary file (see ccnxz_train --payload-size), which
+suits lossy links.  Payloads that look random are sent as-is.  The peer does not need
+--payload to decompress them.
+
+With --check crc8 or --check crc32c, every datagram on the compressed link carries a
+CRC trailer over the whole frame.  Frames that fail it are dropped (and counted as
+frames_corrupt) before any decompression, so line errors never reach learned state.
+Both relays must use the same --check.
+
+With --fec K M, the relay sends M repair packets after every K datagrams to its peer
+(see CCNxz/CCNxFec.py), so the peer relay repairs up to M losses in a group without an
+end-to-end retransmission.  --fec-adaptive starts at M and moves between 1 and M
+with the loss the peer reports.  The peer always accepts FEC.
+
+With --bundle BYTES, compressed packets to the peer are packed together, each with a
+length prefix, into datagrams of up to BYTES (e.g. 1400).  A bundle is sent when the
+next packet would not fit, or --bundle-delay (default 0.5 ms) after its first packet.
+The peer always accepts bundles.
+
+With --transit, both peers are compressed links (e.g. the middle relay of a multi-hop
+path) and each has its own contexts.  When the contexts on both sides use the same
+dictionary, a packet is sent on with a new context ID, and name references and
+numeric bases rewritten to the outgoing link, instead of being decompressed and
+compressed again (see CCNxz/CCNxTransit.py).  --state saves each link in STATE.1 and
+STATE.2.
 """
+import time
+import os
 import SocketServer
 import threading
 import Queue
@@ -47,8 +90,14 @@ from socket import error as socket_error
 
 from CCNxz.QueueEntry import *
 from CCNxz.CCNxCompressor import *
+from CCNxz.CCNxContextTable import *
 from CCNx.CCNxParser import *
 from CCNxz.CCNxNullDecompressor import *
+from CCNxz.CCNxNullCompressor import *
+from CCNxz.CCNxLinkFrame import *
+from CCNxz.CCNxDictionary import *
+from CCNxz.CCNxCompressorPayload import *
+from CCNxz.CCNxTransit import *
 
 __author__ = 'mmosko'
 
@@ -159,12 +208,26 @@ class MyServer(threading.Thread):
 
 class CompressionWorker(threading.Thread):
     """Read the work queue and (de)compress things in there, then send them to our client"""
-    def __init__(self, client_address, work_queue, server_socket):
+    def __init__(self, client_address, work_queue, server_socket, contexts=None, return_address=None, transit=None):
+        """
+        :param client_address: The Address to send (de)compressed packets to
+        :param work_queue: Queue of QueueEntry to process
+        :param server_socket: The socket to send on
+        :param contexts: Optional CCNxContextTable of the link our work comes from
+        :param return_address: The Address our work comes from, where control messages go
+        :param transit: Optional CCNxTransit to forward compressed packets to a compressed client link
+        """
         super(CompressionWorker, self).__init__()
         self.__client_address = client_address
         self.__work_queue = work_queue
         self.__kill = False
         self.__socket = server_socket
+        self.__contexts = contexts
+        self.__return_address = return_address
+        self.__transit = transit
+        self.__out_contexts = contexts if transit is None else transit.tx_contexts
+        self.__link_out = False
+        self.__link_in = False
 
     @property
     def work_queue(self):
@@ -173,7 +236,10 @@ class CompressionWorker(threading.Thread):
     def run(self):
         while not self.__kill:
             try:
-                entry = self.__work_queue.get(block=True, timeout=1)
+                timeout = 0.1
+                if self.__link_out:
+                    timeout = self.__out_contexts.bundle_wait(timeout)
+                entry = self.__work_queue.get(block=True, timeout=timeout)
                 data = array.array("B")
                 data.fromstring(entry.data)
 
@@ -181,26 +247,124 @@ class CompressionWorker(threading.Thread):
 
                 if is_uncompressed:
                     print "Receive uncompressed, len = ", len(data)
+                    self.__compress(data)
+
+                elif self.__contexts is not None and not self.__contexts.verify_frame(data):
+                    print "Drop corrupt frame, len =   ", len(data)
+
+                elif self.__contexts is not None:
+                    self.__link_in = True
+                    for datagram in self.__contexts.receive_link(data):
+                        self.__receive_link(datagram)
 
-                    parser = CCNxParser(data)
-                    parser.parse()
-                    compressor = CCNxCompressor(parser)
-                    compressor.encode()
-                    output = compressor.encoded
-                    byte_array = array.array("B")
-                    byte_array.fromlist(output)
-                    self.__socket.sendto(byte_array, self.__client_address.tuple)
                 else:
                     print "Receive compressed, len =   ", len(data)
+                    self.__decompress(data)
 
-                    parser = CCNxParser(data)
-                    parser.parse()
+                if self.__link_out:
+                    self.__send_all(self.__out_contexts.bundle_flush(), self.__client_address)
 
             except Queue.Empty:
-                pass
+                self.__idle()
+            except ValueError as err:
+                print "ERROR: Worker {} dropping packet: {}".format(self.__client_address, err)
 
         print "Worker {} exiting run".format(self.__client_address)
 
+    def __receive_link(self, datagram):
+        """A datagram from the compressed link, after the frame check and FEC"""
+        try:
+            if CCNxLinkFrame.is_control(datagram[0]):
+                print "Receive control, len =      ", len(datagram)
+                reply = self.__contexts.receive_control(datagram)
+                if reply is not None:
+                    self.__send_back([reply])
+                self.__send_back(self.__contexts.pending_replies())
+            elif self.__transit is not None:
+                print "Receive transit, len =      ", len(datagram)
+                self.__forward(datagram)
+            else:
+                print "Receive compressed, len =   ", len(datagram)
+                self.__decompress(datagram)
+        except ValueError as err:
+            print "ERROR: Worker {} dropping packet: {}".format(self.__client_address, err)
+
+    def __idle(self):
+        """Send our bundle, close our FEC group, and give up on FEC losses that were not repaired"""
+        if self.__contexts is None:
+            return
+        if self.__link_out:
+            self.__send_all(self.__out_contexts.bundle_flush(force=True), self.__client_address)
+            self.__send_all(self.__out_contexts.fec_flush(), self.__client_address)
+        if self.__link_in:
+            for datagram in self.__contexts.fec_expire():
+                self.__receive_link(datagram)
+
+    def __compress(self, data):
+        parser = CCNxParser(data)
+        parser.parse()
+        if self.__out_contexts is None:
+            compressor = CCNxCompressor(parser)
+            compressor.encode()
+            self.__send(compressor.encoded, self.__client_address)
+        else:
+            self.__link_out = True
+
+            def encode(context):
+                compressor = CCNxCompressor(parser, context)
+                compressor.encode()
+                return compressor.encoded
+
+            self.__send_all(self.__out_contexts.compress(encode), self.__client_address)
+
+    def __forward(self, data):
+        self.__link_out = True
+        try:
+            self.__send_all(self.__transit.forward(data), self.__client_address)
+        finally:
+            self.__send_back(self.__contexts.pending_replies())
+
+    def __decompress(self, data):
+        if self.__contexts is None:
+            parser = CCNxParser(data)
+            parser.parse()
+            decompressor = CCNxNullCompressor(parser)
+            decompressor.encode()
+            self.__send(decompressor.encoded, self.__client_address)
+            return
+
+        try:
+            context = self.__contexts.decompression_context(data)
+            if CCNxLinkFrame.is_sequenced(data[0]):
+                context.unframe(data)
+
+            try:
+                parser = CCNxParser(data, context)
+                parser.parse()
+                decompressor = CCNxNullCompressor(parser)
+                decompressor.encode()
+                self.__send(decompressor.encoded, self.__client_address)
+            except ValueError:
+                context.decode_failed()
+                raise
+        finally:
+            self.__send_back(self.__contexts.pending_replies())
+
+    def __send_back(self, messages):
+        if self.__return_address is None:
+            return
+        for message in messages:
+            self.__send(message, self.__return_address)
+
+    def __send_all(self, datagrams, address):
+        for datagram in datagrams:
+            self.__send(datagram, address)
+
+    def __send(self, output, address):
+        byte_array = array.array("B")
+        byte_array.fromlist(output)
+        self.__socket.sendto(byte_array, address.tuple)
+
     def stop(self):
         self.__kill = True
 
@@ -242,6 +406,23 @@ def _parse_args():
 
     parser.add_argument('-p', required=True, dest='port', type=int, action='store', help='ccnxz_relay listen port')
     parser.add_argument('--peers', required=True, dest='peer', nargs=2, help='The two peers (host:port)')
+    parser.add_argument('--dictionary', dest='dictionary', default=None,
+                        help='Dictionary file from ccnxz_train (default built-in), reloaded when it changes')
+    parser.add_argument('--state', dest='state', default=None, help='File to save learned context state in')
+    parser.add_argument('--payload', dest='payload', choices=payload_codecs, default=None,
+                        help='Compress payloads with MPPC history or LZ77 with the payload dictionary')
+    parser.add_argument('--check', dest='check', choices=CCNxLinkFrame.frame_checks, default=None,
+                        help='Whole-frame CRC trailer on the compressed link (both relays must agree)')
+    parser.add_argument('--fec', dest='fec', nargs=2, type=int, default=None, metavar=('K', 'M'),
+                        help='Send M FEC repair packets per K datagrams on the compressed link')
+    parser.add_argument('--fec-adaptive', dest='fec_adaptive', action='store_true',
+                        help='Adapt the FEC repair packets (1 to M) to the loss the peer reports')
+    parser.add_argument('--bundle', dest='bundle', type=int, default=0, metavar='BYTES',
+                        help='Bundle compressed packets into datagrams of up to BYTES on the compressed link')
+    parser.add_argument('--bundle-delay', dest='bundle_delay', type=float, default=0.0005, metavar='SECONDS',
+                        help='How long a packet may wait for others to bundle with (default 0.0005)')
+    parser.add_argument('--transit', dest='transit', action='store_true',
+                        help='Both peers are compressed links, forward without decompressing where possible')
 
     args = parser.parse_args()
     return args
@@ -252,6 +433,82 @@ def _join(thread):
         thread.join(timeout=0.25)
 
 
+def _report(contexts, extra=None):
+    counters = contexts.counters
+    if extra is not None:
+        counters.update(extra.counters)
+    print "Context {}: {}".format(contexts.active_context_id,
+                                  ", ".join("{} {}".format(k, counters[k]) for k in sorted(counters.keys())))
+
+
+class DictionaryWatcher(object):
+    """Rolls the context table over to a dictionary file whenever the file changes"""
+    def __init__(self, path, contexts):
+        self.__path = path
+        self.__contexts = contexts
+        self.__mtime = None
+
+    def check(self):
+        try:
+            mtime = os.path.getmtime(self.__path)
+            if mtime == self.__mtime:
+                return
+            self.__mtime = mtime
+            dictionary = CCNxDictionary.load(self.__path)
+            context_id = self.__contexts.rollover(dictionary)
+            print "Dictionary {} from {} on context {}".format(dictionary.dictionary_id, self.__path, context_id)
+        except (IOError, OSError, ValueError) as err:
+            print "ERROR: Could not load dictionary {}: {}".format(self.__path, err)
+
+
+def _save_state(contexts, path):
+    if path is not None:
+        try:
+            contexts.save_state(path)
+        except (IOError, OSError) as err:
+            print "ERROR: Could not save state {}: {}".format(path, err)
+
+
+def _report_links(links):
+    for contexts, watcher, state_path, transit in links:
+        _report(contexts, transit)
+        _save_state(contexts, state_path)
+
+
+def _join_and_report(thread, links, interval=10.0):
+    """
+    :param links: list of (contexts, watcher, state path, transit) of each compressed link
+    """
+    next_report = time.time() + interval
+    while thread.is_alive():
+        thread.join(timeout=0.25)
+        for contexts, watcher, state_path, transit in links:
+            if watcher is not None:
+                watcher.check()
+        if time.time() >= next_report:
+            _report_links(links)
+            next_report += interval
+
+
+def _create_link(args, state_path):
+    """
+    :return: (contexts, watcher) of one compressed link
+    """
+    fec_group, fec_repair = args.fec if args.fec is not None else (0, 1)
+    contexts = CCNxContextTable(payload_compression=args.payload, frame_check=args.check,
+                                fec_group=fec_group, fec_repair=fec_repair, fec_adaptive=args.fec_adaptive,
+                                bundle_size=args.bundle, bundle_delay=args.bundle_delay)
+    watcher = None
+    if args.dictionary is not None:
+        contexts.add_dictionary(CCNxDictionary.load(args.dictionary))
+        watcher = DictionaryWatcher(args.dictionary, contexts)
+    if state_path is not None and os.path.exists(state_path):
+        contexts.load_state(state_path)
+    if watcher is not None:
+        watcher.check()
+    return contexts, watcher
+
+
 def _run_main():
     args = _parse_args()
 
@@ -264,19 +521,34 @@ def _run_main():
 
     print "ccnxz_relay port {} peer {} peer {}".format(port, peer_1, peer_2)
 
+    if args.transit:
+        # one link table per peer, each worker forwards from its return link to its client link
+        state_1 = args.state + ".1" if args.state is not None else None
+        state_2 = args.state + ".2" if args.state is not None else None
+        contexts_1, watcher_1 = _create_link(args, state_1)
+        contexts_2, watcher_2 = _create_link(args, state_2)
+        transit_1 = CCNxTransit(contexts_2, contexts_1)
+        transit_2 = CCNxTransit(contexts_1, contexts_2)
+        links = [(contexts_1, watcher_1, state_1, transit_2), (contexts_2, watcher_2, state_2, transit_1)]
+    else:
+        contexts_2, watcher = _create_link(args, args.state)
+        contexts_1 = contexts_2
+        transit_1 = transit_2 = None
+        links = [(contexts_2, watcher, args.state, None)]
+
     try:
         server = MyServer(port, peer_1, peer_2, queue_1, queue_2, timeout=0.5)
         server.start()
 
-        worker_1 = CompressionWorker(peer_1, queue_1, server.socket)
-        worker_2 = CompressionWorker(peer_2, queue_2, server.socket)
+        worker_1 = CompressionWorker(peer_1, queue_1, server.socket, contexts_2, peer_2, transit_1)
+        worker_2 = CompressionWorker(peer_2, queue_2, server.socket, contexts_1, peer_1, transit_2)
 
         worker_1.start()
         worker_2.start()
 
         # block until it exits
         try:
-            _join(server)
+            _join_and_report(server, links)
 
         except (KeyboardInterrupt, SystemExit):
             print "Got keyboard interrupt or SystemExit"
@@ -288,6 +560,7 @@ def _run_main():
         _join(worker_1)
         _join(worker_2)
         _join(server)
+        _report_links(links)
 
     except socket_error as err:
         print "Socket error: {}".format(err.strerror)
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+
+"""
+Train a compression dictionary from a corpus of captured packets.
+
+Each input file holds one or more back-to-back uncompressed CCNx packets.  The
+trained dictionary is written as JSON and loaded by ccnxz_relay --dictionary.
+Both relays of a link must load the same dictionary.
+
+    ccnxz_train --id 1 -o ccnxz.dict corpus/*.bin
+
+With --huffman the dictionary also holds a canonical Huffman code for the TL pairs and
+the relays use the Huffman TL codec (CCNxCompressorHuffman) for it.  With --payload-size
+it also holds an LZ77 dictionary trained from the payloads, for ccnxz_relay --payload lz77.
+"""
+
+import argparse
+import textwrap
+
+from CCNxz.CCNxDictionaryTrainer import *
+
+# __author__ = 'mmosko'
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Train a CCNxz compression dictionary',
+        epilog=textwrap.dedent('''\
+            Each file is a sequence of back-to-back wire format packets.
+
+            Example:
+                ccnxz_train --id 1 -o ccnxz.dict corpus/*.bin'''))
+
+    parser.add_argument('-o', required=True, dest='output', help='The dictionary file to write')
+    parser.add_argument('--id', dest='dictionary_id', type=int, default=1, help='The dictionary id (1 - 255)')
+    parser.add_argument('--max-pairs', dest='max_pairs', type=int, default=4,
+                        help='Maximum TL pairs in one fixed length tuple')
+    parser.add_argument('--huffman', action='store_true', help='Huffman code the TL pairs')
+    parser.add_argument('--payload-size', dest='payload_size', type=int, default=0,
+                        help='Bytes of LZ77 payload dictionary to train (default none)')
+    parser.add_argument('files', nargs='+', help='Corpus files')
+
+    return parser.parse_args()
+
+
+def _run_main():
+    args = _parse_args()
+
+    trainer = CCNxDictionaryTrainer(max_tuple_pairs=args.max_pairs)
+    for path in args.files:
+        trainer.add_file(path)
+
+    dictionary = trainer.train(args.dictionary_id, args.huffman, args.payload_size)
+    dictionary.save(args.output)
+    print "Trained dictionary {} from {} packets: {} tuples, {} variable length entries".format(
+        dictionary.dictionary_id, trainer.packets, len(dictionary.tuples), len(dictionary.vles))
+    if dictionary.huffman_code is not None:
+        print "Huffman code: {} symbols, longest code {} bits".format(
+            len(dictionary.huffman_code.code_lengths), dictionary.huffman_code.max_code_length)
+    if dictionary.payload_dictionary is not None:
+        print "Payload dictionary: {} bytes".format(len(dictionary.payload_dictionary))
+
+
+if __name__ == "__main__":
+    _run_main()
@@ -24,113 +24,51 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 """
-Read in a two column file of (symbol, weight) and generate a huffman tree
+Read in a two column file of (symbol, weight) and print a canonical huffman code
+
+    huffmantree.py symbol_weights.txt
+
+CCNxHuffmanCode builds the code, which is what the Huffman TL codec uses.
 """
 
 __author__ = 'mmosko'
 
 import sys
 import re
-import types
-
-class TreeNode(object):
-    def __init__(self, symbol, weight):
-        self.__symbol = symbol
-        self.__weight = int(weight)
-
-    def __lt__(self, other):
-        if self.__weight > other.__weight:
-            return True
-        elif self.__weight > other.__weight and self.__symbol < other.symbol:
-            return True
-        else:
-            return False
-
-    def __str__(self):
-        return "({}, {})".format(self.__symbol, self.__weight)
-
-    def __repr__(self):
-        return self.__str__()
-
-    @property
-    def weight(self):
-        return self.__weight
-
-    @property
-    def symbol(self):
-        return self.__symbol
-
-
-class HuffmanTree(object):
-    def __init__(self, symbols):
-        self.__symbols = symbols
-
-    def generate_tree(self):
-        while len(self.__symbols) >= 2:
-            # pop 2 symbols from end of list
-            a = self.__symbols.pop()
-            b = self.__symbols.pop()
-
-            print [a, b]
-
-            tree_node = TreeNode([b, a], a.weight + b.weight)
-            self.__symbols.append(tree_node)
-            self.__symbols.sort()
-            self.generate_tree()
-
-    def print_tree(self):
-        print "__symbols = ", self.__symbols
-        self.__print(self.__symbols[0], [])
-
-    def __print(self, symbol, code):
-        s = symbol.symbol
-        if type(s) == types.ListType:
-            #print "code = {} symbols = {}".format(code, symbol)
-            left = s.pop()
-            left_code = list(code)
-            left_code.append(0)
-            self.__print(left, left_code)
-
-            right = s.pop()
-            right_code = list(code)
-            right_code.append(1)
-            self.__print(right, right_code)
-        else:
-            print "{}, \"{}\"".format(symbol.symbol, self.__code_string(code))
-
-    @staticmethod
-    def __code_string(code):
-        string = ""
-        for v in code:
-            string += chr(ord('0') + v)
-        return string
-
-    @property
-    def symbols(self):
-        return self.__symbols
-
-if len(sys.argv) == 2:
-    fh = open(sys.argv[1],"r")
-    symbols = []
-    for f in fh:
-        tokens = re.split("[ \t]", f.strip())
-        tree_node = TreeNode(tokens[0], int(tokens[1]))
-        symbols.append(tree_node)
-else:
-    symbols = [
-        TreeNode('A', 10),
-        TreeNode('B', 5),
-        TreeNode('C', 3),
-        TreeNode('D', 3),
-        TreeNode('E', 1)
-    ]
-
-symbols.sort()
-print symbols
-
-print "Building huffman tree"
-tree = HuffmanTree(symbols)
-tree.generate_tree()
-
-print "Final tree, len = ", len(tree.symbols)
-print tree.print_tree()
+
+from CCNxz.CCNxHuffmanCode import CCNxHuffmanCode
+
+
+def _read_weights(path):
+    weights = {}
+    with open(path, "r") as fh:
+        for line in fh:
+            tokens = re.split("[ \t]+", line.strip())
+            if len(tokens) == 2:
+                weights[tokens[0]] = int(tokens[1])
+    return weights
+
+
+def _code_string(code, length):
+    return format(code, "0{}b".format(length))
+
+
+def _run_main():
+    if len(sys.argv) == 2:
+        weights = _read_weights(sys.argv[1])
+    else:
+        weights = {'A': 10, 'B': 5, 'C': 3, 'D': 3, 'E': 1}
+
+    code = CCNxHuffmanCode.from_counts(weights, add_escapes=False)
+
+    total = sum(weights.values())
+    bits = sum(weights[symbol] * length for symbol, length in code.code_lengths.items())
+    print "{} symbols, longest code {} bits, {:.3f} bits per symbol".format(
+        len(weights), code.max_code_length, float(bits) / total)
+
+    for symbol, (bit_code, length) in sorted(code.encode_table.items(), key=lambda item: (item[1][1], item[0])):
+        print "{}, \"{}\"".format(symbol, _code_string(bit_code, length))
+
+
+if __name__ == "__main__":
+    _run_main()
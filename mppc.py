@@ -24,7 +24,6 @@
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-
 # Implements the Microsoft Point-to-Point Compression (MPPC) protocol
 # RFC 2118
 #
@@ -34,20 +33,19 @@
 # History size:
 #    8192 bytes
 #
-# Packet format
+# Because we are not running inside PPP, we use this packet format:
 #
 #    0                   1                   2                   3
 #    0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5 6 7 8 9 0 1
 #   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
-#   |         PPP Protocol          |A|B|C|D| Coherency Count       |
+#   |A|B|C|      zeros (13)         |        Coherency Count        |
 #   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
 #   |        Compressed Data...
 #   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
 #
-# A Bit : history initialize
-# B Bit: Set history pointer to front of buffer
-# C Bit: Packet is compressed (1)
-# D Bit: unused (must be 0)
+# A Bit: history initialized (flushed) before this packet
+# B Bit: history pointer set to the front of the buffer before this packet
+# C Bit: packet is compressed (1).  If 0, the data follows as-is and A is set.
 #
 # Coherency counter:
 #   monotonically increasing counter with wrap-around to 0
@@ -55,23 +53,20 @@
 # Unlike RFC 2118 we do not include the Protocol field at the start
 # of the compressed data, we just begin with the CCNx packet.
 #
-########
-# Because we are not running inside PPP, we will use this packet format:
+# The history persists across packets.  If a packet does not fit in what is
+# left of the history, the history pointer goes back to the front (B bit).
+# If a packet would get larger, it is sent uncompressed and the history is
+# flushed (A bit), as RFC 2118 does.
 #
-#    0                   1                   2                   3
-#    0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5 6 7 8 9 0 1 2 3 4 5 6 7 8 9 0 1
-#   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
-#   |A|B|C|      zeros (13)         |        Coherency Count        |
-#   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
-#   |        Compressed Data...
-#   +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+
+# #######
+# Match finder:
 #
-# N.B.:
-#   If the output becomes larger than the input, the program currently
-#   crashes with something like:
-#       File "./mppc.py", line 159, in __encode7bitLiteral
-#         self.__out[byte_offset+1] |= lowerbyte
-#     IndexError: array index out of range
+# Every position in the history is inserted in a hash table keyed by its next
+# 3 bytes (the minimum copy length), and each position links to the previous
+# position with the same 3 bytes.  Finding a match walks that chain, newest first,
+# for at most max_chain links or until the offset passes the 8191 byte limit.
+# With lazy matching a match is put off by one byte if the next position has
+# a longer one.
 #
 
 import array
@@ -79,294 +74,388 @@ import binascii
 import struct
 import sys
 
-class MCCP(object):
-    # Used as bit patterns in Offset Encoding (RFC Sec 4.2.1)
-    __offset_pattern_64 = 0b1111
-    __offset_pattern_320 = 0b1110
-    __offset_pattern_8191 = 0b110
-
-    __length_pattern_3    = 0b0
-    __length_pattern_8    = 0b10
-    __length_pattern_16   = 0b110
-    __length_pattern_32   = 0b1110
-    __length_pattern_64   = 0b11110
-    __length_pattern_128  = 0b111110
-    __length_pattern_256  = 0b1111110
-    __length_pattern_512  = 0b11111110
-    __length_pattern_1024 = 0b111111110
-    __length_pattern_2048 = 0b1111111110
-    __length_pattern_4096 = 0b11111111110
-    __length_pattern_8192 = 0b111111111110
-
-    def __init__(self, data):
-        self.__in = data
-        self.__inByteOffset = 0
-        self.__out = array.array('B')
-        self.__overflowLength = 20
-        self.__outLength = len(data) + self.__overflowLength
-        self.__out.fromlist([0] * self.__outLength)
-        self.__outBitOffset = 0
-        self.__historyLength = 8196
-        self.__history = array.array('B')
-        self.__history.fromlist([0] * self.__historyLength)
-        self.__historyOffset = 0
-
-    def __findLongestHistory(self):
-        '''
-            Begining at __inByteOffset, find the longest substring in the
-            history that matches it.
-
-            This is an inefficient implementation as it does a linear scan.
-
-            Because the minimum length encoding is 3, we do not match
-            any substrings less than 3 bytes long.
-
-            :return: (offset, length) or None
-        '''
-
-        istring = self.__in[self.__inByteOffset:]
-        longestLen = 0
-        longestOffset = 0
-
-        hstr = self.__history.tostring()
-        for iLen in range(3, 1 + len(istring)):
-            idx = hstr.find(istring[0:iLen])
-            if idx > -1:
-                # substrings match, so possible hit
-                if iLen > longestLen:
-                    longestLen = iLen
-                    longestOffset = idx
-            else:
-                # sustrings no longer match, give up on this historyOffset
-                # breaks out of iLen loop
-                break
+_history_size = 8192
+_max_offset = _history_size - 1
+_max_length = _history_size - 1
+_min_length = 3
+
+_flag_flushed = 0x8000
+_flag_at_front = 0x4000
+_flag_compressed = 0x2000
+_header_length = 4
+
+
+class _BitWriter(object):
+    def __init__(self):
+        self.__out = bytearray()
+        self.__accumulator = 0
+        self.__bits = 0
+
+    def write(self, bits, bit_length):
+        self.__accumulator = (self.__accumulator << bit_length) | bits
+        self.__bits += bit_length
+        while self.__bits >= 8:
+            self.__bits -= 8
+            self.__out.append((self.__accumulator >> self.__bits) & 0xFF)
+        self.__accumulator &= (1 << self.__bits) - 1
+
+    def __len__(self):
+        return len(self.__out)
+
+    def flush(self):
+        if self.__bits > 0:
+            self.write(0, 8 - self.__bits)
+        return self.__out
 
-        if longestLen > 0:
-            print "Found longest match (off = {}, len = {})".format(longestOffset, longestLen)
-            return (longestOffset, longestLen)
-        else:
-            return (None, None)
 
-    def __getOutputByte(self):
-        return self.__outBitOffset / 8
+class _BitReader(object):
+    def __init__(self, data, offset):
+        self.__in = data
+        self.__offset = offset
+        self.__accumulator = 0
+        self.__bits = 0
 
-    def __getOutpuBit(self):
-        return self.__outBitOffset % 8
+    @property
+    def bits_left(self):
+        return self.__bits + 8 * (len(self.__in) - self.__offset)
 
-    def __incrementHistoryOffset(self):
-        self.__historyOffset = (self.__historyOffset + 1) % self.__historyLength
+    def __fill(self, bit_length):
+        while self.__bits < bit_length:
+            if self.__offset >= len(self.__in):
+                raise ValueError("MPPC packet truncated")
+            self.__accumulator = (self.__accumulator << 8) | self.__in[self.__offset]
+            self.__offset += 1
+            self.__bits += 8
 
-    def __pushByteToHistory(self, byte):
-        self.__history[self.__historyOffset] = byte
-        self.__incrementHistoryOffset()
+    def peek(self, bit_length):
+        self.__fill(bit_length)
+        return self.__accumulator >> (self.__bits - bit_length)
 
-    def __encode7bitLiteral(self, byte):
-        if byte >= 0x80:
-            raise ValueError("Byte must be less than 0x80, got: ", hex(byte))
+    def read(self, bit_length):
+        self.__fill(bit_length)
+        self.__bits -= bit_length
+        value = self.__accumulator >> self.__bits
+        self.__accumulator &= (1 << self.__bits) - 1
+        return value
 
-        byte_offset = self.__getOutputByte()
-        bit_offset = self.__getOutpuBit()
 
-        if bit_offset == 0:
-            self.__out[byte_offset] = byte
-        else:
-            # example:
-            #   memory: ab00.0000.0000.0000
-            #   bitoffset = 2
-            #   data = defg.hijk
-            #
-            #   upperbyte = defghi
-            #   memory: abde.fghi.0000.0000
-            #
-            #   lowerbyte = jk00.0000
-            #   memory: abde.fghi.jk00.0000
+class MCCP(object):
+    """
+    MPPC compressor.  One MCCP is one direction of one flow, as the history carries over
+    from packet to packet.
 
-            upperbyte = byte >> bit_offset
-            self.__out[byte_offset] |= upperbyte
+    For compatibility, MCCP(data).compress() compresses data from a fresh history.
+    """
+    # Used as bit patterns in Offset Encoding (RFC Sec 4.2.1)
+    __offset_pattern_64 = 0b1111
+    __offset_pattern_320 = 0b1110
+    __offset_pattern_8191 = 0b110
 
-            mask = (1 << bit_offset) - 1
-            shift = 8 - bit_offset
-            lowerbyte = (byte & mask) << shift
-            self.__out[byte_offset+1] |= lowerbyte
+    # Matches at least this long are taken without looking at the next position
+    __good_length = 32
 
-            #print "wrote {}".format(hex(upperbyte << 8 | lowerbyte))
+    def __init__(self, data=None, max_chain=16, lazy=True):
+        """
+        :param data: Default input for compress()
+        :param max_chain: The most hash chain links followed for one match
+        :param lazy: Use lazy matching
+        """
+        self.__in = data
+        self.__max_chain = max_chain
+        self.__lazy = lazy
+        self.__history = bytearray(_history_size)
+        self.__coherency_count = 0
+        self.__reset_history()
+        self.__flushed = True
 
-        self.__outBitOffset += 8
+    @property
+    def history(self):
+        return self.__history[0:self.__historyOffset]
 
-    def __encodeLiteral(self):
-        byte = ord(self.__in[self.__inByteOffset])
-        self.__inByteOffset += 1
+    @property
+    def coherency_count(self):
+        """The count the next packet will carry"""
+        return self.__coherency_count
+
+    def reset(self):
+        """Flush the history.  The next packet has the A bit set."""
+        self.__reset_history()
+        self.__flushed = True
+
+    def compress(self, data=None):
+        """
+        :param data: A string, bytearray, or array of bytes.  Defaults to the constructor data.
+        :return: The packet as an array of bytes
+        """
+        if data is None:
+            data = self.__in
+        data = bytearray(data)
+        if len(data) > _history_size:
+            raise ValueError("MPPC packets are limited to {} bytes".format(_history_size))
+
+        flags = _flag_compressed
+        if self.__flushed:
+            flags |= _flag_flushed
+            self.__flushed = False
+
+        if self.__historyOffset + len(data) > _history_size:
+            self.__reset_history()
+            flags |= _flag_at_front
+
+        start = self.__historyOffset
+        end = start + len(data)
+        self.__history[start:end] = data
+        self.__historyOffset = end
+
+        writer = _BitWriter()
+        self.__encode(writer, start, end)
+        compressed = writer.flush()
+
+        if len(compressed) >= len(data):
+            # RFC 2118 Sec 3.1: send it as-is and start over with an empty history
+            self.reset()
+            self.__flushed = False
+            flags = _flag_flushed
+            compressed = data
+
+        out = array.array('B', struct.pack("!HH", flags, self.__coherency_count))
+        out.extend(compressed)
+        self.__coherency_count = (self.__coherency_count + 1) & 0xFFFF
+        return out
+
+    # ###### Private API
+
+    def __reset_history(self):
+        self.__historyOffset = 0
+        self.__head = {}
+        self.__chain = [-1] * _history_size
+
+    def __insert(self, position, end):
+        if position + _min_length <= end:
+            history = self.__history
+            key = (history[position] << 16) | (history[position + 1] << 8) | history[position + 2]
+            self.__chain[position] = self.__head.get(key, -1)
+            self.__head[key] = position
+
+    def __findLongestHistory(self, position, end):
+        """
+        Walk the hash chain of the 3 bytes at position
+
+        :return: (length, offset), length is 0 if no match
+        """
+        if position + _min_length > end:
+            return 0, 0
+
+        history = self.__history
+        key = (history[position] << 16) | (history[position + 1] << 8) | history[position + 2]
+        candidate = self.__head.get(key, -1)
+        max_length = min(end - position, _max_length)
+
+        best_length = 0
+        best_offset = 0
+        depth = self.__max_chain
+        while candidate >= 0 and depth > 0:
+            offset = position - candidate
+            if offset > _max_offset:
+                break
 
+            # Every entry on the chain matches the first 3 bytes.  Only extend it if it
+            # can beat the best so far.
+            if best_length < _min_length or history[candidate + best_length] == history[position + best_length]:
+                length = _min_length
+                while length < max_length and history[candidate + length] == history[position + length]:
+                    length += 1
+                if length > best_length:
+                    best_length = length
+                    best_offset = offset
+                    if length == max_length:
+                        break
+
+            candidate = self.__chain[candidate]
+            depth -= 1
+
+        return best_length, best_offset
+
+    def __encode(self, writer, start, end):
+        position = start
+        while position < end:
+            length, offset = self.__findLongestHistory(position, end)
+            self.__insert(position, end)
+            if length == 0:
+                self.__encodeLiteral(writer, self.__history[position])
+                position += 1
+                continue
+
+            # Lazy matching: a literal plus a longer match at the next byte is better
+            while self.__lazy and length < MCCP.__good_length:
+                next_length, next_offset = self.__findLongestHistory(position + 1, end)
+                if next_length <= length:
+                    break
+                self.__encodeLiteral(writer, self.__history[position])
+                position += 1
+                self.__insert(position, end)
+                length, offset = next_length, next_offset
+
+            self.__encodeCopyTuple(writer, offset, length)
+            for p in range(position + 1, position + length):
+                self.__insert(p, end)
+            position += length
+
+    @staticmethod
+    def __encodeLiteral(writer, byte):
         if byte < 0x80:
-            self.__encode7bitLiteral(byte)
-        else:
-            # We need to write a "1" bit, then write the
-            # byte as a 7-bit literal
-
-            byte_offset = self.__getOutputByte()
-            bit_offset = self.__getOutpuBit()
-
-            upperbyte = 1 << (7 - bit_offset)
-            self.__out[byte_offset] |= upperbyte
-            self.__outBitOffset += 1
-
-            self.__encode7bitLiteral(byte & 0x7F)
-
-        self.__pushByteToHistory(byte)
-
-    def __encodebits(self, bits, bit_length):
-        bit_offset = self.__getOutpuBit()
-
-        available_bits = 8 - bit_offset
-        if bit_length <= available_bits:
-            # we can fit the whole thing, shift the bits
-            # up so we pack the top of the byte first
-            shift = available_bits - bit_length
-            x = bits << shift
-
-            byte_offset = self.__getOutputByte()
-            self.__out[byte_offset] |= x
-            self.__outBitOffset += bit_length
-
+            writer.write(byte, 8)
         else:
-            # grab 'available_bits' from the top
-            shift = bit_length - available_bits
-            x = bits >> shift
-            self.__encodebits(x, available_bits)
-
-            bit_length -= available_bits
-            mask = (1 << bit_length) - 1
-            bits &= mask
-            self.__encodebits(bits, bit_length)
+            # '10' followed by the lower 7 bits
+            writer.write(0x100 | (byte & 0x7F), 9)
 
-
-    def __encodeTupleOffset(self, offset):
+    @staticmethod
+    def __encodeCopyTuple(writer, offset, length):
         if offset < 64:
             # Encoded as '1111' plus lower 6 bits
-            self.__encodebits(MCCP.__offset_pattern_64, 4)
-            self.__encodebits(offset, 6)
-
+            writer.write((MCCP.__offset_pattern_64 << 6) | offset, 10)
         elif offset < 320:
             # Encoded as '1110' plus lower 8 bits of (value - 64)
-            self.__encodebits(MCCP.__offset_pattern_320, 4)
-            self.__encodebits(offset - 64, 8)
-
+            writer.write((MCCP.__offset_pattern_320 << 8) | (offset - 64), 12)
         else:
             # Encoded as '110' followed by lower 13 bits of (value - 320)
-            self.__encodebits(MCCP.__offset_pattern_8191, 3)
-            self.__encodebits(offset - 320, 13)
+            writer.write((MCCP.__offset_pattern_8191 << 13) | (offset - 320), 16)
 
-    def __encodeTupleLength(self, length):
         if length == 3:
-            self.__encodebits(MCCP.__length_pattern_3, 1)
-        elif length < 8:
-            self.__encodebits(MCCP.__length_pattern_8, 2)
-            self.__encodebits(length & 0x0003, 2)
-        elif length < 16:
-            self.__encodebits(MCCP.__length_pattern_16, 3)
-            self.__encodebits(length & 0x0007, 3)
-        elif length < 32:
-            self.__encodebits(MCCP.__length_pattern_32, 4)
-            self.__encodebits(length & 0x000F, 4)
-        elif length < 64:
-            self.__encodebits(MCCP.__length_pattern_64, 5)
-            self.__encodebits(length & 0x001F, 5)
-        elif length < 128:
-            self.__encodebits(MCCP.__length_pattern_128, 6)
-            self.__encodebits(length & 0x003F, 6)
-        elif length < 256:
-            self.__encodebits(MCCP.__length_pattern_256, 7)
-            self.__encodebits(length & 0x007F, 7)
-        elif length < 512:
-            self.__encodebits(MCCP.__length_pattern_512, 8)
-            self.__encodebits(length & 0x00FF, 8)
-        elif length < 1024:
-            self.__encodebits(MCCP.__length_pattern_1024, 9)
-            self.__encodebits(length & 0x01FF, 9)
-        elif length < 2048:
-            self.__encodebits(MCCP.__length_pattern_2048, 10)
-            self.__encodebits(length & 0x03FF, 10)
-        elif length < 4096:
-            self.__encodebits(MCCP.__length_pattern_4096, 11)
-            self.__encodebits(length & 0x07FF, 11)
+            writer.write(0, 1)
         else:
-            self.__encodebits(MCCP.__length_pattern_8192, 12)
-            self.__encodebits(length & 0x0FFF, 12)
-
-    def __encodeCopyTuple(self, offset, length):
-        self.__encodeTupleOffset(offset)
-        self.__encodeTupleLength(length)
-
-        endOffset = self.__inByteOffset + length
-        while self.__inByteOffset < endOffset:
-            byte = ord(self.__in[self.__inByteOffset])
-            self.__pushByteToHistory(byte)
-            self.__inByteOffset += 1
-
-
-    def __addHeader(self, counter):
-        A = 0x1000
-        B = 0x0000
-        C = 0x0000
-
-        struct.pack_into("!HH", self.__out, 0, A | B | C, counter)
-        self.__outBitOffset = 32
-
-    def __trimOutputBuffer(self):
-        # Trim down to nearest byte
-
-        # Include +1 because we need the length to include the last byte
-        last_byte = self.__getOutputByte() + 1
-        last_bit = self.__getOutpuBit()
-        if last_bit == 0:
-            # If the last bit offset is 0, we have not written to the last byte
-            last_byte -= 1
-
-        print "last_byte = {}, len = {}".format(last_byte, len(self.__out))
-        while len(self.__out) > last_byte:
-            self.__out.pop()
+            # A length in [2^k, 2^(k+1)) is (k - 1) 1's, a 0, then its lower k bits
+            k = length.bit_length() - 1
+            prefix = ((1 << (k - 1)) - 1) << 1
+            writer.write((prefix << k) | (length & ((1 << k) - 1)), 2 * k)
+
+
+class MCCPDecoder(object):
+    """
+    MPPC decompressor for the packets of one MCCP, in order
+    """
+    def __init__(self):
+        self.__history = bytearray(_history_size)
+        self.__historyOffset = 0
+        self.__coherency_count = None
 
     @property
-    def history(self):
-        return self.__history
-
-    def compress(self):
-        self.__addHeader(0)
-        while self.__inByteOffset < len(self.__in):
-            (longestOffset, longestLen) = self.__findLongestHistory()
-#            (longestOffset, longestLen) = (None, None)
-            if longestOffset is None:
-                self.__encodeLiteral()
-            else:
-                self.__encodeCopyTuple(longestOffset, longestLen)
-
-        self.__trimOutputBuffer()
-        return self.__out
+    def coherency_count(self):
+        """The count of the last packet decoded, None before the first"""
+        return self.__coherency_count
+
+    @staticmethod
+    def parse_header(packet):
+        """
+        :return: (flags, coherency count)
+        :raises ValueError: If the packet is too short
+        """
+        if len(packet) < _header_length:
+            raise ValueError("MPPC packet shorter than its header")
+        return struct.unpack("!HH", str(bytearray(packet[0:_header_length])))
+
+    def decompress(self, packet):
+        """
+        :param packet: A packet from MCCP.compress
+        :return: The original data as a string
+        :raises ValueError: On a packet that does not decode against the history
+        """
+        packet = bytearray(packet)
+        flags, count = MCCPDecoder.parse_header(packet)
+        self.__coherency_count = count
+
+        if flags & _flag_flushed:
+            self.__historyOffset = 0
+        if flags & _flag_at_front:
+            self.__historyOffset = 0
+
+        if not flags & _flag_compressed:
+            return str(packet[_header_length:])
+
+        start = self.__historyOffset
+        try:
+            self.__decode(_BitReader(packet, _header_length))
+        except (ValueError, IndexError):
+            # do not keep a half decoded packet in the history
+            self.__historyOffset = start
+            raise ValueError("MPPC packet {} does not decode".format(count))
+
+        return str(self.__history[start:self.__historyOffset])
+
+    # ###### Private API
+
+    def __decode(self, reader):
+        history = self.__history
+        position = self.__historyOffset
+        while reader.bits_left >= 8:
+            if reader.peek(1) == 0:
+                byte = reader.read(8)
+                history[position] = byte
+                position += 1
+                continue
+            if reader.peek(2) == 0b10:
+                byte = 0x80 | (reader.read(9) & 0x7F)
+                history[position] = byte
+                position += 1
+                continue
+
+            offset = self.__decodeOffset(reader)
+            length = self.__decodeLength(reader)
+            source = position - offset
+            if source < 0 or position + length > _history_size:
+                raise ValueError("MPPC copy tuple outside the history")
+
+            # may overlap, so byte by byte
+            for i in range(length):
+                history[position + i] = history[source + i]
+            position += length
+
+        self.__historyOffset = position
+
+    @staticmethod
+    def __decodeOffset(reader):
+        if reader.peek(4) == 0b1111:
+            return reader.read(10) & 0x3F
+        if reader.peek(4) == 0b1110:
+            return (reader.read(12) & 0xFF) + 64
+        if reader.peek(3) == 0b110:
+            return (reader.read(16) & 0x1FFF) + 320
+        raise ValueError("Bad MPPC offset prefix")
+
+    @staticmethod
+    def __decodeLength(reader):
+        k = 1
+        while reader.read(1) == 1:
+            k += 1
+            if k > 12:
+                raise ValueError("Bad MPPC length prefix")
+        if k == 1:
+            return 3
+        return (1 << k) | reader.read(k)
+
+
+def _run_main():
+    if len(sys.argv) != 2:
+        data = "for whom the bell tolls, the bell tolls for thee.\xA6\x80"
+    else:
+        fh = open(sys.argv[1], "rb")
+        data = fh.read(_history_size)
+        fh.close()
 
-
-if len(sys.argv) != 2:
-    data = "for whom the bell tolls, the bell tolls for thee.\xA6\x80"
     comp = MCCP(data)
     out = comp.compress()
 
-    print "Input len %d Output len %d, ratio %f" % (len(data), len(out), len(out) / len(data))
-    print "output:   ",binascii.hexlify(out)
-    print "history:  ",binascii.hexlify(comp.history)
-
-    expected = "10000000666f722077686f6d207468652062656c6c20746f6c6c732cf23720f023c9329749a000"
-    if binascii.hexlify(out) != expected:
-        print "expected: ", expected
+    print "Input len %d Output len %d, ratio %f" % (len(data), len(out), float(len(out)) / len(data))
+    print "output:   ", binascii.hexlify(out)
 
-else:
-    fh = open(sys.argv[1], "rb")
-    data = fh.read(65536)
-    comp = MCCP(data)
-    out = comp.compress()
+    if MCCPDecoder().decompress(out) != data:
+        print "ERROR: output does not decompress to the input"
 
-    fhout = open("compressed.mccp", "wb")
-    fhout.write(out)
+    if len(sys.argv) == 2:
+        fhout = open("compressed.mccp", "wb")
+        fhout.write(out)
+        fhout.close()
 
-    print "Input len %d Output len %d, ratio %f" % (len(data), len(out), len(out) / len(data))
 
-    fhout.close()
-    fh.close()
\ No newline at end of file
+if __name__ == "__main__":
+    _run_main()
@@ -0,0 +1,117 @@
+#!/usr/bin/pyton
+
+#
+# Copyright (c) 2016-2018, Xerox Corporation (Xerox) and Palo Alto Research Center, Inc (PARC)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL XEROX OR PARC BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+
+__author__ = 'mmosko'
+
+import unittest
+import random
+import struct
+
+from mppc import *
+
+
+def _flags(packet):
+    return MCCPDecoder.parse_header(packet)[0]
+
+
+class TestMppc(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(2118)
+
+    def _text(self, n):
+        words = ["interest", "content", "object", "/ccnx/name", "chunk", "manifest", "payload", "\x00\x01"]
+        return "".join(self.rand.choice(words) for i in range(n))
+
+    def test_round_trip(self):
+        data = "for whom the bell tolls, the bell tolls for thee.\xA6\x80"
+        out = MCCP(data).compress()
+        self.assertTrue(len(out) < len(data))
+        self.assertEqual(_flags(out), 0x8000 | 0x2000)
+        self.assertEqual(MCCPDecoder().decompress(out), data)
+
+    def test_all_lengths_and_offsets(self):
+        # long runs give long copies, the spacing gives offsets in all three ranges
+        data = "".join(chr(i % 256) * (i % 700) + self._text(i % 40) for i in range(1, 40))[0:8000]
+        out = MCCP(data).compress()
+        self.assertTrue(len(out) < len(data) / 2)
+        self.assertEqual(MCCPDecoder().decompress(out), data)
+
+    def test_history_across_packets(self):
+        encoder = MCCP()
+        decoder = MCCPDecoder()
+        first_length = None
+        for i in range(40):
+            data = "name=/parc/ccnx/object/chunk=%d;payload=" % i + self._text(20)
+            out = encoder.compress(data)
+            if first_length is None:
+                first_length = len(out)
+            self.assertEqual(decoder.decompress(out), data)
+            self.assertEqual(decoder.coherency_count, i)
+        # the last packet benefits from the history
+        self.assertTrue(len(out) < first_length)
+
+    def test_history_wraps_to_front(self):
+        encoder = MCCP()
+        decoder = MCCPDecoder()
+        flags = []
+        for i in range(10):
+            data = self._text(200)
+            out = encoder.compress(data)
+            flags.append(_flags(out))
+            self.assertEqual(decoder.decompress(out), data)
+        self.assertTrue(any(f & 0x4000 for f in flags))
+
+    def test_incompressible(self):
+        data = "".join(chr(self.rand.randint(0, 255)) for i in range(1000))
+        encoder = MCCP()
+        decoder = MCCPDecoder()
+        out = encoder.compress(data)
+        self.assertEqual(_flags(out), 0x8000)
+        self.assertEqual(len(out), len(data) + 4)
+        self.assertEqual(decoder.decompress(out), data)
+
+        # and the next packet starts from an empty history
+        data = self._text(100)
+        self.assertEqual(decoder.decompress(encoder.compress(data)), data)
+
+    def test_reset(self):
+        encoder = MCCP()
+        encoder.compress(self._text(100))
+        encoder.reset()
+        data = self._text(100)
+        out = encoder.compress(data)
+        self.assertTrue(_flags(out) & 0x8000)
+        # a decoder that missed the first packet can decode this one
+        self.assertEqual(MCCPDecoder().decompress(out), data)
+
+    def test_bad_packet(self):
+        decoder = MCCPDecoder()
+        self.assertRaises(ValueError, decoder.decompress, [0x20, 0x00])
+        # a copy tuple with offset 63 and nothing in the history
+        bad = array.array('B', struct.pack("!HH", 0xA000, 0)) + array.array('B', [0xFF, 0xC0])
+        self.assertRaises(ValueError, decoder.decompress, bad)
+
+
+if __name__ == "__main__":
+    unittest.main()